@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable
+
+from ..game import Game
+from ..input.scripted import ScriptedInput
+from ..render.framebuffer import np
+from ..render.render import Renderer
+from ..utils import constants
+from ..bench.scenarios import SCENARIOS
+
+# Timed phases of a tick + frame, in pipeline order
+PHASES = ('update', 'hud', 'composite', 'diff', 'write', 'frame')
+
+
+class ByteCounter(io.TextIOBase):
+    """Text stream that discards output and counts the bytes written."""
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text: str) -> int:
+        self.bytes += len(text.encode('utf-8'))
+        return len(text)
+
+    def isatty(self) -> bool:
+        return False
+
+
+def timed(totals: dict[str, float], phase: str, function: Callable) -> Callable:
+    """Wrap `function` so its run time is added to totals[phase]."""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            totals[phase] += time.perf_counter() - start
+    return wrapper
+
+
+def run_scenario(name: str, frames: int = 300, warmup: int = 10, seed: int = 0) -> dict:
+    """
+    Run one scenario headless for `frames` ticks (one fixed update and one
+    rendered frame each) after `warmup` untimed ones.
+
+    Returns mean milliseconds per frame for every phase and the mean
+    number of terminal bytes written per frame.
+    """
+    rng = random.Random(seed)
+    if np is not None:
+        np.random.seed(seed)
+
+    # Real terminal renderer writing into a byte counter, with a fixed terminal
+    # size so output is identical on every machine
+    counter = ByteCounter()
+    renderer = Renderer(synchronized_output=False, stream=counter)
+    renderer.prev_terminal_size = os.terminal_size((constants.LEFT_MARGIN + constants.SIZE_X * constants.CELL_WIDTH
+                                                   + constants.RIGHT_MARGIN, constants.SIZE_Y + 10))
+    game = Game(renderer=renderer, input=ScriptedInput())
+    SCENARIOS[name](game, rng)
+    game.simulate(warmup)
+
+    # Time each phase by wrapping the methods the game loop calls
+    totals = dict.fromkeys(PHASES, 0.0)
+    game._fixed_update = timed(totals, 'update', game._fixed_update)
+    for target, method in ((game.hud, 'render_top'), (game.hud, 'render_bottom'),
+                           (renderer, 'draw_hud_top'), (renderer, 'draw_hud_bottom')):
+        setattr(target, method, timed(totals, 'hud', getattr(target, method)))
+    game.camera.get_framebuffer = timed(totals, 'composite', game.camera.get_framebuffer)
+    renderer.draw_diff = timed(totals, 'diff', renderer.draw_diff)
+    renderer.end_frame = timed(totals, 'write', renderer.end_frame)
+    render = timed(totals, 'frame', game._render)
+
+    counter.bytes = 0
+    for _ in range(frames):
+        game._fixed_update(game.fixed_dt)
+        render()
+
+    return {
+        'ms': {phase: totals[phase] * 1000 / frames for phase in PHASES},
+        'bytes_per_frame': counter.bytes / frames,
+    }
+
+
+def run_all(names: list[str], frames: int, seed: int) -> dict:
+    """Run the named scenarios and return a JSON-serializable report."""
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__ if np is not None else None,
+            'frames': frames,
+            'seed': seed,
+        },
+        'scenarios': {name: run_scenario(name, frames=frames, seed=seed) for name in names},
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float, min_ms: float) -> list[str]:
+    """
+    Return a description of every regression against the baseline: a phase
+    slower by more than `tolerance` (relative) and `min_ms` (absolute), or
+    any increase in bytes written per frame.
+    """
+    regressions = []
+    for name, result in report['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            continue
+        for phase, ms in result['ms'].items():
+            base_ms = base['ms'].get(phase)
+            if base_ms is not None and ms > base_ms * (1 + tolerance) and ms - base_ms > min_ms:
+                regressions.append(f"{name}.{phase}: {ms:.3f} ms vs {base_ms:.3f} ms baseline")
+        if result['bytes_per_frame'] > base['bytes_per_frame'] + 0.5:
+            regressions.append(f"{name}.bytes_per_frame: {result['bytes_per_frame']:.1f} "
+                               f"vs {base['bytes_per_frame']:.1f} baseline")
+    return regressions
+
+
+def format_report(report: dict) -> str:
+    """Format a report as a table of mean ms per phase and bytes per frame."""
+    header = f"{'scenario':<18}" + ''.join(f"{phase:>11}" for phase in PHASES) + f"{'bytes/frame':>13}"
+    lines = [header, '-' * len(header)]
+    for name, result in report['scenarios'].items():
+        lines.append(f"{name:<18}" + ''.join(f"{result['ms'][phase]:>11.3f}" for phase in PHASES)
+                     + f"{result['bytes_per_frame']:>13.1f}")
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m spaceship.bench',
+                                     description='Run the headless engine benchmarks (times in ms per frame).')
+    parser.add_argument('scenarios', nargs='*', help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--frames', type=int, default=300, help='timed frames per scenario')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for scenario setup')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a JSON baseline, exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown per phase')
+    parser.add_argument('--min-ms', type=float, default=0.05, help='ignore slowdowns smaller than this')
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    report = run_all(args.scenarios or list(SCENARIOS), args.frames, args.seed)
+    print(format_report(report))
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.tolerance, args.min_ms)
+        if regressions:
+            print("\nREGRESSIONS:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+        print(f"\nNo regressions against {args.compare}")
+
+    return 0
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import random
+from typing import Callable
+
+import typing
+if typing.TYPE_CHECKING:
+    from ..game import Game
+
+from ..ecs.systems import movement
+from ..ecs.world import World
+from ..render.entity import Entity
+from ..render.framebuffer import np
+from ..render.hud import HUDAlignment, HUDElement
+from ..render.particles import ParticleEmitter
+from ..render.sprite import Sprite
+from ..render.style import style
+from ..render.tilemap import TileMap
+from ..utils.constants import SIZE_X, SIZE_Y, CHAR_ASPECT
+from ..utils.math import Vector
+
+# World area covered by the default camera (one sprite row = CHAR_ASPECT world units)
+WORLD_W, WORLD_H = SIZE_X, SIZE_Y * CHAR_ASPECT
+
+SHIP = "/^\\\n|\to|\n\\_/"
+
+
+class Static(Entity):
+    """An entity that never moves."""
+    def update(self, dt: float):
+        pass
+
+
+class Mover(Entity):
+    """An entity bouncing around the visible world."""
+    def __init__(self, game: Game, position: Vector, velocity: Vector):
+        super().__init__(game, position)
+        self.velocity = velocity
+
+    def update(self, dt: float):
+        position = self.position.copy().iadd_scaled(self.velocity, dt)
+        if not 0 <= position.x < WORLD_W:
+            self.velocity.x = -self.velocity.x
+        if not 0 <= position.y < WORLD_H:
+            self.velocity.y = -self.velocity.y
+        self.position = position
+
+
+def random_position(rng: random.Random) -> Vector:
+    return Vector(rng.uniform(0, WORLD_W), rng.uniform(0, WORLD_H))
+
+
+def random_velocity(rng: random.Random, speed: float) -> Vector:
+    return Vector(rng.uniform(-speed, speed), rng.uniform(-speed, speed))
+
+
+# --- Scenarios ---
+# Each scenario populates a fresh headless game.
+
+def static_entities(game: Game, rng: random.Random, count: int = 500):
+    """Many entities that never move: the steady-state cost of a still scene."""
+    for _ in range(count):
+        entity = Static(game)
+        entity.sprite.load(SHIP, priority=rng.randint(1, 3))
+        entity.position = random_position(rng)
+        game.add_entity(entity)
+
+
+def moving_entities(game: Game, rng: random.Random, count: int = 500):
+    """Many small entities moving every tick."""
+    for _ in range(count):
+        entity = Mover(game, Vector(), random_velocity(rng, 30))
+        entity.sprite.load(SHIP, priority=rng.randint(1, 3))
+        entity.position = random_position(rng)
+        game.add_entity(entity)
+
+
+def colored_entities(game: Game, rng: random.Random, count: int = 500):
+    """moving_entities with colored sprites: the cost of styles in CPU time and bytes."""
+    styles = [style(fg=color) for color in ('red', 'green', 'yellow', 'cyan')]
+    cockpit = style(fg='bright_white', bg='blue', bold=True)
+    for _ in range(count):
+        entity = Mover(game, Vector(), random_velocity(rng, 30))
+        entity.sprite.load(SHIP, priority=rng.randint(1, 3), style=rng.choice(styles),
+                           colors="...\n.o.", palette={'o': cockpit})
+        entity.position = random_position(rng)
+        game.add_entity(entity)
+
+
+def full_scroll(game: Game, rng: random.Random):
+    """A screen-sized background while the camera pans every tick."""
+    glyphs = " .:*+"
+    art = '\n'.join(''.join(rng.choice(glyphs) for _ in range(SIZE_X * 2)) for _ in range(SIZE_Y))
+    background = Static(game)
+    background.sprite.load(art, priority=0)
+    background.position = Vector(0, 0)
+    game.add_entity(background)
+
+    def pan(dt: float):
+        game.camera.position = Vector((game.camera.position.x + 1) % SIZE_X, 0)
+    game.update_hook = pan
+
+
+def hud_heavy(game: Game, rng: random.Random, count: int = 8):
+    """Many HUD elements whose values change every tick."""
+    elements = []
+    for i in range(count):
+        for add in (game.hud.add_top_hud, game.hud.add_bottom_hud):
+            element = HUDElement(template=f"Stat {i}: `a` / `b`", values={'a': '0', 'b': '0'},
+                                 align=list(HUDAlignment)[i % 3])
+            add(element)
+            elements.append(element)
+
+    ticks = [0]
+    def bump(dt: float):
+        ticks[0] += 1
+        for element in elements:
+            element.set_value('a', str(ticks[0]))
+            element.set_value('b', str(rng.randint(0, 999)))
+    game.update_hook = bump
+
+
+def large_sprites(game: Game, rng: random.Random, count: int = 12):
+    """A few big sprites with transparent holes moving across each other."""
+    for _ in range(count):
+        art = '\n'.join(''.join(rng.choice("#@%\a") for _ in range(40)) for _ in range(15))
+        entity = Mover(game, Vector(), random_velocity(rng, 20))
+        entity.sprite.load(art, priority=rng.randint(1, 3))
+        entity.position = random_position(rng)
+        game.add_entity(entity)
+
+
+class Bullet(Mover):
+    """A short-lived entity that removes itself when its time runs out."""
+    def __init__(self, game: Game, position: Vector, velocity: Vector, lifetime: float):
+        super().__init__(game, position, velocity)
+        self.lifetime = lifetime
+
+    def update(self, dt: float):
+        super().update(dt)
+        self.lifetime -= dt
+        if self.lifetime <= 0:
+            self.kill()
+
+
+def entity_churn(game: Game, rng: random.Random, count: int = 500):
+    """Short-lived entities spawned and killed every tick, like bullets."""
+    def spawn(dt: float):
+        for _ in range(count - len(game.entities)):
+            entity = Bullet(game, Vector(), random_velocity(rng, 60), rng.uniform(0.1, 1.0))
+            entity.sprite.load("*", priority=rng.randint(1, 3))
+            entity.position = random_position(rng)
+            game.add_entity(entity)
+    game.update_hook = spawn
+
+
+def bounce(world: World, dt: float):
+    """ECS system: reflect velocities of rows leaving the visible world (see Mover)."""
+    n = world.count
+    px, py = world.position.x, world.position.y
+    vx, vy = world.velocity.x, world.velocity.y
+    if np is not None:
+        vx[:n][(px[:n] < 0) | (px[:n] >= WORLD_W)] *= -1
+        vy[:n][(py[:n] < 0) | (py[:n] >= WORLD_H)] *= -1
+        return
+    for i in range(n):
+        if not 0 <= px[i] < WORLD_W:
+            vx[i] = -vx[i]
+        if not 0 <= py[i] < WORLD_H:
+            vy[i] = -vy[i]
+
+
+def ecs_entities(game: Game, rng: random.Random, count: int = 5000):
+    """Ten times moving_entities' count, as ECS rows moved by vectorized systems."""
+    world = game.add_world(World(capacity=count))
+    world.add_system(movement)
+    world.add_system(bounce)
+    sprites = [Sprite(SHIP, priority) for priority in (1, 2, 3)]
+    for _ in range(count):
+        world.spawn(position=random_position(rng), velocity=random_velocity(rng, 30),
+                    sprite=rng.choice(sprites))
+
+
+def particles(game: Game, rng: random.Random, count: int = 20000):
+    """A large particle emitter constantly re-emitting."""
+    emitter = game.add_emitter(ParticleEmitter(capacity=count, acceleration=Vector(0, 10)))
+
+    def emit(dt: float):
+        room = emitter.capacity - len(emitter)
+        if room:
+            emitter.burst(random_position(rng), room, speed=40, lifetime=rng.uniform(0.5, 2.0), glyphs="*.+")
+    game.update_hook = emit
+
+
+def tilemap_scroll(game: Game, rng: random.Random, screens: int = 200):
+    """A starfield tilemap `screens` screens wide, loaded lazily while the camera pans."""
+    glyphs = "     .:*+"
+    seed = rng.random()
+
+    def load(cx: int, cy: int):
+        if not 0 <= cx * 64 < SIZE_X * screens or not 0 <= cy * 32 < SIZE_Y:
+            return None
+        chunk = random.Random(f"{seed}:{cx}:{cy}")
+        return '\n'.join(''.join(chunk.choice(glyphs) for _ in range(64)) for _ in range(32))
+    game.add_tilemap(TileMap(load, chunk_size=(64, 32), max_chunks=64))
+    for _ in range(20):
+        game.add_entity(Static(game, random_position(rng))).sprite = Sprite(SHIP)
+
+    def pan(dt: float):
+        game.camera.position = Vector((game.camera.position.x + 3) % (SIZE_X * (screens - 1)), 0)
+    game.update_hook = pan
+
+
+SCENARIOS: dict[str, Callable[[Game, random.Random], None]] = {
+    'static_entities': static_entities,
+    'moving_entities': moving_entities,
+    'colored_entities': colored_entities,
+    'full_scroll': full_scroll,
+    'hud_heavy': hud_heavy,
+    'large_sprites': large_sprites,
+    'entity_churn': entity_churn,
+    'ecs_entities': ecs_entities,
+    'particles': particles,
+    'tilemap_scroll': tilemap_scroll,
+}
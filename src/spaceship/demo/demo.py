@@ -4,7 +4,6 @@ from spaceship.game import Game
 from spaceship.render.camera import CameraMode
 from spaceship.render.entity import Entity
 from spaceship.render.hud import HUDAlignment, HUDElement
-from spaceship.utils.constants import SIZE_Y
 from spaceship.utils.math import Vector
 
 class Rock(Entity):
@@ -39,13 +38,13 @@ class Rock(Entity):
 			self.velocity += Vector(1, 0) * speed
 
 		self.velocity += Vector(0, 20) * dt
-		if self.position.y >= SIZE_Y - 2:
-			self.position.y = SIZE_Y - 2
+		floor = self.game.size[1] - 2
+		if self.position.y >= floor:
+			self.position.y = floor
 			self.velocity.y *= -1
 			self.bounce_hook()
 
-		self.vel_hud.set_value('x', str(int(self.velocity.x)))
-		self.vel_hud.set_value('y', str(int(self.velocity.y)))
+		self.vel_hud.set_values({'x': str(int(self.velocity.x)), 'y': str(int(self.velocity.y))})
 
 		self.position += self.velocity * dt
 
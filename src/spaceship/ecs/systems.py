@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import typing
+if typing.TYPE_CHECKING:
+    from ..ecs.world import World
+
+from ..render.framebuffer import np
+
+# Ready-made systems for `World.add_system`.
+
+
+def movement(world: World, dt: float):
+    """Integrate every row at once: position += velocity * dt."""
+    n = world.count
+    px, py = world.position.x, world.position.y
+    vx, vy = world.velocity.x, world.velocity.y
+    if np is not None:
+        px[:n] += vx[:n] * dt
+        py[:n] += vy[:n] * dt
+        return
+    for i in range(n):
+        px[i] += vx[i] * dt
+        py[i] += vy[i] * dt
+
+
+def expire(world: World, dt: float):
+    """
+    Count down the 'lifetime' float component (define it first) and kill
+    rows whose lifetime ran out. Rows without the component never expire.
+    """
+    n = world.count
+    life = world.lifetime
+    bit = world.bits['lifetime']
+    mask = world.mask
+    ids = world.ids
+    if np is not None:
+        timed = (mask[:n] & bit) != 0
+        life[:n][timed] -= dt
+        for row in np.flatnonzero(timed & (life[:n] <= 0)).tolist():
+            world.kill(int(ids[row]))
+        return
+    for i in range(n):
+        if mask[i] & bit:
+            life[i] -= dt
+            if life[i] <= 0:
+                world.kill(ids[i])
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Callable
+
+from ..render.framebuffer import np
+from ..render.sprite import Sprite
+from ..utils.math import Vector, VectorArray
+
+# Column kinds: how a component's values are stored
+VECTOR = 'vector'   # VectorArray (x and y float64 columns)
+FLOAT = 'float'     # float64 column
+INT = 'int'         # int64 column
+OBJECT = 'object'   # list of arbitrary Python objects
+
+# Default value of each column kind
+DEFAULTS = {VECTOR: Vector(), FLOAT: 0.0, INT: 0, OBJECT: None}
+
+
+class World:
+    """
+    Entities as rows of columnar component arrays (struct-of-arrays),
+    updated by systems instead of one `update` call per object.
+
+    An ECS entity is an integer id. Its components live at one row of
+    every column: `position` and `velocity` are VectorArrays, `sprite`
+    is an index into `sprites` (-1 = not drawn), and more columns can be
+    declared with `define`. Rows are kept packed in [0, count), so systems
+    work on slices such as `world.position.x[:world.count]`.
+
+    Once per fixed tick the game calls `update`, which runs every system
+    `system(world, dt)` in order. Spawns and kills made while systems run
+    are applied after the last one, so rows never move under a system.
+
+    The camera draws rows that have a sprite with the same sprites,
+    priorities and transparency as `Entity` subclasses. Sprites are
+    shared: thousands of rows can point at one Sprite.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        # Allocated rows; columns double in size when full
+        self.capacity = max(1, capacity)
+        # Number of live rows (they occupy [0, count))
+        self.count = 0
+
+        # Component columns by name, with their kind and default value
+        self.columns: dict[str, Any] = {}
+        self.kinds: dict[str, str] = {}
+        self.defaults: dict[str, Any] = {}
+        # Bit of each component in the `mask` column
+        self.bits: dict[str, int] = {}
+
+        # Entity id of each row, which components each row has, and the row of each id
+        self.ids = _column(INT, self.capacity)
+        self.mask = _column(INT, self.capacity)
+        self.rows: dict[int, int] = {}
+        self._next_id = 0
+
+        # Sprites drawn by rows (indexed by the `sprite` column) and their indices
+        self.sprites: list[Sprite] = []
+        self._sprite_index: dict[int, int] = {}
+
+        # Systems run by update(), in order
+        self.systems: list[Callable[[World, float], None]] = []
+
+        # Changes requested while systems run, applied at the end of update()
+        self.updating = False
+        self._spawned: list[tuple[int, dict]] = []
+        self._killed: list[int] = []
+
+        # Set when rows moved, spawned or died; cleared by the camera
+        self.dirty = False
+
+        self.define('position', VECTOR)
+        self.define('velocity', VECTOR)
+        self.define('sprite', INT, -1)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, entity: int) -> bool:
+        return entity in self.rows
+
+    def __getattr__(self, name: str):
+        """Columns are also attributes: `world.position`, `world.health`, ..."""
+        columns = self.__dict__.get('columns')
+        if columns is not None and name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    # --- Components ---
+    def define(self, name: str, kind: str = FLOAT, default: Any = None):
+        """
+        Declare a component column.
+
+        Args:
+            name (str): Component name, also used as an attribute (`world.<name>`),
+                so it cannot be the name of a World attribute or method.
+            kind (str): 'vector', 'float', 'int' or 'object'.
+            default: Value of rows spawned without this component, and of
+                the rows that already exist.
+        """
+        if name in self.columns:
+            raise ValueError(f"Component already defined: {name!r}")
+        if name in self.__dict__ or hasattr(type(self), name):
+            raise ValueError(f"Component name clashes with a World attribute: {name!r}")
+        if kind not in DEFAULTS:
+            raise ValueError(f"Unknown component kind: {kind!r}")
+        self.columns[name] = _column(kind, self.capacity)
+        self.kinds[name] = kind
+        self.defaults[name] = DEFAULTS[kind] if default is None else default
+        self.bits[name] = 1 << len(self.bits)
+        for row in range(self.count):
+            self._write(row, name, self.defaults[name])
+
+    def query(self, *components: str):
+        """
+        Return the rows having every one of `components`, as an int array
+        with NumPy (usable as a fancy index) and a list otherwise.
+        """
+        bits = 0
+        for name in components:
+            bits |= self.bits[name]
+        n = self.count
+        if np is not None:
+            mask = self.mask[:n]
+            return np.flatnonzero((mask & bits) == bits)
+        mask = self.mask
+        return [row for row in range(n) if mask[row] & bits == bits]
+
+    def has(self, entity: int, component: str) -> bool:
+        """Whether a live entity has a component."""
+        return bool(self.mask[self.rows[entity]] & self.bits[component])
+
+    def get(self, entity: int, component: str):
+        """Return one component of a live entity (a new Vector for vector columns)."""
+        row = self.rows[entity]
+        if component == 'sprite':
+            index = self.columns['sprite'][row]
+            return self.sprites[index] if index >= 0 else None
+        value = self.columns[component][row]
+        if self.kinds[component] == FLOAT:
+            return float(value)
+        if self.kinds[component] == INT:
+            return int(value)
+        return value
+
+    def set(self, entity: int, component: str, value: Any):
+        """Set one component of a live entity and mark the entity as having it."""
+        row = self.rows[entity]
+        self._write(row, component, value)
+        self.mask[row] |= self.bits[component]
+        self.dirty = True
+
+    def unset(self, entity: int, component: str):
+        """Reset one component of a live entity to its default and mark it as missing."""
+        row = self.rows[entity]
+        self._write(row, component, self.defaults[component])
+        self.mask[row] &= ~self.bits[component]
+        self.dirty = True
+
+    # --- Entities ---
+    def spawn(self, **components) -> int:
+        """
+        Create an entity and return its id. Keyword arguments set its
+        components, e.g. `spawn(position=Vector(1, 2), sprite=bullet)`.
+        While systems run, the row is added once they are done.
+        """
+        for name in components:
+            if name not in self.columns:
+                raise KeyError(f"Unknown component: {name!r}")
+        entity = self._next_id
+        self._next_id += 1
+        if self.updating:
+            self._spawned.append((entity, components))
+        else:
+            self._insert(entity, components)
+        return entity
+
+    def kill(self, entity: int):
+        """
+        Remove an entity (O(number of columns)). While systems run, the row
+        is removed once they are done. Killing a dead entity does nothing.
+        """
+        if self.updating:
+            self._killed.append(entity)
+        elif entity in self.rows:
+            self._remove(self.rows[entity])
+
+    def alive(self, entity: int) -> bool:
+        """Whether the entity exists (and has not been killed)."""
+        return entity in self.rows
+
+    def clear(self):
+        """Remove every entity."""
+        for name, column in self.columns.items():
+            if self.kinds[name] == OBJECT:
+                column[:self.count] = [None] * self.count
+        self.rows.clear()
+        self.count = 0
+        self.dirty = True
+
+    # --- Systems ---
+    def add_system(self, system: Callable[[World, float], None]) -> Callable[[World, float], None]:
+        """Append a system `system(world, dt)`; usable as a decorator."""
+        self.systems.append(system)
+        return system
+
+    def remove_system(self, system: Callable[[World, float], None]):
+        self.systems.remove(system)
+
+    def update(self, dt: float):
+        """Run every system, then apply the spawns and kills they requested."""
+        if self.systems:
+            self.updating = True
+            try:
+                for system in self.systems:
+                    system(self, dt)
+            finally:
+                self.updating = False
+                self._apply()
+            # Systems write columns directly, so assume something changed
+            self.dirty = True
+        else:
+            self._apply()
+
+    def _apply(self):
+        """Apply the spawns and kills deferred while systems ran."""
+        killed = set(self._killed)
+        if self._spawned:
+            # Entities spawned and killed in the same update never get a row
+            for entity, components in self._spawned:
+                if entity not in killed:
+                    self._insert(entity, components)
+            self._spawned.clear()
+        if killed:
+            rows = self.rows
+            for entity in killed:
+                row = rows.get(entity)
+                if row is not None:
+                    self._remove(row)
+            self._killed.clear()
+
+    # --- Rendering ---
+    def sprite_index(self, sprite: Sprite) -> int:
+        """Return the `sprite` column value that draws `sprite`, registering it if needed."""
+        index = self._sprite_index.get(id(sprite))
+        if index is None:
+            index = self._sprite_index[id(sprite)] = len(self.sprites)
+            self.sprites.append(sprite)
+        return index
+
+    # --- Internals ---
+    def _insert(self, entity: int, components: dict):
+        row = self.count
+        if row == self.capacity:
+            self._grow(self.capacity * 2)
+        self.count += 1
+        self.rows[entity] = row
+        self.ids[row] = entity
+
+        mask = 0
+        for name, column in self.columns.items():
+            if name in components:
+                self._write(row, name, components[name])
+                mask |= self.bits[name]
+            else:
+                self._write(row, name, self.defaults[name])
+        self.mask[row] = mask
+        self.dirty = True
+
+    def _remove(self, row: int):
+        """Swap the last row into `row` and drop the last row."""
+        last = self.count - 1
+        del self.rows[int(self.ids[row])]
+        if row != last:
+            moved = int(self.ids[last])
+            self.rows[moved] = row
+            self.ids[row] = moved
+            self.mask[row] = self.mask[last]
+            for name, column in self.columns.items():
+                if self.kinds[name] == VECTOR:
+                    column.x[row] = column.x[last]
+                    column.y[row] = column.y[last]
+                else:
+                    column[row] = column[last]
+        for name, column in self.columns.items():
+            if self.kinds[name] == OBJECT:
+                # Do not keep removed objects alive
+                column[last] = None
+        self.count = last
+        self.dirty = True
+
+    def _write(self, row: int, name: str, value: Any):
+        column = self.columns[name]
+        kind = self.kinds[name]
+        if kind == VECTOR:
+            column.x[row] = value.x
+            column.y[row] = value.y
+        elif name == 'sprite' and isinstance(value, Sprite):
+            column[row] = self.sprite_index(value)
+        else:
+            column[row] = value
+
+    def _grow(self, capacity: int):
+        """Reallocate every column with room for `capacity` rows."""
+        for name, column in self.columns.items():
+            kind = self.kinds[name]
+            if kind == VECTOR:
+                column.resize(capacity)
+            else:
+                self.columns[name] = _resized(column, kind, capacity)
+        self.ids = _resized(self.ids, INT, capacity)
+        self.mask = _resized(self.mask, INT, capacity)
+        self.capacity = capacity
+
+
+def _column(kind: str, size: int):
+    """Return a zero-filled column of the given kind."""
+    if kind == VECTOR:
+        return VectorArray(size)
+    if kind == OBJECT:
+        return [None] * size
+    if np is not None:
+        return np.zeros(size, dtype=np.float64 if kind == FLOAT else np.int64)
+    return array('d' if kind == FLOAT else 'q', bytes(8 * size))
+
+
+def _resized(column, kind: str, size: int):
+    """Return a copy of a (non-vector) column grown to `size` rows."""
+    new = _column(kind, size)
+    n = min(len(column), size)
+    new[:n] = column[:n]
+    return new
+
@@ -1,13 +1,27 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import os
+import shutil
 import time
-from typing import Callable
+from typing import Awaitable, Callable, Iterator
 
-from .utils.constants import SIZE_X, SIZE_Y
-from .render.camera import Camera
-from .input.input import Input
+from .utils import constants
+from .render.camera import Camera, merge_rects
+from .render.framebuffer import FrameBuffer
 from .utils.math import Vector
 from .render.render import Renderer
 from .render.entity import Entity
 from .render.hud import HUD
+from .render.particles import ParticleEmitter
+from .render.tilemap import TileMap
+from .render.viewport import Viewport
+from .utils.spatial import SpatialHash
+from .utils.store import EntityStore
+from .ecs.world import World
+from .physics.collision import CollisionSystem
+from .utils.profiler import FrameProfiler, no_phase
 
 class Game:
     """Main game loop and entity manager."""
@@ -17,20 +31,71 @@ class Game:
         init_hook: Callable[[], None] = lambda: None,
         update_hook: Callable[[float], None] = lambda dt: None,
         resize_hook: Callable[[tuple[int, int]], None] = lambda size: None,
+        renderer=None,
+        input=None,
+        profiler: FrameProfiler | None = None,
+        target_fps: float | None = 60.0,
+        size: tuple[int, int] | None = None,
+        auto_fit: bool = False,
     ):
-        # Active game entities
-        self.entities: list[Entity] = []
+        """
+        Args:
+            renderer: Output backend. Defaults to a terminal `Renderer`; pass a
+                `HeadlessRenderer` to run without a TTY or output cost.
+            input: Input backend, or the name of one: 'pynput' (global keyboard
+                via `pynput`) or 'terminal' (raw stdin, works over SSH).
+                Defaults to 'pynput' when it can be imported, else 'terminal'.
+                Pass a `ScriptedInput` to drive the game from code.
+            profiler: Optional `FrameProfiler` recording per-phase timings.
+            target_fps: Maximum render rate of `run()`. None renders after
+                every fixed update that changed something.
+            size: Playfield size in cells (width, height). Defaults to
+                `constants.SIZE_X` x `constants.SIZE_Y` as they are when the
+                game is created; change it later with `set_size`.
+            auto_fit: Size the playfield to fill the terminal (around the
+                margins and HUD), at start and whenever the terminal is resized.
+        """
+        # Spatial index of entities by world-space sprite bounds
+        self.spatial = SpatialHash()
+        # Active game entities; additions and removals during a tick apply at its end
+        self.entities = EntityStore(self.spatial)
+        # Particle emitters, integrated every fixed tick and drawn by the camera
+        self.emitters: list[ParticleEmitter] = []
+        # ECS worlds, whose systems run every fixed tick and whose rows the camera draws
+        self.worlds: list[World] = []
+        # Static background layers drawn under everything else, in order
+        self.tilemaps: list[TileMap] = []
 
         # User-defined hooks
         self.init_hook: Callable[[], None] = init_hook
         self.update_hook: Callable[[float], None] = update_hook
         self.resize_hook: Callable[[tuple[int, int]], None] = resize_hook
 
+        # Playfield size in cells, shared by the renderer, camera and HUD
+        width, height = size if size is not None else (constants.SIZE_X, constants.SIZE_Y)
+        self._size = (width, height)
+        self._display_size = Vector(width, height)
+        self.auto_fit = auto_fit
+
         # Initialize core subsystems
-        self.renderer = Renderer()
-        self.input = Input()
+        self.renderer = renderer if renderer is not None else Renderer(size=self._size)
+        self.renderer.resize(width, height)
+        if input is None or isinstance(input, str):
+            input = create_input(input)
+        self.input = input
         self.camera = Camera()
-        self.hud = HUD()
+        self.camera.size = Vector(width, height)
+        self.hud = HUD(width=width)
+        # Viewports drawn instead of `camera` when there are any (split screen, minimaps),
+        # the playfield-sized frame they are pasted into, and its last layout
+        self.viewports: list[Viewport] = []
+        self._screen: FrameBuffer | None = None
+        self._layout: tuple = ()
+        # Entities overlapping each viewport, from the last cull
+        self._viewport_entities: list[list[Entity]] = []
+        self.collisions = CollisionSystem()
+        # Opt-in instrumentation; None keeps the loop free of timing overhead
+        self.profiler = profiler
 
         # Initial terminal setup
         self.renderer.update_full()
@@ -41,77 +106,503 @@ class Game:
         self._prev_t = time.perf_counter()  # high-resolution clock
         self._max_frame = 0.25              # clamp huge spikes (seconds)
         self._max_updates_per_frame = 10    # avoid spiral of death
+        self._started = False               # init_hook has been called
+
+        # Frame pacing state
+        self.target_fps = target_fps        # render rate cap (None = uncapped)
+        self.spin_margin = 0.0              # busy-wait the last seconds of a sleep (coarse OS timers)
+        self._last_render = float('-inf')   # when run() last rendered
+        self._redraw = True                 # force the next frame (resize, request_redraw)
+        self._hud_state = None              # HUD snapshot of the last rendered frame
 
     # --- Main Loop ---
 
     def _fixed_update(self, dt: float) -> None:
         """Fixed update for logic and physics."""
+        for awaitable in self._tick(dt):
+            _reject(awaitable)
+
+    def _tick(self, dt: float) -> Iterator[Awaitable]:
+        """
+        Run one fixed update, yielding whatever the update hook or an
+        entity's update returns that has to be awaited (async hooks).
+        The caller awaits each one before the update continues.
+        """
+        profiler = self.profiler
+        phase = profiler.phase if profiler is not None else no_phase
+        if profiler is not None:
+            profiler.begin_tick()
+
+        # Spawns and kills made during the tick take effect at its end
+        entities = self.entities
+        entities.deferring = True
+        try:
+            yield from self._tick_phases(dt, phase)
+        finally:
+            entities.deferring = False
+            entities.flush()
+
+        if profiler is not None:
+            profiler.end_tick()
+
+    def _tick_phases(self, dt: float, phase: Callable) -> Iterator[Awaitable]:
+        """The phases of a fixed update, in order (see `_tick`)."""
+        profiler = self.profiler
+
+        with phase('input'):
+            self.input.update(dt)
+        with phase('update_hook'):
+            result = self.update_hook(dt)
+            if result is not None and inspect.isawaitable(result):
+                yield result
+
+        # The store is not modified until the end of the tick, so no copy is needed
+        with phase('entities'):
+            clock = time.perf_counter
+            for entity in self.entities:
+                if profiler is not None:
+                    start = clock()
+                result = entity.update(dt)
+                if result is not None and inspect.isawaitable(result):
+                    yield result
+                if profiler is not None:
+                    profiler.record_entity(entity, clock() - start)
+
+        with phase('systems'):
+            for world in self.worlds:
+                world.update(dt)
+
+        with phase('emitters'):
+            for emitter in self.emitters:
+                emitter.update(dt)
+
+        # Deliver this tick's contacts to entities that are still alive
+        with phase('collisions'):
+            self.collisions.update(self.entities, self.entities.is_alive)
+
+    def _render(self, updates: int = 1, skipped: int = 0, visible: list[Entity] | None = None) -> None:
+        """
+        As fast as possible render for drawing.
+
+        Args:
+            updates (int): Fixed updates run since the last frame (for the profiler).
+            skipped (int): Fixed updates held back by the per-frame cap (for the profiler).
+            visible (list[Entity] | None): Entities overlapping the view, if already culled.
+        """
+        profiler = self.profiler
+        phase = profiler.phase if profiler is not None else no_phase
+        if profiler is not None:
+            profiler.begin_frame()
+
+        # Compose the whole frame and flush it once
+        self.renderer.begin_frame()
+
+        with phase('hud'):
+            rendered_top_hud = self.hud.render_top()
+            self.renderer.draw_hud_top(rendered_top_hud)
+
+        # Only composite entities overlapping the view
+        display_size = self._display_size
+        if visible is None:
+            with phase('cull'):
+                visible = self._cull(display_size)
+        with phase('composite'):
+            if self.viewports:
+                rendered_grid, regions = self._composite_viewports(visible)
+            else:
+                if self._layout:
+                    # Back from viewports, which consumed the change flags: redraw everything
+                    self._layout = ()
+                    self.camera.framebuffer = None
+                rendered_grid = self.camera.get_framebuffer(display_size, visible, self.emitters, self.worlds,
+                                                            self.tilemaps)
+                regions = self.camera.dirty_regions
+        with phase('diff'):
+            self.renderer.draw_diff(self.hud.top_buffer, rendered_grid, regions)
 
-        self.update_hook(dt)
+        with phase('hud'):
+            rendered_bottom_hud = self.hud.render_bottom()
+            self.renderer.draw_hud_bottom(self.hud.top_buffer, rendered_bottom_hud)
 
-        # Loop over a hard copy of entities
-        for entity in list(self.entities):
-            entity.update(dt)
+        with phase('write'):
+            self.renderer.end_frame()
 
-    def _render(self) -> None:
-        """As fast as possible render for drawing."""
+        self._redraw = False
+        self._hud_state = self.hud.get_state()
+
+        if profiler is not None:
+            profiler.end_frame(updates, skipped, self.renderer.changed_cells, self.renderer.bytes_written)
+
+    def _cull(self, display_size: Vector) -> list[Entity]:
+        """
+        Return the entities overlapping the camera view. With viewports, the
+        spatial index is queried once for the area all of them cover, and
+        the entities of each viewport are picked from that list.
+        """
+        if not self.viewports:
+            # A viewport of the camera may have sized it to itself
+            if self.camera.size != display_size:
+                self.camera.size = Vector(display_size.x, display_size.y)
+            return self.spatial.query_rect(*self.camera.get_view_bounds(display_size))
+
+        views = [viewport.get_view_bounds() for viewport in self.viewports]
+        union = (min(view[0] for view in views), min(view[1] for view in views),
+                 max(view[2] for view in views), max(view[3] for view in views))
+        visible = self.spatial.query_rect(*union)
+        bounds = self.spatial.bounds
+        self._viewport_entities = [
+            visible if view == union else
+            [entity for entity in visible if _overlaps(bounds(entity), view)]
+            for view in views
+        ]
+        return visible
+
+    def _needs_render(self, visible: list[Entity]) -> bool:
+        """Return whether the next frame would differ from the last one drawn."""
+        if self._redraw or self.hud.get_state() != self._hud_state:
+            return True
+        if self._layout != self._viewport_layout():
+            return True
+        if not self.viewports:
+            return self.camera.needs_redraw(self._display_size, visible, self.emitters, self.worlds,
+                                            self.tilemaps)
+        return any(viewport.needs_redraw(entities, self.emitters, self.worlds, self.tilemaps)
+                   for viewport, entities in zip(self.viewports, self._viewport_entities))
+
+    def _composite_viewports(self, visible: list[Entity]) -> tuple[FrameBuffer, list | None]:
+        """
+        Render the viewports that changed and paste their changed rectangles
+        into the playfield frame, in order (later viewports on top).
+        Returns the frame and its dirty rectangles (None = everything).
+        """
+        width, height = self._size
+        screen = self._screen
+        layout = self._viewport_layout()
+        full = screen is None or (screen.width, screen.height) != (width, height) or layout != self._layout
+        if full:
+            if screen is None or (screen.width, screen.height) != (width, height):
+                screen = self._screen = FrameBuffer(width, height)
+            else:
+                screen.clear()
+            self._layout = layout
+
+        layers = (self.emitters, self.worlds, self.tilemaps)
+        regions = []
+        for i, (viewport, entities) in enumerate(zip(self.viewports, self._viewport_entities)):
+            # A viewport whose camera sees no change costs nothing
+            if not full and not viewport.needs_redraw(entities, *layers):
+                continue
+            viewport.render(entities, *layers)
+            changed = viewport.dirty_regions
+            if full or changed is None:
+                changed = [(0, 0, viewport.width, viewport.height)]
+            for x0, y0, x1, y1 in changed:
+                rect = (x0 + viewport.x, y0 + viewport.y, x1 + viewport.x, y1 + viewport.y)
+                # Paste the area, then whatever later viewports cover of it
+                for above in self.viewports[i:]:
+                    frame = above.frame
+                    ax0, ay0, ax1, ay1 = above.rect
+                    ix0, iy0 = max(rect[0], ax0), max(rect[1], ay0)
+                    ix1, iy1 = min(rect[2], ax1), min(rect[3], ay1)
+                    if frame is not None and ix0 < ix1 and iy0 < iy1:
+                        screen.paste(frame, above.x, above.y, (ix0 - ax0, iy0 - ay0, ix1 - ax0, iy1 - ay0))
+                regions.append(rect)
+
+        # Every viewport saw the change flags; clear them once
+        Camera.clear_flags(visible, *layers)
+        return screen, (None if full else merge_rects(regions, width, height))
+
+    def _viewport_layout(self) -> tuple:
+        return tuple((id(viewport), viewport.rect, viewport.scale) for viewport in self.viewports)
+
+    # --- Playfield Size ---
+    @property
+    def size(self) -> tuple[int, int]:
+        """Playfield size in cells (width, height)."""
+        return self._size
+
+    def set_size(self, width: int, height: int) -> None:
+        """
+        Resize the playfield. The renderer, camera and HUD follow; the
+        frame buffers are reallocated and the screen redrawn in full on the
+        next frame. Setting the current size does nothing.
+        """
+        if (width, height) == self._size:
+            return
+        self.renderer.resize(width, height)
+        self._size = (width, height)
+        self._display_size = Vector(width, height)
+        self.camera.size = Vector(width, height)
+        self.hud.width = width
+        self._redraw = True
+
+    def fit_to_terminal(self, terminal_size: os.terminal_size | None = None) -> None:
+        """
+        Size the playfield to fill the terminal, leaving room for the
+        margins and the top and bottom HUD rows.
+        """
+        if terminal_size is None:
+            terminal_size = shutil.get_terminal_size()
+        width = (terminal_size.columns - constants.LEFT_MARGIN - constants.RIGHT_MARGIN) // constants.CELL_WIDTH
+        height = (terminal_size.lines - constants.TOP_MARGIN
+                  - self.hud.top_buffer - len(self.hud.bottom_huds))
+        self.set_size(max(1, width), max(1, height))
+
+    def _check_resize(self) -> None:
+        """Handle a terminal resize flagged by the renderer, if any."""
         size = self.renderer.check_resize()
-        if size:
-            self.resize_hook(size)
-        
-        rendered_top_hud = self.hud.render_top()
-        self.renderer.draw_hud_top(rendered_top_hud)
+        if not size:
+            return
+        if self.auto_fit:
+            self.fit_to_terminal(size)
+        self.resize_hook(size)
+        self._redraw = True
 
-        rendered_grid = self.camera.get_render(Vector(SIZE_X, SIZE_Y), self.entities)
-        self.renderer.draw_diff(self.hud.top_buffer, rendered_grid)
+    def request_redraw(self) -> None:
+        """
+        Force the next frame to be drawn. Only needed after changes the
+        engine cannot see, e.g. mutating a sprite's compiled data in place.
+        """
+        self._redraw = True
 
-        rendered_bottom_hud = self.hud.render_bottom()
-        self.renderer.draw_hud_bottom(self.hud.top_buffer, rendered_bottom_hud)
+    def _sleep_until(self, deadline: float) -> None:
+        """Sleep until `deadline` (a perf_counter time), spinning for the last `spin_margin` seconds."""
+        remaining = deadline - time.perf_counter() - self.spin_margin
+        if remaining > 0:
+            time.sleep(remaining)
+        while time.perf_counter() < deadline:
+            pass
 
     # --- Entity Management ---
     def add_entity(self, entity: Entity) -> Entity:
-        """Add a new entity to the game world."""
-        self.entities.append(entity)
+        """
+        Add a new entity to the game world. During a fixed update it is
+        updated and drawn from the next tick on.
+        """
+        self.entities.add(entity)
         return entity
 
     def remove_entity(self, entity: Entity):
-        """Remove an entity from the game world."""
+        """
+        Remove an entity from the game world (O(1)). It disappears from
+        queries, collisions and its handle at once. Removing an entity
+        that is not in the game does nothing.
+        """
         self.entities.remove(entity)
 
+    def add_emitter(self, emitter: ParticleEmitter) -> ParticleEmitter:
+        """Add a particle emitter to the game world."""
+        self.emitters.append(emitter)
+        return emitter
+
+    def remove_emitter(self, emitter: ParticleEmitter):
+        """Remove a particle emitter from the game world."""
+        self.emitters.remove(emitter)
+
+    def add_world(self, world: World) -> World:
+        """Add an ECS world: its systems run after entity updates every fixed tick."""
+        self.worlds.append(world)
+        return world
+
+    def remove_world(self, world: World):
+        """Remove an ECS world from the game."""
+        self.worlds.remove(world)
+
+    def add_viewport(self, viewport: Viewport) -> Viewport:
+        """
+        Add a viewport, drawn over the viewports added before it. While there
+        are viewports, they are drawn instead of `camera` (add a viewport
+        for `camera` to keep it on screen).
+        """
+        self.viewports.append(viewport)
+        return viewport
+
+    def remove_viewport(self, viewport: Viewport):
+        """Remove a viewport; without viewports, `camera` fills the playfield again."""
+        self.viewports.remove(viewport)
+
+    def add_tilemap(self, tilemap: TileMap) -> TileMap:
+        """Add a background tilemap, drawn above the tilemaps added before it."""
+        self.tilemaps.append(tilemap)
+        return tilemap
+
+    def remove_tilemap(self, tilemap: TileMap):
+        """Remove a background tilemap from the game."""
+        self.tilemaps.remove(tilemap)
+
+    # --- Spatial Queries ---
+    def query_rect(self, x0: float, y0: float, x1: float, y1: float) -> list[Entity]:
+        """Return the entities whose sprite bounds overlap a world-space rectangle."""
+        return self.spatial.query_rect(x0, y0, x1, y1)
+
+    def query_radius(self, center: Vector, radius: float) -> list[Entity]:
+        """Return the entities whose sprite bounds come within `radius` of `center`."""
+        return self.spatial.query_radius(center, radius)
+
+    def _start(self) -> None:
+        """Clear the screen and call init_hook, once."""
+        if not self._started:
+            self._started = True
+            self.renderer.update_full()
+            self.init_hook()
+            # Fit once the init hook has set up the HUD
+            if self.auto_fit:
+                self.fit_to_terminal()
+
+    def simulate(self, ticks: int, render: bool = True) -> None:
+        """
+        Advance the game by `ticks` fixed updates as fast as possible,
+        ignoring the real-time clock. Useful for headless simulations,
+        tests and benchmarks.
+
+        Args:
+            ticks (int): Number of fixed updates to run.
+            render (bool): Render a frame after every update.
+        """
+        self._start()
+        for _ in range(ticks):
+            self._fixed_update(self.fixed_dt)
+            if render:
+                self._check_resize()
+                self._render()
+
+    def _loop(self) -> Iterator[float | Awaitable]:
+        """
+        The main loop shared by `run` and `run_async`. Yields awaitables
+        returned by async hooks, and perf_counter deadlines to sleep until.
+        """
+        # Fixed updates since the last rendered frame
+        pending = 0
+
+        while True:
+            # Fixed timestep logic
+            now = time.perf_counter()
+            frame_time = now - self._prev_t
+            self._prev_t = now
+
+            # Clamp to avoid huge catch-ups (e.g., after a debugger pause)
+            if frame_time > self._max_frame:
+                frame_time = self._max_frame
+
+            # Accumulate elapsed time
+            self._acc += frame_time
+
+            # Do as many fixed updates as needed this frame (but not too many)
+            updates = 0
+            while self._acc >= self.fixed_dt and updates < self._max_updates_per_frame:
+                yield from self._tick(self.fixed_dt)
+                self._acc -= self.fixed_dt
+                updates += 1
+                # Let other work run between catch-up updates (no sleep when synchronous)
+                yield now
+            pending += updates
+
+            # Updates that were due but held back by the cap
+            skipped = int(self._acc / self.fixed_dt)
+
+            self._check_resize()
+
+            # Render once the frame interval has passed, if anything changed
+            interval = 1.0 / self.target_fps if self.target_fps else 0.0
+            render_due = self._last_render + interval
+            next_tick = now + self.fixed_dt - self._acc
+            if now >= render_due:
+                visible = self._cull(self._display_size)
+                if self._needs_render(visible):
+                    self._render(pending, skipped, visible)
+                    self._last_render = now
+                    pending = 0
+                wake = next_tick
+            else:
+                wake = min(next_tick, render_due)
+
+            # Nothing changes until the next update or frame is due
+            yield wake
+
     def run(self):
-        """Run the main game loop until interrupted."""
+        """
+        Run the main game loop until interrupted.
+
+        Fixed updates run at `1 / fixed_dt` Hz. A frame is drawn at most
+        `target_fps` times per second, and only when something visible
+        changed. Between deadlines the loop sleeps until the next fixed
+        update or render is due, so an idle game uses almost no CPU.
+        """
         # Clear screen and call init_hook
-        self.renderer.update_full()
-        self.init_hook()
+        self._start()
 
         try:
-            while True:
-                # Fixed timestep logic
-                now = time.perf_counter()
-                frame_time = now - self._prev_t
-                self._prev_t = now
-
-                # Clamp to avoid huge catch-ups (e.g., after a debugger pause)
-                if frame_time > self._max_frame:
-                    frame_time = self._max_frame
-
-                # Accumulate elapsed time
-                self._acc += frame_time
-
-                # Do as many fixed updates as needed this frame (but not too many)
-                updates = 0
-                while self._acc >= self.fixed_dt and updates < self._max_updates_per_frame:
-                    self._fixed_update(self.fixed_dt)
-                    self._acc -= self.fixed_dt
-                    updates += 1
-
-                # Rendering is done always
-                self._render()
+            for item in self._loop():
+                if isinstance(item, float):
+                    self._sleep_until(item)
+                else:
+                    _reject(item)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.input.close()
+            self.renderer.clear_screen()
+            self.renderer.close()
+            print("Shutting down...")
+
+    async def run_async(self):
+        """
+        Run the main game loop as a coroutine on the current event loop,
+        with the same fixed timestep, frame pacing and update cap as `run`.
+
+        Instead of sleeping, the loop awaits the next deadline, so other
+        tasks (network I/O, bots) run between updates and frames on the
+        same thread. The update hook and entity `update` methods may be
+        coroutine functions; each one is awaited before the update goes
+        on. Cancel the task to stop the game.
+        """
+        # Clear screen and call init_hook
+        self._start()
 
-                # To prevent overuse of resources
-                time.sleep(0.001)
+        try:
+            for item in self._loop():
+                if isinstance(item, float):
+                    await asyncio.sleep(max(0.0, item - time.perf_counter()))
+                else:
+                    await item
         except KeyboardInterrupt:
             pass
         finally:
+            self.input.close()
             self.renderer.clear_screen()
-            print("Shutting down...")
\ No newline at end of file
+            self.renderer.close()
+            print("Shutting down...")
+
+
+def create_input(name: str | None = None):
+    """
+    Create an input backend by name: 'pynput', 'terminal', or None for
+    'pynput' when it is importable and 'terminal' otherwise. Backends are
+    imported here, so pynput is only loaded (and its listener thread only
+    started) when it is the backend in use.
+    """
+    if name is None:
+        try:
+            from .input.input import Input
+        except ImportError:
+            name = 'terminal'
+        else:
+            return Input()
+    if name == 'pynput':
+        from .input.input import Input
+        return Input()
+    if name == 'terminal':
+        from .input.terminal import TerminalInput
+        return TerminalInput()
+    raise ValueError(f"Unknown input backend: {name!r}")
+
+
+def _overlaps(a: tuple[float, float, float, float], b: tuple[float, float, float, float]) -> bool:
+    return a[0] < b[2] and a[1] < b[3] and a[2] > b[0] and a[3] > b[1]
+
+
+def _reject(awaitable: Awaitable):
+    """Fail on an async hook outside `run_async`, without a 'never awaited' warning."""
+    if inspect.iscoroutine(awaitable):
+        awaitable.close()
+    raise TypeError("an update returned an awaitable; async hooks need Game.run_async()")
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from operator import itemgetter
+from typing import Hashable, Iterable
+
+from ..input.state import InputState
+
+class ScriptedInput(InputState):
+    """
+    Input source driven by code instead of a keyboard, with the same
+    query and hook API as `Input`.
+
+    Keys are plain strings for characters (e.g. 'w') or any hashable
+    value for special keys. Events can be injected with `press`/`release`,
+    or scheduled up front as (time in seconds, 'press' | 'release', key)
+    tuples that are applied as game time advances. Like keyboard events,
+    they take effect at the start of the next fixed tick.
+    """
+    def __init__(self, script: Iterable[tuple[float, str, Hashable]] = ()):
+        super().__init__()
+
+        # Game time elapsed, advanced by update()
+        self.time = 0.0
+        # Pending scripted events, in time order
+        self._script = sorted(script, key=itemgetter(0))
+        self._next = 0
+
+    def update(self, dt: float):
+        """Advance the clock by `dt`, then apply injected and scripted events now due."""
+        self.time += dt
+        while self._next < len(self._script) and self._script[self._next][0] <= self.time:
+            _, action, key = self._script[self._next]
+            self._next += 1
+            if action == 'press':
+                self.press(key)
+            elif action == 'release':
+                self.release(key)
+            else:
+                raise ValueError(f"Unknown scripted input action: {action!r}")
+        super().update(dt)
+
+    def press(self, key: Hashable):
+        """Press `key` at the next tick."""
+        self.queue_press(self.time, key, key if isinstance(key, str) else None)
+
+    def release(self, key: Hashable):
+        """Release `key` at the next tick."""
+        self.queue_release(self.time, key, key if isinstance(key, str) else None)
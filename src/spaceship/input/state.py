@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Hashable, NamedTuple
+
+
+class KeyEvent(NamedTuple):
+    """A buffered key press or release."""
+    # When the event happened (clock of the input backend, in seconds)
+    time: float
+    # True for a press, False for a release
+    pressed: bool
+    # Backend key object
+    key: Hashable
+    # Character the key produced, or None for special keys
+    char: str | None
+
+
+class InputState:
+    """
+    Key state shared by the input backends.
+
+    Backends report events from any thread with `queue_press` and
+    `queue_release`; events are buffered under a lock. Once per fixed
+    tick the game thread calls `update`, which applies the buffered events
+    in order, so during a tick the key state never changes underneath
+    game code. Hooks also run on the game thread, from `update`.
+
+    Held keys and characters are kept in sets for O(1) queries, and the
+    transitions of the current tick can be queried with `was_*_pressed`
+    and `was_*_released`.
+    """
+    def __init__(self) -> None:
+        # Keys and characters currently held down
+        self.held_keys = set()
+        self.held_chars = set()
+
+        # Transitions applied by the last update (this tick)
+        self.pressed_keys = set()
+        self.released_keys = set()
+        self.pressed_chars = set()
+        self.released_chars = set()
+        # Events applied by the last update, in order
+        self.events: list[KeyEvent] = []
+
+        self.on_press_hooks = set()
+        self.on_release_hooks = set()
+
+        # Character each held key produced when pressed, so releases
+        # clear the right character even if modifiers changed meanwhile
+        self._key_chars: dict[Hashable, str | None] = {}
+
+        # Events reported since the last update, possibly from another thread
+        self._lock = threading.Lock()
+        self._queue: list[KeyEvent] = []
+
+    # --- Event intake (any thread) ---
+    def queue_press(self, time: float, key: Hashable, char: str | None = None):
+        """Buffer a key press, applied by the next `update`."""
+        with self._lock:
+            self._queue.append(KeyEvent(time, True, key, char))
+
+    def queue_release(self, time: float, key: Hashable, char: str | None = None):
+        """Buffer a key release, applied by the next `update`."""
+        with self._lock:
+            self._queue.append(KeyEvent(time, False, key, char))
+
+    # --- Tick processing (game thread) ---
+    def update(self, dt: float):
+        """Apply the events buffered since the last tick and run hooks for them."""
+        with self._lock:
+            events, self._queue = self._queue, []
+
+        self.pressed_keys.clear()
+        self.released_keys.clear()
+        self.pressed_chars.clear()
+        self.released_chars.clear()
+        self.events = events
+
+        for event in events:
+            if event.pressed:
+                self._apply_press(event.key, event.char)
+            else:
+                self._apply_release(event.key)
+
+    def _apply_press(self, key: Hashable, char: str | None):
+        # Auto-repeat presses of a held key are not transitions, but still run hooks
+        if key not in self.held_keys:
+            self.held_keys.add(key)
+            self.pressed_keys.add(key)
+            self._key_chars[key] = char
+            if char is not None:
+                self.held_chars.add(char)
+                self.pressed_chars.add(char)
+        for function in list(self.on_press_hooks):
+            function(key)
+
+    def _apply_release(self, key: Hashable):
+        if key in self.held_keys:
+            self.held_keys.discard(key)
+            self.released_keys.add(key)
+            char = self._key_chars.pop(key, None)
+            # Another held key may still produce the same character
+            if char is not None and char not in self._key_chars.values():
+                self.held_chars.discard(char)
+                self.released_chars.add(char)
+        for function in list(self.on_release_hooks):
+            function(key)
+
+    def close(self):
+        """Release the backend's resources (threads, terminal modes). Called on game exit."""
+        pass
+
+    # --- Hooks ---
+    def hook_to_keypress(self, function: Callable[[Hashable], None]):
+        self.on_press_hooks.add(function)
+    def unhook_from_keypress(self, function: Callable[[Hashable], None]):
+        self.on_press_hooks.discard(function)
+
+    def hook_to_keyrelease(self, function: Callable[[Hashable], None]):
+        self.on_release_hooks.add(function)
+    def unhook_from_keyrelease(self, function: Callable[[Hashable], None]):
+        self.on_release_hooks.discard(function)
+
+    # --- Queries ---
+    def is_char_held(self, key: str) -> bool:
+        return key in self.held_chars
+
+    def is_key_held(self, key: Hashable) -> bool:
+        return key in self.held_keys
+
+    def was_char_pressed(self, key: str) -> bool:
+        """Whether the character went down this tick."""
+        return key in self.pressed_chars
+
+    def was_char_released(self, key: str) -> bool:
+        """Whether the character went up this tick."""
+        return key in self.released_chars
+
+    def was_key_pressed(self, key: Hashable) -> bool:
+        """Whether the key went down this tick."""
+        return key in self.pressed_keys
+
+    def was_key_released(self, key: Hashable) -> bool:
+        """Whether the key went up this tick."""
+        return key in self.released_keys
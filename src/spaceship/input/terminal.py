@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import atexit
+import codecs
+import os
+import re
+import selectors
+import signal
+import sys
+import time
+from enum import Enum
+from typing import Hashable, TextIO
+
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = None
+
+from ..input.state import InputState
+
+
+class Key(Enum):
+    """Special (non-character) keys reported by `TerminalInput`, named like pynput's."""
+    up = 'up'
+    down = 'down'
+    left = 'left'
+    right = 'right'
+    home = 'home'
+    end = 'end'
+    page_up = 'page_up'
+    page_down = 'page_down'
+    insert = 'insert'
+    delete = 'delete'
+    enter = 'enter'
+    tab = 'tab'
+    backspace = 'backspace'
+    esc = 'esc'
+    space = 'space'
+    shift = 'shift'
+    ctrl = 'ctrl'
+    alt = 'alt'
+    f1 = 'f1'
+    f2 = 'f2'
+    f3 = 'f3'
+    f4 = 'f4'
+    f5 = 'f5'
+    f6 = 'f6'
+    f7 = 'f7'
+    f8 = 'f8'
+    f9 = 'f9'
+    f10 = 'f10'
+    f11 = 'f11'
+    f12 = 'f12'
+
+
+# Single control bytes
+CONTROL_KEYS = {
+    '\r': Key.enter, '\n': Key.enter, '\t': Key.tab,
+    '\x7f': Key.backspace, '\x08': Key.backspace, ' ': Key.space,
+}
+
+# Final byte of CSI / SS3 sequences (e.g. ESC [ A, ESC O P)
+FINAL_KEYS = {
+    'A': Key.up, 'B': Key.down, 'C': Key.right, 'D': Key.left,
+    'H': Key.home, 'F': Key.end,
+    'P': Key.f1, 'Q': Key.f2, 'R': Key.f3, 'S': Key.f4,
+}
+
+# Number of `ESC [ n ~` sequences
+TILDE_KEYS = {
+    1: Key.home, 2: Key.insert, 3: Key.delete, 4: Key.end, 5: Key.page_up, 6: Key.page_down,
+    7: Key.home, 8: Key.end, 11: Key.f1, 12: Key.f2, 13: Key.f3, 14: Key.f4, 15: Key.f5,
+    17: Key.f6, 18: Key.f7, 19: Key.f8, 20: Key.f9, 21: Key.f10, 23: Key.f11, 24: Key.f12,
+}
+
+# Key codes of the kitty keyboard protocol (`ESC [ code u`) that are not characters
+KITTY_KEYS = {
+    27: Key.esc, 13: Key.enter, 9: Key.tab, 127: Key.backspace, 32: Key.space,
+    57441: Key.shift, 57447: Key.shift, 57442: Key.ctrl, 57448: Key.ctrl,
+    57443: Key.alt, 57449: Key.alt,
+}
+
+# Kitty keyboard protocol flags: disambiguate escape codes (1), report
+# event types (2), report alternate keys (4), report all keys as escape
+# codes (8). Without 8, presses of text keys arrive as text but their
+# releases as escape codes, so Shift+a would press 'A' and release 'a';
+# Enter/Tab/Backspace releases and modifier keys would not be reported.
+# With it Ctrl+C no longer raises SIGINT; `decode_sequence` does that
+KITTY_FLAGS = 1 | 2 | 4 | 8
+
+# Modifier bits of kitty sequences (the reported value is 1 + bits)
+KITTY_SHIFT = 1
+KITTY_ALT = 2
+KITTY_CTRL = 4
+
+# CSI sequence: parameters, intermediates, final byte
+CSI = re.compile(r'\x1b\[([0-?]*)([ -/]*)([@-~])')
+# SS3 sequence (application cursor / F1-F4 keys)
+SS3 = re.compile(r'\x1bO([@-~])')
+
+
+class KeyDecoder:
+    """
+    Incremental decoder turning terminal input into key events.
+
+    `feed` returns (kind, key, char) tuples where kind is 'press',
+    'repeat' or 'release'. Characters are their own key; special keys
+    are `Key` members. Legacy terminals only send presses (auto-repeat
+    arrives as more presses); with the kitty keyboard protocol enabled,
+    repeats and releases are reported too, and Ctrl+C (which the
+    terminal then no longer turns into SIGINT) is an 'interrupt' event.
+    """
+    def __init__(self):
+        # Undecoded input: an escape sequence split across reads
+        self.pending = ''
+
+    def feed(self, data: str) -> list[tuple[str, Hashable, str | None]]:
+        """Decode `data` (appended to any partial sequence left from before)."""
+        text = self.pending + data
+        self.pending = ''
+        events = []
+        i = 0
+        while i < len(text):
+            char = text[i]
+            if char != '\x1b':
+                key = CONTROL_KEYS.get(char)
+                if key is not None:
+                    events.append(('press', key, ' ' if key is Key.space else None))
+                elif char >= ' ':
+                    events.append(('press', char, char))
+                # Other control characters (Ctrl+letter) are ignored
+                i += 1
+                continue
+
+            if i + 1 == len(text):
+                # A lone ESC may be the start of a sequence still arriving
+                self.pending = text[i:]
+                break
+
+            match = CSI.match(text, i) or SS3.match(text, i)
+            if match is not None:
+                event = decode_sequence(match)
+                if event is not None:
+                    events.append(event)
+                i = match.end()
+            elif text[i + 1] == '[' or text[i + 1] == 'O':
+                if _incomplete(text[i:]):
+                    self.pending = text[i:]
+                    break
+                # Not a sequence after all: ESC followed by text
+                events.append(('press', Key.esc, None))
+                i += 1
+            elif text[i + 1] == '\x1b':
+                events.append(('press', Key.esc, None))
+                i += 1
+            else:
+                # Alt+key arrives as ESC + key; report the key
+                i += 1
+        return events
+
+    def flush(self) -> list[tuple[str, Hashable, str | None]]:
+        """
+        Resolve pending input once no more follows: a lone ESC is the Escape
+        key, and a sequence that never completed is dropped.
+        """
+        pending, self.pending = self.pending, ''
+        return [('press', Key.esc, None)] if pending == '\x1b' else []
+
+
+def _incomplete(text: str) -> bool:
+    """Whether `text` (starting with ESC [ or ESC O) could still become a full sequence."""
+    if text[1] == 'O':
+        return len(text) == 2
+    return re.fullmatch(r'\x1b\[[0-?]*[ -/]*', text) is not None
+
+
+def decode_sequence(match: re.Match) -> tuple[str, Hashable, str | None] | None:
+    """Decode one CSI or SS3 escape sequence into (kind, key, char), or None if unknown."""
+    groups = match.groups()
+    if len(groups) == 1:
+        # SS3: ESC O <final>
+        key = FINAL_KEYS.get(groups[0])
+        return ('press', key, None) if key is not None else None
+
+    params, _, final = groups
+    fields = [field.split(':') for field in params.split(';')] if params else [['']]
+
+    # Modifiers and event type: "mods[:event]" in the second field
+    kind = 'press'
+    if len(fields) > 1 and len(fields[1]) > 1 and fields[1][1]:
+        kind = {'1': 'press', '2': 'repeat', '3': 'release'}.get(fields[1][1], 'press')
+
+    if final == 'u':
+        # Kitty: ESC [ code[:shifted[:base]] ; mods[:event] ; text u
+        code_fields = fields[0]
+        if not code_fields[0].isdigit():
+            return None
+        code = int(code_fields[0])
+        key = KITTY_KEYS.get(code)
+        if key is not None:
+            return (kind, key, ' ' if key is Key.space else None)
+        if 57399 <= code <= 57408:
+            # Keypad digits
+            digit = str(code - 57399)
+            return (kind, digit, digit)
+        if code >= 57344 or code < 32:
+            return None
+        char = chr(code)
+        mods = int(fields[1][0]) - 1 if len(fields) > 1 and fields[1][0].isdigit() else 0
+        if mods & KITTY_CTRL and kind == 'press' and char == 'c':
+            # The terminal no longer turns Ctrl+C into SIGINT (see TerminalInput.update)
+            return ('interrupt', char, None)
+        if mods & (KITTY_CTRL | KITTY_ALT) and kind != 'release':
+            # Like legacy input, Ctrl/Alt+key is not the bare character. Releases
+            # still go through so a key held before the modifier is let go
+            return None
+        # Use the shifted character when shift is held and it was reported
+        if mods & KITTY_SHIFT and len(code_fields) > 1 and code_fields[1].isdigit():
+            return (kind, char, chr(int(code_fields[1])))
+        return (kind, char, char)
+
+    if final == '~':
+        number = fields[0][0]
+        key = TILDE_KEYS.get(int(number)) if number.isdigit() else None
+    else:
+        key = FINAL_KEYS.get(final)
+    return (kind, key, None) if key is not None else None
+
+
+class TerminalInput(InputState):
+    """
+    Keyboard input read from the terminal itself, for SSH sessions and
+    machines without a desktop session (where `pynput` does not work).
+
+    The TTY is put in cbreak mode (no echo, no line buffering; Ctrl+C
+    still interrupts) and stdin is polled without blocking at the start
+    of every fixed tick, so no thread is needed. Escape sequences for
+    arrows, navigation and function keys are decoded into `Key` members;
+    characters are their own key.
+
+    Terminals only report presses, so by default a key counts as released
+    once no press or auto-repeat arrived for `release_timeout` seconds
+    (set it just above the OS key-repeat delay). Terminals implementing
+    the kitty keyboard protocol report real releases; it is enabled when
+    `kitty` is True and the terminal answers the protocol query.
+    """
+    def __init__(self, stream: TextIO | None = None, output: TextIO | None = None,
+                 kitty: bool = True, release_timeout: float = 0.5):
+        super().__init__()
+        self.stream = stream if stream is not None else sys.stdin
+        self.output = output if output is not None else sys.stdout
+        self.release_timeout = release_timeout
+        self.decoder = KeyDecoder()
+        # Keeps the bytes of a UTF-8 character split across reads until the rest arrives
+        self._utf8 = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        # When each held key was last pressed or repeated (timeout releases)
+        self._last_seen: dict[Hashable, float] = {}
+
+        self.fd = self.stream.fileno()
+        self._saved_mode = None
+        if self.stream.isatty():
+            if termios is None:
+                raise OSError("TerminalInput needs a POSIX terminal (termios)")
+            self._saved_mode = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd, termios.TCSANOW)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.fd, selectors.EVENT_READ)
+
+        # Whether the terminal reports key releases (kitty keyboard protocol)
+        self.kitty = kitty and self._saved_mode is not None and self._enable_kitty()
+
+        self._closed = False
+        atexit.register(self.close)
+
+    # --- Terminal setup ---
+    def _enable_kitty(self, timeout: float = 0.2) -> bool:
+        """
+        Ask the terminal whether it supports the kitty keyboard protocol and
+        enable it if so. A primary device attributes query follows the
+        protocol query; terminals answer it whether they support kitty or not.
+        """
+        self._write("\033[?u\033[c")
+        reply = ''
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            reply += self._read(max(0.0, deadline - time.perf_counter()))
+            if re.search(r'\x1b\[\?[\d;]*c', reply):
+                break
+        supported = re.search(r'\x1b\[\?\d+u', reply) is not None
+
+        # Keep any keys typed during the query
+        reply = re.sub(r'\x1b\[\?[\d;]*[uc]', '', reply)
+        if reply:
+            self.decoder.pending = reply
+
+        if supported:
+            self._write(f"\033[>{KITTY_FLAGS}u")
+        return supported
+
+    def close(self):
+        """Restore the terminal mode. Called by the game loop on exit."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.kitty:
+            self._write("\033[<u")
+        self.selector.close()
+        if self._saved_mode is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self._saved_mode)
+
+    def _write(self, text: str):
+        self.output.write(text)
+        self.output.flush()
+
+    def _read(self, timeout: float = 0.0) -> str:
+        """Read whatever input is available, waiting at most `timeout` seconds."""
+        chunks = []
+        # The descriptor stays blocking (stdout often shares its open file
+        # description); read only once the selector says input is there
+        while self.selector.select(timeout):
+            data = os.read(self.fd, 4096)
+            if not data:
+                break
+            chunks.append(data)
+            timeout = 0.0
+        return self._utf8.decode(b''.join(chunks))
+
+    # --- Tick processing ---
+    def update(self, dt: float):
+        """Read and decode pending terminal input, then apply it like any other backend."""
+        now = time.perf_counter()
+        data = self._read() if not self._closed else ''
+        events = self.decoder.feed(data) if data else self.decoder.flush()
+
+        for kind, key, char in events:
+            if kind == 'interrupt':
+                # Act like the terminal's own Ctrl+C
+                signal.raise_signal(signal.SIGINT)
+                continue
+            if kind == 'release':
+                self._last_seen.pop(key, None)
+                self.queue_release(now, key, char)
+            else:
+                self._last_seen[key] = now
+                self.queue_press(now, key, char)
+
+        # Without release events, keys that stopped repeating count as released
+        if not self.kitty:
+            for key, seen in list(self._last_seen.items()):
+                if now - seen >= self.release_timeout:
+                    del self._last_seen[key]
+                    self.queue_release(now, key)
+
+        super().update(dt)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import math
+from operator import itemgetter
+from typing import Callable
+
+import typing
+if typing.TYPE_CHECKING:
+    from ..render.entity import Entity
+
+from ..utils.constants import CHAR_ASPECT
+
+
+class CollisionSystem:
+    """
+    Finds overlapping entities once per fixed tick and notifies them.
+
+    Only entities with a non-zero `collision_layer` take part. Two entities
+    are tested when each one's layer is in the other's `collision_mask`.
+
+    Broad phase: sweep-and-prune over sprite bounding boxes in character-cell
+    space. Narrow phase (optional, `pixel_perfect=True`): the boxes only count
+    as touching when opaque (non-'\\a') characters of both sprites overlap.
+    """
+
+    def __init__(self, pixel_perfect: bool = False):
+        # Test overlapping characters instead of just bounding boxes
+        self.pixel_perfect = pixel_perfect
+        # Pairs found during the last update
+        self.contacts: list[tuple[Entity, Entity]] = []
+
+    def find_contacts(self, entities: list[Entity]) -> list[tuple[Entity, Entity]]:
+        """Return every pair of colliding entities, each pair once."""
+        # Bounding box of every collider in cell space: (x0, x1, y0, y1, entity, compiled)
+        boxes = []
+        floor = math.floor
+        for entity in entities:
+            if not entity.collision_layer:
+                continue
+            sprite = entity.render()
+            compiled = sprite.compiled
+            width = int(compiled.size.x)
+            if not width:
+                continue
+            position, center = sprite.position, sprite.center
+            x = floor(position.x) - int(center.x)
+            y = floor(position.y / CHAR_ASPECT) - int(center.y)
+            boxes.append((x, x + width, y, y + len(compiled.lines), entity, compiled))
+
+        # Group colliders by filter so groups that can never collide
+        # (e.g. bullets against bullets) are not even swept together
+        groups: dict[tuple[int, int], list[tuple]] = {}
+        for box in boxes:
+            entity = box[4]
+            groups.setdefault((entity.collision_layer, entity.collision_mask), []).append(box)
+        for group in groups.values():
+            group.sort(key=itemgetter(0))
+
+        contacts = []
+        keys = list(groups)
+        for i, (layer_a, mask_a) in enumerate(keys):
+            for layer_b, mask_b in keys[i:]:
+                if layer_a & mask_b and layer_b & mask_a:
+                    if (layer_a, mask_a) == (layer_b, mask_b):
+                        self._sweep(groups[(layer_a, mask_a)], None, contacts)
+                    else:
+                        self._sweep(groups[(layer_a, mask_a)], groups[(layer_b, mask_b)], contacts)
+
+        return contacts
+
+    def _sweep(self, first: list[tuple], second: list[tuple] | None, contacts: list):
+        """
+        Sweep-and-prune along x over boxes sorted by x0. With one list every
+        pair within it is tested; with two lists only pairs across them are.
+        """
+        if second is None:
+            stream = [(box, 0) for box in first]
+        else:
+            # Both lists are sorted already, so this sort is a linear merge
+            stream = [(box, 0) for box in first] + [(box, 1) for box in second]
+            stream.sort(key=lambda item: item[0][0])
+
+        # Boxes whose x range is still open, per side
+        active = ([], [])
+        for box, side in stream:
+            x0, _, y0, y1, entity, _ = box
+            other_side = side if second is None else 1 - side
+            candidates = [other for other in active[other_side] if other[1] > x0]
+            active[other_side][:] = candidates
+            for other in candidates:
+                # Boxes overlap on x already, check y
+                if other[2] >= y1 or other[3] <= y0:
+                    continue
+                if self.pixel_perfect and not pixels_overlap(other, box):
+                    continue
+                contacts.append((other[4], entity))
+            active[side].append(box)
+
+    def update(self, entities: list[Entity], alive: Callable[[Entity], bool] = lambda entity: True):
+        """
+        Find this tick's contacts and deliver them to both entities through
+        `Entity.on_collision`. Pairs where either entity stopped being
+        `alive` (e.g. was killed by an earlier callback) are skipped.
+        """
+        self.contacts = self.find_contacts(entities)
+        for a, b in self.contacts:
+            if alive(a) and alive(b):
+                a.on_collision(b)
+            if alive(a) and alive(b):
+                b.on_collision(a)
+
+
+def pixels_overlap(a: tuple, b: tuple) -> bool:
+    """
+    Return True if two overlapping boxes share at least one opaque cell,
+    comparing the compiled sprites' per-row opacity bitmasks.
+    """
+    ax, _, ay, _, _, compiled_a = a
+    bx, _, by, _, _, compiled_b = b
+
+    # Align both bitmasks on the leftmost box
+    left = min(ax, bx)
+    shift_a, shift_b = ax - left, bx - left
+
+    for y in range(max(ay, by), min(a[3], b[3])):
+        if (compiled_a.bits[y - ay] << shift_a) & (compiled_b.bits[y - by] << shift_b):
+            return True
+    return False
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+import typing
+if typing.TYPE_CHECKING:
+    from ..render.entity import Entity
+
+from ..render.framebuffer import TRANSPARENT
+from ..render.sprite import CompiledSprite, Sprite, compile_sprite
+from ..utils.math import Vector
+
+# Maximum number of transformed (flipped / substituted) frames kept at once
+TRANSFORM_CACHE_SIZE = 512
+
+# Characters that change when a sprite is mirrored, so '/^\' flipped
+# vertically reads '\v/' and '(o>' flipped horizontally reads '<o)'.
+# Each table is its own inverse, so flipping twice gives the original art
+MIRROR_X = str.maketrans('/\\()<>[]{}', '\\/)(><][}{')
+MIRROR_Y = str.maketrans('/\\^v', '\\/v^')
+
+
+@lru_cache(maxsize=TRANSFORM_CACHE_SIZE)
+def transform_sprite(compiled: CompiledSprite, flip_x: bool = False, flip_y: bool = False,
+                     substitute: tuple[tuple[str, str], ...] = ()) -> CompiledSprite:
+    """
+    Return a variant of a compiled sprite: mirrored horizontally and/or
+    vertically (characters with a mirror image, like '/' and '(', are
+    swapped for it) and with characters replaced through `substitute`
+    ((old, new) pairs). The center is mirrored with the sprite and styles
+    follow their cells.
+
+    Variants are cached per compiled sprite and transform, so flipping a
+    sprite back and forth only builds each variant once.
+    """
+    width, height = int(compiled.size.x), int(compiled.size.y)
+
+    # Cell styles, rebuilt from the style runs
+    styles = None
+    if compiled.styled:
+        styles = [[0] * width for _ in range(height)]
+        for y, (runs, style_runs) in enumerate(zip(compiled.runs, compiled.style_runs)):
+            for (dx, codes), run_styles in zip(runs, style_runs):
+                styles[y][dx:dx + len(codes)] = run_styles
+
+    # Pad rows with transparent cells so short rows mirror around the full width
+    lines = [line.ljust(width, TRANSPARENT) for line in compiled.lines]
+    cx, cy = compiled.center.x, compiled.center.y
+    if flip_x:
+        lines = [line[::-1].translate(MIRROR_X) for line in lines]
+        if styles is not None:
+            styles = [row[::-1] for row in styles]
+        cx = width - 1 - cx
+    if flip_y:
+        lines = [line.translate(MIRROR_Y) for line in reversed(lines)]
+        if styles is not None:
+            styles = styles[::-1]
+        cy = height - 1 - cy
+    if substitute:
+        table = str.maketrans(dict(substitute))
+        lines = [line.translate(table) for line in lines]
+
+    lines = [line.rstrip(TRANSPARENT) for line in lines]
+    if styles is not None:
+        styles = [row[:len(line)] for row, line in zip(styles, lines)]
+    return CompiledSprite(lines, Vector(cx, cy), styles)
+
+
+class AnimatedSprite(Sprite):
+    """
+    A sprite playing a sequence of frames.
+
+    Every frame is compiled once when loaded; switching frames only swaps
+    the compiled data the camera draws. Playback counts fixed ticks: call
+    `tick()` once per fixed update (e.g. from the entity's `update`), and
+    each frame stays on screen for its duration in ticks.
+
+    `flip_x`, `flip_y` and `substitute` (a dict of character replacements)
+    transform every frame; variants come from the `transform_sprite` cache,
+    so toggling them costs a cache lookup after the first use.
+
+    Frames may differ in size. When one changes the sprite's bounds, the
+    entity showing it (`owner`, set by assigning `entity.sprite`) is moved
+    in the game's spatial index.
+    """
+    __slots__ = ('frames', 'durations', 'loop', 'playing', 'frame', '_elapsed',
+                 '_flip_x', '_flip_y', '_substitute', '_raw_frames', '_frame_colors', 'owner')
+
+    def __init__(self, frames: list[str] | tuple[str, ...] = ('',), durations: int | list[int] = 6,
+                 priority=1, style=0, colors: list[str] | None = None, palette=None, loop: bool = True):
+        """
+        Args:
+            frames (list[str]): Raw art of each frame (see `compile_sprite`).
+            durations (int | list[int]): Ticks each frame is shown, for all
+                frames or per frame.
+            colors (list[str] | None): Optional color map of each frame.
+            loop (bool): Start over after the last frame instead of stopping on it.
+        """
+        # Playback state, set before Sprite.__init__ loads the first frame
+        self.frames: list[CompiledSprite] = []
+        # Raw art and color map of each frame, kept to recompile them when the style changes
+        self._raw_frames: list[str] = []
+        self._frame_colors: list[str] = []
+        self.durations: list[int] = []
+        self.loop = loop
+        self.playing = True
+        self.frame = 0
+        self._elapsed = 0
+        self._flip_x = False
+        self._flip_y = False
+        self._substitute: tuple[tuple[str, str], ...] = ()
+        # Entity whose spatial index entry follows the frame bounds
+        self.owner: Entity | None = None
+        super().__init__(frames[0] if frames else '', priority, style)
+        self.load_frames(frames, durations, priority, style, colors, palette)
+
+    def load(self, raw_string, priority=1, style=0, colors='', palette=None):
+        """Replace the animation with a single frame (see `Sprite.load`)."""
+        self.load_frames([raw_string], 1, priority, style, [colors], palette)
+
+    def load_frames(self, frames, durations: int | list[int] = 6, priority=1, style=0,
+                    colors: list[str] | None = None, palette=None):
+        """Compile a new set of frames and restart playback from the first one."""
+        if not frames:
+            raise ValueError("An animation needs at least one frame")
+        palette = tuple(sorted(palette.items())) if palette else ()
+        colors = [frame_colors or '' for frame_colors in colors or [''] * len(frames)]
+        self.frames = [compile_sprite(raw, style, frame_colors, palette)
+                       for raw, frame_colors in zip(frames, colors)]
+        if isinstance(durations, int):
+            durations = [durations] * len(frames)
+        if len(durations) != len(frames) or min(durations) < 1:
+            raise ValueError("Every frame needs a duration of at least one tick")
+        self.durations = list(durations)
+        self.raw_string = frames[0]
+        self._raw_frames = list(frames)
+        self._frame_colors = colors
+        self._style = style
+        self._palette = palette
+        self.priority = priority
+        self.frame = 0
+        self._elapsed = 0
+        self._show()
+
+    # --- Playback ---
+    @property
+    def finished(self) -> bool:
+        """Whether a non-looping animation has shown its last frame for its whole duration."""
+        return (not self.loop and self.frame == len(self.frames) - 1
+                and self._elapsed >= self.durations[-1])
+
+    def tick(self, ticks: int = 1):
+        """Advance playback by `ticks` fixed updates."""
+        if not self.playing or len(self.frames) == 1:
+            return
+        frame, elapsed = self.frame, self._elapsed + ticks
+        last = len(self.frames) - 1
+        durations = self.durations
+        while elapsed >= durations[frame]:
+            if frame == last and not self.loop:
+                # Hold the last frame
+                elapsed = durations[frame]
+                break
+            elapsed -= durations[frame]
+            frame = frame + 1 if frame < last else 0
+        self._elapsed = elapsed
+        if frame != self.frame:
+            self.frame = frame
+            self._show()
+
+    def set_frame(self, frame: int):
+        """Show frame `frame` from its start."""
+        self.frame = frame % len(self.frames)
+        self._elapsed = 0
+        self._show()
+
+    def play(self):
+        self.playing = True
+
+    def pause(self):
+        self.playing = False
+
+    # --- Transforms ---
+    @property
+    def flip_x(self) -> bool:
+        """Mirror every frame horizontally."""
+        return self._flip_x
+
+    @flip_x.setter
+    def flip_x(self, value: bool):
+        if value != self._flip_x:
+            self._flip_x = value
+            self._show()
+
+    @property
+    def flip_y(self) -> bool:
+        """Mirror every frame vertically."""
+        return self._flip_y
+
+    @flip_y.setter
+    def flip_y(self, value: bool):
+        if value != self._flip_y:
+            self._flip_y = value
+            self._show()
+
+    @property
+    def substitute(self) -> dict[str, str]:
+        """Characters replaced in every frame, e.g. {'o': '@'} (empty = none)."""
+        return dict(self._substitute)
+
+    @substitute.setter
+    def substitute(self, value: dict[str, str] | None):
+        value = tuple(sorted(value.items())) if value else ()
+        if value != self._substitute:
+            self._substitute = value
+            self._show()
+
+    # --- Internals ---
+    def _restyle(self, style: int):
+        """Recompile every frame with a new base style, keeping the current frame."""
+        self.frames = [compile_sprite(raw, style, frame_colors, self._palette)
+                       for raw, frame_colors in zip(self._raw_frames, self._frame_colors)]
+        self._style = style
+        self._show()
+
+    def _show(self):
+        """Point the sprite at the (transformed) current frame."""
+        compiled = self.frames[self.frame]
+        if self._flip_x or self._flip_y or self._substitute:
+            compiled = transform_sprite(compiled, self._flip_x, self._flip_y, self._substitute)
+        if compiled is not self.compiled:
+            moved = compiled.size != self.size or compiled.center != self.center
+            self.compiled = compiled
+            self.decoded_string = compiled.lines
+            self.size = compiled.size
+            self.center = compiled.center
+            self.dirty = True
+            owner = self.owner
+            if moved and owner is not None:
+                owner.game.spatial.update(owner, owner.get_bounds())
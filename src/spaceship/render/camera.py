@@ -1,10 +1,21 @@
+from __future__ import annotations
+
 from ..render.entity import Entity
-from ..utils.math import Vector
-from ..utils.constants import SIZE_X, SIZE_Y, CHAR_ASPECT
+from ..render.framebuffer import FrameBuffer, np
+from ..render.particles import ParticleEmitter
+from ..utils.math import Vector, VectorArray
+from ..utils import constants
+from ..utils.constants import CHAR_ASPECT
 
 from enum import Enum
 from math import floor
 
+import typing
+if typing.TYPE_CHECKING:
+    from ..ecs.world import World
+    from ..render.sprite import CompiledSprite
+    from ..render.tilemap import TileMap
+
 # Camera positioning modes
 class CameraMode(Enum):
     CENTER = 0     # Camera is centered on the target
@@ -19,10 +30,22 @@ class Camera:
         self.position = position
         # How the camera interprets origin offset (center, corners, etc.)
         self.mode = cameraMode
-        # Camera viewport size (width, height)
-        self.size = Vector(SIZE_X, SIZE_Y)
+        # Camera viewport size (width, height); the game keeps it in sync with its own size
+        self.size = Vector(constants.SIZE_X, constants.SIZE_Y)
         # Adjust for character aspect ratio (since characters are usually taller than wide)
         self.aspect_adjustment_factor = 1.0 / CHAR_ASPECT
+        # Composited frame, reused between frames while the display size is unchanged
+        self.framebuffer: FrameBuffer | None = None
+        # Rectangles re-composited by the last get_framebuffer call (None = everything)
+        self.dirty_regions: list[tuple[int, int, int, int]] | None = None
+        # Last placement of each sprite, keyed by sprite id, and the view it was drawn with
+        self._placed: dict[int, tuple] = {}
+        self._view = None
+        # Last projection of each particle emitter, keyed by emitter id: (xs, ys, glyphs, rect),
+        # and of each ECS world, keyed by world id: (layers, rect) (see project_world)
+        self._projected: dict[int, tuple] = {}
+        # Ids of the tilemaps drawn in the last frame, in draw order
+        self._tilemaps: tuple[int, ...] = ()
 
     def get_transformed_vector(self, vector: Vector) -> Vector:
         """
@@ -32,64 +55,370 @@ class Camera:
         3. Offsetting based on the camera mode
         """
 
-        # Default offset: center of the screen
-        offset = Vector(SIZE_X / 2, SIZE_Y / 2)
+        ox, oy = self.get_offset()
 
+        # Translate world → camera coordinates
+        # Scale Y by 0.5 to compensate for char aspect
+        return Vector(vector.x - self.position.x + ox,
+                      (vector.y - self.position.y) * self.aspect_adjustment_factor + oy)
+
+    def get_offset(self) -> tuple[float, float]:
+        """
+        Return the screen-space offset of the camera origin for the current mode.
+        """
+        width, height = self.size.x, self.size.y
         # Adjust based on camera mode
         if self.mode == CameraMode.TOP_LEFT:
-            offset = Vector()
+            return (0, 0)
         elif self.mode == CameraMode.TOP_RIGHT:
-            offset = Vector(SIZE_X - 1, 0)
+            return (width - 1, 0)
         elif self.mode == CameraMode.BOT_LEFT:
-            offset = Vector(0, SIZE_Y - 1)
+            return (0, height - 1)
         elif self.mode == CameraMode.BOT_RIGHT:
-            offset = Vector(SIZE_X - 1, SIZE_Y - 1)
+            return (width - 1, height - 1)
 
-        # Translate world → camera coordinates
-        # Scale Y by 0.5 to compensate for char aspect
-        return (vector - self.position).vectorScale(Vector(1, self.aspect_adjustment_factor)) + offset
-    
-    def get_render(self, display_size: Vector, entities: list[Entity]) -> list[str]:
+        # Default offset: center of the screen
+        return (width / 2, height / 2)
+
+    def get_view_bounds(self, display_size: Vector) -> tuple[float, float, float, float]:
+        """
+        Return the world-space rectangle (x0, y0, x1, y1) visible through the camera,
+        padded by one cell to account for rounding to the character grid.
         """
-        Render all entities into a text buffer, considering their positions,
-        sprite characters, and render priority.
+        # Screen origin in world space (inverse of get_transformed_vector)
+        origin = self.get_transformed_vector(Vector())
+        aspect = 1.0 / self.aspect_adjustment_factor
+        x0 = -origin.x - 1
+        y0 = (-origin.y - 1) * aspect
+        return (x0, y0, x0 + display_size.x + 2, y0 + (display_size.y + 2) * aspect)
+
+    def project(self, positions: VectorArray, count: int):
+        """
+        Transform the first `count` world positions of a VectorArray to
+        integer screen cells at once. Returns (xs, ys).
+        """
+        ox, oy = self.get_offset()
+        px, py = self.position.x, self.position.y
+        factor = self.aspect_adjustment_factor
+        if np is not None:
+            xs = np.floor(positions.x[:count] - px + ox).astype(np.int64)
+            ys = np.floor((positions.y[:count] - py) * factor + oy).astype(np.int64)
+            return xs, ys
+        xs = [floor(x - px + ox) for x in positions.x[:count]]
+        ys = [floor((y - py) * factor + oy) for y in positions.y[:count]]
+        return xs, ys
+
+    def tile_offset(self) -> tuple[int, int]:
+        """
+        Return the screen cell of tile (0, 0): tile (tx, ty) is drawn at
+        (tx + sx, ty + sy). Tiles line up with sprites placed at the same
+        world position.
+        """
+        ox, oy = self.get_offset()
+        return (floor(ox - self.position.x),
+                floor(oy - self.position.y * self.aspect_adjustment_factor))
+
+    def needs_redraw(self, display_size: Vector, entities: list[Entity],
+                     emitters: list[ParticleEmitter] = (), worlds: list[World] = (),
+                     tilemaps: list[TileMap] = ()) -> bool:
+        """
+        Return whether `get_framebuffer` would change anything: the view or
+        display size changed, an entity, emitter, world or tilemap appeared
+        or disappeared, a sprite is flagged dirty or placed differently
+        (e.g. its position was changed in place), an emitter or world is
+        flagged dirty, or tiles changed. Nothing is composited.
+        """
+        buffer = self.framebuffer
+        if buffer is None or buffer.width != int(display_size.x) or buffer.height != int(display_size.y):
+            return True
+        if (self.position.x, self.position.y, self.mode, self.aspect_adjustment_factor,
+                self.size.x, self.size.y) != self._view:
+            return True
+
+        # Same count and every sprite placed as before means the same sprites in the same cells
+        placed = self._placed
+        if len(entities) != len(placed):
+            return True
+        ox, oy = self.get_offset()
+        px, py = self.position.x, self.position.y
+        factor = self.aspect_adjustment_factor
+        for entity in entities:
+            sprite = entity.render()
+            if sprite.dirty:
+                return True
+            # Same placement as get_framebuffer computes
+            position, center = sprite.position, sprite.center
+            x = floor(position.x - px + ox) - floor(center.x)
+            y = floor((position.y - py) * factor + oy) - floor(center.y)
+            if placed.get(id(sprite)) != (x, y, sprite.compiled, sprite.priority):
+                return True
+
+        if len(tilemaps) != len(self._tilemaps):
+            return True
+        for tilemap, key in zip(tilemaps, self._tilemaps):
+            if tilemap.changed or id(tilemap) != key:
+                return True
+
+        projected = self._projected
+        if len(emitters) + len(worlds) != len(projected):
+            return True
+        for emitter in emitters:
+            if emitter.dirty or id(emitter) not in projected:
+                return True
+        for world in worlds:
+            if world_changed(world) or id(world) not in projected:
+                return True
+        return False
+
+    def get_framebuffer(self, display_size: Vector, entities: list[Entity],
+                        emitters: list[ParticleEmitter] = (), worlds: list[World] = (),
+                        tilemaps: list[TileMap] = (), clear_flags: bool = True) -> FrameBuffer:
+        """
+        Composite all entities into the camera's framebuffer, considering their
+        positions, sprite characters, and render priority. The visible window
+        of each tilemap is drawn first, under everything else; sprites of ECS
+        `worlds` rows, then particles from `emitters`, are drawn on top of
+        entity sprites with equal priority.
+
+        The previous frame is kept: only the union of the old and new bounds of
+        sprites that moved, changed or disappeared is re-composited, and those
+        rectangles are left in `dirty_regions` (None when the whole frame was
+        redrawn).
+
+        The change flags of what was drawn (`sprite.dirty`, `emitter.dirty`,
+        `world.dirty`, `tilemap.changed`) are then cleared. Pass
+        `clear_flags=False` when more cameras draw the same frame, and call
+        `clear_flags` once they all have.
         """
         width, height = int(display_size.x), int(display_size.y)
 
-        # Each buffer cell holds a character and its z-priority
-        buffer = [{'display': ' ', 'priority': 0} for _ in range(width * height)]
+        # Reuse the previous buffer unless the display size changed
+        buffer = self.framebuffer
+        full = buffer is None or buffer.width != width or buffer.height != height
+        if full:
+            buffer = self.framebuffer = FrameBuffer(width, height)
+
+        # Moving or reconfiguring the camera shifts every sprite
+        view = (self.position.x, self.position.y, self.mode, self.aspect_adjustment_factor,
+                self.size.x, self.size.y)
+        if view != self._view:
+            self._view = view
+            full = True
 
-        # Draw each entity onto the buffer
+        # Adding, removing or reordering tilemaps redraws everything
+        keys = tuple(id(tilemap) for tilemap in tilemaps)
+        if keys != self._tilemaps:
+            self._tilemaps = keys
+            full = True
+
+        # Place each entity's sprite and collect the rectangles that changed
+        placements = []
+        placed = {}
+        dirty = []
+        ox, oy = self.get_offset()
+        px, py = self.position.x, self.position.y
+        factor = self.aspect_adjustment_factor
         for entity in entities:
             sprite = entity.render()  # Get entity sprite (char grid + metadata)
-            center_cam = self.get_transformed_vector(sprite.position).floored()
-            center_floored = sprite.center.floored()
+            position, center = sprite.position, sprite.center
+
+            # Top-left corner of the sprite in screen space
+            # (same transform as get_transformed_vector, without temporaries)
+            x = floor(position.x - px + ox) - floor(center.x)
+            y = floor((position.y - py) * factor + oy) - floor(center.y)
+            placement = (x, y, sprite.compiled, sprite.priority)
+            placements.append(placement)
 
-            # Iterate sprite pixel grid
-            for y, line in enumerate(sprite.decoded_string):
-                for x, pixel in enumerate(line):
+            key = id(sprite)
+            previous = self._placed.pop(key, None)
+            if sprite.dirty or previous != placement:
+                if previous is not None:
+                    dirty.append(placement_rect(previous))
+                dirty.append(placement_rect(placement))
+            if clear_flags:
+                sprite.dirty = False
+            placed[key] = placement
 
-                    #Skip transparent pixels
-                    if pixel == '\a': continue
+        # Whatever was not seen this frame has been removed
+        for previous in self._placed.values():
+            dirty.append(placement_rect(previous))
+        self._placed = placed
 
-                    # Position relative to sprite center
-                    rel = Vector(x, y) - center_floored
-                    # Transform to world/screen position
-                    world_pos = center_cam + rel
+        # Project ECS rows and particles that moved (or everything after a view change)
+        particles = []
+        projected = {}
+        for world in worlds:
+            key = id(world)
+            previous = self._projected.pop(key, None)
+            if full or world_changed(world) or previous is None:
+                current = self.project_world(world, width, height)
+                if previous is not None and previous[1] is not None:
+                    dirty.append(previous[1])
+                if current[1] is not None:
+                    dirty.append(current[1])
+            else:
+                current = previous
+            projected[key] = current
+            for xs, ys, codes, bounds, priority, styles in current[0]:
+                particles.append(((xs, ys, codes, bounds), priority, styles))
 
-                    # Skip anything outside of viewport
-                    if not (0 <= world_pos.x < width and 0 <= world_pos.y < height):
-                        continue
+        for emitter in emitters:
+            key = id(emitter)
+            previous = self._projected.pop(key, None)
+            if full or emitter.dirty or previous is None:
+                xs, ys = self.project(emitter.positions, emitter.count)
+                current = (xs, ys, emitter.glyphs[:emitter.count], points_rect(xs, ys))
+                if previous is not None and previous[3] is not None:
+                    dirty.append(previous[3])
+                if current[3] is not None:
+                    dirty.append(current[3])
+            else:
+                current = previous
+            projected[key] = current
+            particles.append((current, emitter.priority, emitter.style))
 
-                    # Flatten 2D → 1D index in buffer
-                    idx = get_index(world_pos, display_size)
+        # Emitters and worlds that were removed leave their last area dirty
+        for previous in self._projected.values():
+            if previous[-1] is not None:
+                dirty.append(previous[-1])
+        self._projected = projected
 
-                    # Only overwrite if this sprite has higher or equal priority
-                    if sprite.priority >= buffer[idx]['priority']:
-                        buffer[idx] = {'display': pixel, 'priority': sprite.priority}
+        # Chunks whose tiles changed
+        sx, sy = self.tile_offset()
+        for tilemap in tilemaps:
+            if tilemap.changed:
+                cw, ch = tilemap.chunk_width, tilemap.chunk_height
+                for cx, cy in tilemap.changed:
+                    x, y = cx * cw + sx, cy * ch + sy
+                    dirty.append((x, y, x + cw, y + ch))
 
-        # Convert buffer into a flat list of characters (ready for joining/printing)
-        return [cell['display'] for cell in buffer]
+        if clear_flags:
+            self.clear_flags((), emitters, worlds, tilemaps)
+
+        regions = None if full else merge_rects(dirty, width, height)
+        if regions is None:
+            # Redraw everything
+            buffer.clear()
+            for tilemap in tilemaps:
+                draw_tilemap(buffer, tilemap, sx, sy, (0, 0, width, height))
+            for x, y, compiled, priority in placements:
+                buffer.blit_sprite(x, y, compiled, priority)
+            for (xs, ys, glyphs, _), priority, styles in particles:
+                buffer.write_points(xs, ys, glyphs, priority, None, styles)
+        else:
+            # Re-composite only the dirty rectangles, in the usual draw order
+            for rect in regions:
+                buffer.clear(rect)
+                x0, y0, x1, y1 = rect
+                for tilemap in tilemaps:
+                    draw_tilemap(buffer, tilemap, sx, sy, rect)
+                for x, y, compiled, priority in placements:
+                    w, h = compiled.size.x, compiled.size.y
+                    if x < x1 and y < y1 and x + w > x0 and y + h > y0:
+                        buffer.blit_sprite(x, y, compiled, priority, rect)
+                for (xs, ys, glyphs, bounds), priority, styles in particles:
+                    if bounds is not None and bounds[0] < x1 and bounds[1] < y1 and bounds[2] > x0 and bounds[3] > y0:
+                        buffer.write_points(xs, ys, glyphs, priority, rect, styles)
+
+        self.dirty_regions = regions
+        return buffer
+
+    @staticmethod
+    def clear_flags(entities: list[Entity], emitters: list[ParticleEmitter] = (),
+                    worlds: list[World] = (), tilemaps: list[TileMap] = ()):
+        """Mark everything drawn as up to date (see `get_framebuffer`)."""
+        for entity in entities:
+            entity.render().dirty = False
+        for world in worlds:
+            world.dirty = False
+            for sprite in world.sprites:
+                sprite.dirty = False
+        for emitter in emitters:
+            emitter.dirty = False
+        for tilemap in tilemaps:
+            tilemap.changed.clear()
+
+    def project_world(self, world: World, width: int, height: int) -> tuple[list[tuple], tuple | None]:
+        """
+        Project the sprites of an ECS world's rows to screen cells, skipping
+        rows without a sprite or off a `width` x `height` screen. Every
+        opaque sprite cell becomes a point, so all rows sharing a sprite are
+        drawn with one `write_points` call. Returns one layer per sprite,
+        (xs, ys, codes, rect, priority, styles), and the rectangle covering
+        them all.
+        """
+        n = world.count
+        layers = []
+        if not n or not world.sprites:
+            return layers, None
+        xs, ys = self.project(world.position, n)
+        index = world.sprite
+
+        if np is None:
+            # Group rows by sprite once
+            groups: dict[int, list[int]] = {}
+            for row in range(n):
+                if index[row] >= 0:
+                    groups.setdefault(index[row], []).append(row)
+
+        for i, sprite in enumerate(world.sprites):
+            compiled = sprite.compiled
+            w, h = int(compiled.size.x), int(compiled.size.y)
+            cx, cy = floor(sprite.center.x), floor(sprite.center.y)
+            dxs, dys, codes, cell_styles = sprite_cells(compiled)
+            uniform = isinstance(cell_styles, int)
+            if np is not None:
+                x0 = xs - cx
+                y0 = ys - cy
+                rows = np.flatnonzero((index[:n] == i) & (x0 < width) & (y0 < height)
+                                      & (x0 + w > 0) & (y0 + h > 0))
+                if not len(rows) or not len(codes):
+                    continue
+                px = (x0[rows, None] + dxs).ravel()
+                py = (y0[rows, None] + dys).ravel()
+                pc = np.broadcast_to(codes, (len(rows), len(codes))).ravel()
+                ps = cell_styles if uniform else np.broadcast_to(cell_styles, (len(rows), len(codes))).ravel()
+            else:
+                px, py, pc = [], [], []
+                ps = cell_styles if uniform else []
+                for row in groups.get(i, ()):
+                    x, y = xs[row] - cx, ys[row] - cy
+                    if x < width and y < height and x + w > 0 and y + h > 0:
+                        px.extend([x + dx for dx in dxs])
+                        py.extend([y + dy for dy in dys])
+                        pc.extend(codes)
+                        if not uniform:
+                            ps.extend(cell_styles)
+                if not pc:
+                    continue
+            layers.append((px, py, pc, points_rect(px, py), sprite.priority, ps))
+
+        if not layers:
+            return layers, None
+        rects = [layer[3] for layer in layers]
+        return layers, (min(r[0] for r in rects), min(r[1] for r in rects),
+                        max(r[2] for r in rects), max(r[3] for r in rects))
+
+    def get_render(self, display_size: Vector, entities: list[Entity], styled: bool = False) -> list[str]:
+        """
+        Render all entities into a flat list of characters (ready for joining/printing).
+        With `styled`, cells carry the SGR sequences for their styles (see
+        `FrameBuffer.to_list`).
+        """
+        return self.get_framebuffer(display_size, entities).to_list(styled)
+
+def draw_tilemap(buffer: FrameBuffer, tilemap: TileMap, sx: int, sy: int,
+                 rect: tuple[int, int, int, int]):
+    """
+    Copy the part of a tilemap covering the screen rectangle `rect`
+    (x0, y0, x1, y1, end-exclusive) into `buffer`, one chunk at a time,
+    with tile (0, 0) at screen cell (sx, sy).
+    """
+    x0, y0, x1, y1 = rect
+    if x0 >= x1 or y0 >= y1:
+        return
+    for tx, ty, compiled in tilemap.chunks_in(x0 - sx, y0 - sy, x1 - sx, y1 - sy):
+        buffer.blit_sprite(tx + sx, ty + sy, compiled, tilemap.priority, rect)
 
 def get_index(position: Vector, size: Vector) -> int:
     """
@@ -98,3 +427,81 @@ def get_index(position: Vector, size: Vector) -> int:
     xi = floor(position.x)
     yi = floor(position.y)
     return xi + yi * int(size.x)
+
+def placement_rect(placement: tuple) -> tuple[int, int, int, int]:
+    """
+    Return the screen rectangle (x0, y0, x1, y1), end-exclusive,
+    covered by a sprite placement.
+    """
+    x, y, compiled, _ = placement
+    return (x, y, x + int(compiled.size.x), y + int(compiled.size.y))
+
+def world_changed(world: World) -> bool:
+    """Whether an ECS world's rows or any of its sprites changed since it was last drawn."""
+    return world.dirty or any(sprite.dirty for sprite in world.sprites)
+
+def sprite_cells(compiled: CompiledSprite) -> tuple:
+    """
+    Return the opaque cells of a compiled sprite as (dxs, dys, codes, styles),
+    where styles is 0 for an unstyled sprite.
+    """
+    if np is not None:
+        dys, dxs = np.nonzero(compiled.mask)
+        styles = compiled.styles[dys, dxs] if compiled.styled else 0
+        return dxs, dys, compiled.chars[dys, dxs], styles
+    dxs, dys, codes = [], [], []
+    styles = [] if compiled.styled else 0
+    for dy, runs in enumerate(compiled.runs):
+        for i, (dx, run) in enumerate(runs):
+            for k, code in enumerate(run):
+                dxs.append(dx + k)
+                dys.append(dy)
+                codes.append(code)
+            if compiled.styled:
+                styles.extend(compiled.style_runs[dy][i])
+    return dxs, dys, codes, styles
+
+def points_rect(xs, ys) -> tuple[int, int, int, int] | None:
+    """
+    Return the screen rectangle (x0, y0, x1, y1), end-exclusive,
+    covering a set of points, or None when there are none.
+    """
+    if not len(xs):
+        return None
+    if np is not None:
+        return (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+    return (min(xs), min(ys), max(xs) + 1, max(ys) + 1)
+
+def merge_rects(rects: list[tuple[int, int, int, int]], width: int, height: int,
+                max_rects: int = 64) -> list[tuple[int, int, int, int]] | None:
+    """
+    Clip rectangles to the screen and merge overlapping ones.
+    Returns None when a full redraw would be cheaper (too many
+    rectangles, or more than half of the screen is dirty).
+    """
+    merged = []
+    for x0, y0, x1, y1 in rects:
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, width), min(y1, height)
+        if x0 >= x1 or y0 >= y1:
+            continue
+
+        # Absorb every merged rectangle this one overlaps, until none are left
+        i = 0
+        while i < len(merged):
+            a0, b0, a1, b1 = merged[i]
+            if a0 < x1 and b0 < y1 and a1 > x0 and b1 > y0:
+                x0, y0 = min(x0, a0), min(y0, b0)
+                x1, y1 = max(x1, a1), max(y1, b1)
+                merged.pop(i)
+                i = 0
+            else:
+                i += 1
+        merged.append((x0, y0, x1, y1))
+
+        if len(merged) > max_rects:
+            return None
+
+    if sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in merged) * 2 > width * height:
+        return None
+    return merged
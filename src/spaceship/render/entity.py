@@ -4,9 +4,12 @@ from abc import ABC, abstractmethod
 import typing
 if typing.TYPE_CHECKING:
     from ..game import Game   # Forward reference for type hinting only
+    from ..utils.store import EntityHandle
 
 from ..utils.math import Vector
+from ..utils.constants import CHAR_ASPECT
 from ..render.sprite import Sprite
+from ..render.animation import AnimatedSprite
 
 
 class Entity(ABC):
@@ -27,6 +30,15 @@ class Entity(ABC):
         # A string identifier for the entity type (optional, e.g. "enemy", "player")
         # The sprite object representing this entity visually
         self._sprite = Sprite()
+        # Collision filtering bitmasks: layer 0 opts out of collision detection,
+        # and two entities collide when each one's layer is in the other's mask
+        self.collision_layer = 0
+        self.collision_mask = ~0
+        # Stable handle given by the game's entity store when added (see EntityStore)
+        self.handle: EntityHandle | None = None
+        # Store bookkeeping: slot in the slot map and index in the packed list (-1 = none)
+        self._slot = -1
+        self._index = -1
 
     # --- Position Management ---
     @property
@@ -38,10 +50,13 @@ class Entity(ABC):
     def position(self, value: Vector):
         """
         Update the entity’s world position and also update
-        its sprite’s position to match.
+        its sprite’s position to match, flagging it for redraw.
         """
         self._position = value
         self._sprite.position = value
+        self._sprite.dirty = True
+        # Keep the game's spatial index in sync (no-op until the entity is added)
+        self.game.spatial.update(self, self.get_bounds())
 
     # --- Sprite Management ---
     @property
@@ -55,12 +70,37 @@ class Entity(ABC):
         Assign a new sprite to the entity,
         ensuring its position is synced with the entity’s position.
         """
+        if isinstance(self._sprite, AnimatedSprite) and self._sprite.owner is self:
+            self._sprite.owner = None
         self._sprite = value
         self._sprite.position = self.position
+        self._sprite.dirty = True
+        if isinstance(value, AnimatedSprite):
+            # Frames of different sizes move the entity in the spatial index
+            value.owner = self
+        self.game.spatial.update(self, self.get_bounds())
+
+    def get_bounds(self) -> tuple[float, float, float, float]:
+        """
+        Return the world-space rectangle (x0, y0, x1, y1) covered by the
+        rendered sprite. One sprite row spans CHAR_ASPECT world units.
+        """
+        sprite = self.render()
+        x0 = sprite.position.x - sprite.center.x
+        y0 = sprite.position.y - sprite.center.y * CHAR_ASPECT
+        return (x0, y0, x0 + sprite.size.x, y0 + sprite.size.y * CHAR_ASPECT)
 
     # --- Entity Lifecycle ---
+    @property
+    def alive(self) -> bool:
+        """Whether the entity is in the game and has not been killed."""
+        return self.game.entities.is_alive(self)
+
     def kill(self):
-        """Remove this entity from the game."""
+        """
+        Remove this entity from the game. Killing an entity that is
+        already dead does nothing.
+        """
         self.game.remove_entity(self)
 
     # --- Abstract Methods ---
@@ -75,6 +115,16 @@ class Entity(ABC):
         """
         pass
 
+    def on_collision(self, other: "Entity"):
+        """
+        Called once per fixed tick for every entity this one is touching.
+        Subclasses may override this; the default does nothing.
+
+        Args:
+            other (Entity): The entity collided with.
+        """
+        pass
+
     # --- Rendering ---
     def render(self) -> Sprite:
         """
@@ -0,0 +1,485 @@
+from __future__ import annotations
+
+import sys
+from array import array
+import typing
+if typing.TYPE_CHECKING:
+    from ..render.sprite import CompiledSprite
+
+from ..render.style import sgr, styled_text
+
+# NumPy is optional: when it is installed the framebuffer uses 2D arrays and
+# masked slice writes, otherwise it falls back to flat `array` module buffers.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Codepoint written into cleared cells
+BLANK = ord(' ')
+# Sprite character treated as transparent (never drawn)
+TRANSPARENT = '\a'
+
+# Native-endian UTF-32 matches the in-memory layout of a uint32 codepoint buffer
+_UTF32 = 'utf-32-le' if sys.byteorder == 'little' else 'utf-32-be'
+
+
+def encode(text: str):
+    """
+    Convert a string into a buffer of unicode codepoints
+    matching the framebuffer's storage type.
+    """
+    data = text.encode(_UTF32)
+    if np is not None:
+        return np.frombuffer(data, dtype=np.uint32)
+    codes = array('I')
+    codes.frombytes(data)
+    return codes
+
+
+def opaque_runs(line: str) -> list[tuple[int, str]]:
+    """
+    Split a sprite row into its opaque runs.
+    Returns (x offset, text) pairs with the transparent '\\a' cells removed.
+    """
+    runs = []
+    x = 0
+    for part in line.split(TRANSPARENT):
+        if part:
+            runs.append((x, part))
+        x += len(part) + 1
+    return runs
+
+
+class FrameBuffer:
+    """
+    A character grid with a parallel z-priority grid used for compositing,
+    and a style grid (see render.style) giving each cell's colors and
+    attributes.
+
+    Characters are stored as unicode codepoints. With NumPy the grids are
+    (height, width) arrays; without it they are flat row-major `array`s.
+    Styles are only written once something styled has been drawn
+    (`styled`), so uncolored scenes pay nothing for them.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+
+        if np is not None:
+            self.chars = np.full((height, width), BLANK, dtype=np.uint32)
+            self.priority = np.zeros((height, width), dtype=np.int32)
+            self.styles = np.zeros((height, width), dtype=np.uint32)
+        else:
+            self.chars = array('I', [BLANK]) * (width * height)
+            self.priority = array('i', [0]) * (width * height)
+            self.styles = array('I', [0]) * (width * height)
+            # Blank copies used to clear the buffers with one slice assignment
+            self._blank_chars = array('I', self.chars)
+            self._blank_priority = array('i', self.priority)
+            self._blank_styles = array('I', self.styles)
+
+        # Whether any cell may hold a non-default style
+        self.styled = False
+        # Scratch arrays reused by changed_rows (allocated on first use)
+        self._cell_diff = None
+        self._style_diff = None
+        self._row_diff = None
+
+    # --- Clearing ---
+    def clear(self, rect: tuple[int, int, int, int] | None = None):
+        """
+        Reset cells to a blank character with priority 0.
+
+        Args:
+            rect (tuple[int, int, int, int] | None): (x0, y0, x1, y1) region to
+                clear, end-exclusive. Clears the whole buffer when omitted.
+        """
+        if rect is None:
+            if np is not None:
+                self.chars.fill(BLANK)
+                self.priority.fill(0)
+                if self.styled:
+                    self.styles.fill(0)
+            else:
+                self.chars[:] = self._blank_chars
+                self.priority[:] = self._blank_priority
+                if self.styled:
+                    self.styles[:] = self._blank_styles
+            self.styled = False
+            return
+
+        x0, y0, x1, y1 = rect
+        if np is not None:
+            self.chars[y0:y1, x0:x1] = BLANK
+            self.priority[y0:y1, x0:x1] = 0
+            if self.styled:
+                self.styles[y0:y1, x0:x1] = 0
+            return
+
+        n = x1 - x0
+        for y in range(y0, y1):
+            i = y * self.width + x0
+            self.chars[i:i + n] = self._blank_chars[:n]
+            self.priority[i:i + n] = self._blank_priority[:n]
+            if self.styled:
+                self.styles[i:i + n] = self._blank_styles[:n]
+
+    # --- Blitting ---
+    def blit(self, x: int, y: int, lines: list[str], priority: int):
+        """
+        Draw sprite rows with their top-left corner at (x, y).
+
+        Transparent '\\a' cells are skipped, anything outside the buffer
+        is clipped, and a cell is only overwritten when `priority` is
+        greater than or equal to the priority already stored there.
+        """
+        for row, line in enumerate(lines):
+            sy = y + row
+            if not 0 <= sy < self.height:
+                continue
+            for dx, text in opaque_runs(line):
+                self.write_run(x + dx, sy, text, priority)
+
+    def blit_sprite(self, x: int, y: int, compiled: CompiledSprite, priority: int,
+                    clip: tuple[int, int, int, int] | None = None):
+        """
+        Draw a precompiled sprite with its top-left corner at (x, y),
+        using the same transparency, clipping and priority rules as `blit`.
+
+        Args:
+            clip (tuple[int, int, int, int] | None): Optional (x0, y0, x1, y1)
+                region, end-exclusive, that drawing is restricted to.
+        """
+        cx0, cy0, cx1, cy1 = clip if clip is not None else (0, 0, self.width, self.height)
+
+        if np is None:
+            style_runs = compiled.style_runs
+            for row, runs in enumerate(compiled.runs):
+                sy = y + row
+                if cy0 <= sy < cy1:
+                    for i, (dx, codes) in enumerate(runs):
+                        styles = style_runs[row][i] if style_runs is not None else 0
+                        self.write_run(x + dx, sy, codes, priority, cx0, cx1, styles)
+            return
+
+        # Clip the sprite rectangle against the buffer
+        height, width = compiled.chars.shape
+        x0, y0 = max(x, cx0), max(y, cy0)
+        x1, y1 = min(x + width, cx1), min(y + height, cy1)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        # One masked write for the whole visible part of the sprite
+        src = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+        dst = (slice(y0, y1), slice(x0, x1))
+        prio = self.priority[dst]
+        mask = compiled.mask[src] & (prio <= priority)
+        self.chars[dst][mask] = compiled.chars[src][mask]
+        prio[mask] = priority
+        if compiled.styled:
+            self.styles[dst][mask] = compiled.styles[src][mask]
+            self.styled = True
+        elif self.styled:
+            self.styles[dst][mask] = 0
+
+    def write_points(self, xs, ys, codes, priority: int,
+                     clip: tuple[int, int, int, int] | None = None, styles=0):
+        """
+        Write single characters at many (xs[i], ys[i]) cells at once,
+        honouring clipping and priority. Used for particles.
+
+        Args:
+            styles: One style for every point, or a style per point.
+        """
+        x0, y0, x1, y1 = clip if clip is not None else (0, 0, self.width, self.height)
+        uniform = isinstance(styles, int)
+        write_styles = not uniform or styles != 0 or self.styled
+        if write_styles and (not uniform or styles):
+            self.styled = True
+
+        if np is not None:
+            inside = (xs >= x0) & (xs < x1) & (ys >= y0) & (ys < y1)
+            xs, ys, codes = xs[inside], ys[inside], codes[inside]
+            wins = self.priority[ys, xs] <= priority
+            xs, ys = xs[wins], ys[wins]
+            self.chars[ys, xs] = codes[wins]
+            self.priority[ys, xs] = priority
+            if write_styles:
+                self.styles[ys, xs] = styles if uniform else styles[inside][wins]
+            return
+
+        width = self.width
+        chars, prio = self.chars, self.priority
+        if not write_styles:
+            for x, y, code in zip(xs, ys, codes):
+                if x0 <= x < x1 and y0 <= y < y1:
+                    i = y * width + x
+                    if prio[i] <= priority:
+                        chars[i] = code
+                        prio[i] = priority
+            return
+
+        cell_styles = self.styles
+        if uniform:
+            styles = array('I', [styles]) * len(codes)
+        for x, y, code, value in zip(xs, ys, codes, styles):
+            if x0 <= x < x1 and y0 <= y < y1:
+                i = y * width + x
+                if prio[i] <= priority:
+                    chars[i] = code
+                    prio[i] = priority
+                    cell_styles[i] = value
+
+    def write_run(self, x: int, y: int, text, priority: int, lo: int = 0, hi: int | None = None,
+                  styles=0):
+        """
+        Write a run of opaque characters (a string or a codepoint buffer)
+        starting at (x, y), honouring clipping and priority.
+        Columns outside [lo, hi) are left untouched.
+
+        Args:
+            styles: One style for the whole run, or a buffer with a style
+                per character (an `array('I')`, or a uint32 array with NumPy).
+        """
+        start = max(x, lo)
+        end = min(x + len(text), self.width if hi is None else hi)
+        if start >= end or not 0 <= y < self.height:
+            return
+
+        codes = encode(text) if isinstance(text, str) else text
+        codes = codes[start - x:end - x]
+        uniform = isinstance(styles, int)
+        if not uniform:
+            styles = styles[start - x:end - x]
+        write_styles = not uniform or styles != 0 or self.styled
+        if write_styles and (not uniform or styles):
+            self.styled = True
+
+        if np is not None:
+            prio = self.priority[y, start:end]
+            mask = prio <= priority
+            self.chars[y, start:end][mask] = codes[mask]
+            prio[mask] = priority
+            if write_styles:
+                self.styles[y, start:end][mask] = styles if uniform else np.asarray(styles)[mask]
+            return
+
+        i = y * self.width + start
+        j = i + (end - start)
+        if max(self.priority[i:j]) <= priority:
+            # Fast path: the whole run wins, copy it as one slice
+            self.chars[i:j] = codes
+            self.priority[i:j] = array('i', [priority]) * (j - i)
+            if write_styles:
+                self.styles[i:j] = array('I', [styles]) * (j - i) if uniform else styles
+        else:
+            for k in range(j - i):
+                if self.priority[i + k] <= priority:
+                    self.chars[i + k] = codes[k]
+                    self.priority[i + k] = priority
+                    if write_styles:
+                        self.styles[i + k] = styles if uniform else styles[k]
+
+    # --- Viewports ---
+    def paste(self, other: FrameBuffer, x: int, y: int, rect: tuple[int, int, int, int] | None = None):
+        """
+        Copy the cells (characters, priorities and styles) of `other`, or
+        of its (x0, y0, x1, y1) region `rect`, into this buffer so that
+        cell (0, 0) of `other` lands on (x, y). Anything outside this
+        buffer is clipped.
+        """
+        x0, y0, x1, y1 = rect if rect is not None else (0, 0, other.width, other.height)
+        # Clip against both buffers
+        x0, y0 = max(x0, -x, 0), max(y0, -y, 0)
+        x1, y1 = min(x1, self.width - x, other.width), min(y1, self.height - y, other.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        styled = self.styled or other.styled
+        if np is not None:
+            src = (slice(y0, y1), slice(x0, x1))
+            dst = (slice(y0 + y, y1 + y), slice(x0 + x, x1 + x))
+            self.chars[dst] = other.chars[src]
+            self.priority[dst] = other.priority[src]
+            if styled:
+                self.styles[dst] = other.styles[src]
+        else:
+            n = x1 - x0
+            for row in range(y0, y1):
+                i = row * other.width + x0
+                j = (row + y) * self.width + x0 + x
+                self.chars[j:j + n] = other.chars[i:i + n]
+                self.priority[j:j + n] = other.priority[i:i + n]
+                if styled:
+                    self.styles[j:j + n] = other.styles[i:i + n]
+        self.styled = styled
+
+    def downsample(self, other: FrameBuffer, scale: int, rect: tuple[int, int, int, int] | None = None):
+        """
+        Shrink `other` (`scale` times this buffer's size) into this buffer:
+        each cell takes the cell of its `scale` x `scale` block with the
+        highest priority, preferring non-blank cells on ties. Only the
+        (x0, y0, x1, y1) region `rect` of this buffer is updated when given.
+        """
+        x0, y0, x1, y1 = rect if rect is not None else (0, 0, self.width, self.height)
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1 = min(x1, self.width, other.width // scale)
+        y1 = min(y1, self.height, other.height // scale)
+        if x0 >= x1 or y0 >= y1:
+            return
+        styled = self.styled or other.styled
+        w, h = x1 - x0, y1 - y0
+
+        if np is not None:
+            def blocks(grid):
+                # (h, w, scale * scale) view of the blocks behind the region
+                part = grid[y0 * scale:y1 * scale, x0 * scale:x1 * scale]
+                return part.reshape(h, scale, w, scale).transpose(0, 2, 1, 3).reshape(h, w, scale * scale)
+            chars = blocks(other.chars)
+            priority = blocks(other.priority)
+            rank = priority.astype(np.int64) * 2 + (chars != BLANK)
+            pick = rank.argmax(axis=2)[..., None]
+            dst = (slice(y0, y1), slice(x0, x1))
+            self.chars[dst] = np.take_along_axis(chars, pick, 2)[..., 0]
+            self.priority[dst] = np.take_along_axis(priority, pick, 2)[..., 0]
+            if styled:
+                self.styles[dst] = np.take_along_axis(blocks(other.styles), pick, 2)[..., 0]
+            self.styled = styled
+            return
+
+        width = other.width
+        chars, priority, styles = other.chars, other.priority, other.styles
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                best, best_rank = 0, None
+                for row in range(y * scale, (y + 1) * scale):
+                    i = row * width + x * scale
+                    for k in range(i, i + scale):
+                        rank = priority[k] * 2 + (chars[k] != BLANK)
+                        if best_rank is None or rank > best_rank:
+                            best, best_rank = k, rank
+                j = y * self.width + x
+                self.chars[j] = chars[best]
+                self.priority[j] = priority[best]
+                if styled:
+                    self.styles[j] = styles[best]
+        self.styled = styled
+
+    # --- Double buffering ---
+    def changed_rows(self, other: FrameBuffer, rows) -> list[int]:
+        """
+        Return the rows among `rows` whose characters or styles differ from
+        the same rows of `other` (a buffer of the same size). Rows are
+        compared as whole arrays, without building strings.
+        """
+        styled = self.styled or other.styled
+        if np is not None:
+            if self._cell_diff is None:
+                self._cell_diff = np.empty((self.height, self.width), dtype=bool)
+                self._style_diff = np.empty((self.height, self.width), dtype=bool)
+                self._row_diff = np.empty(self.height, dtype=bool)
+            cells = np.not_equal(self.chars, other.chars, out=self._cell_diff)
+            if styled:
+                np.logical_or(cells, np.not_equal(self.styles, other.styles, out=self._style_diff), out=cells)
+            differs = cells.any(axis=1, out=self._row_diff).tolist()
+            return [y for y in rows if differs[y]]
+
+        width = self.width
+        chars, other_chars = self.chars, other.chars
+        styles, other_styles = self.styles, other.styles
+        changed = []
+        for y in rows:
+            i = y * width
+            j = i + width
+            if chars[i:j] != other_chars[i:j] or styled and styles[i:j] != other_styles[i:j]:
+                changed.append(y)
+        return changed
+
+    def copy_rows(self, other: FrameBuffer, rows):
+        """Copy the characters and styles of `rows` from `other` (a buffer of the same size) in place."""
+        styled = self.styled or other.styled
+        if np is not None:
+            for y in rows:
+                self.chars[y] = other.chars[y]
+                if styled:
+                    self.styles[y] = other.styles[y]
+        else:
+            width = self.width
+            for y in rows:
+                i = y * width
+                j = i + width
+                self.chars[i:j] = other.chars[i:j]
+                if styled:
+                    self.styles[i:j] = other.styles[i:j]
+        self.styled = styled
+
+    def load(self, cells: list[str]):
+        """Replace every character with a flat row-major list of characters (styles are reset)."""
+        codes = encode(''.join(cells))
+        if np is not None:
+            self.chars.reshape(-1)[:] = codes
+        else:
+            self.chars[:] = codes
+        if self.styled:
+            if np is not None:
+                self.styles.fill(0)
+            else:
+                self.styles[:] = self._blank_styles
+            self.styled = False
+
+    # --- Output ---
+    def row(self, y: int) -> str:
+        """Return row `y` as a string."""
+        if np is not None:
+            return self.chars[y].tobytes().decode(_UTF32)
+        i = y * self.width
+        return self.chars[i:i + self.width].tobytes().decode(_UTF32)
+
+    def rows(self) -> list[str]:
+        """Return every row as a string, top to bottom."""
+        return [self.row(y) for y in range(self.height)]
+
+    def row_styles(self, y: int) -> list[int] | None:
+        """Return the styles of row `y`, or None when every cell has the default style."""
+        if not self.styled:
+            return None
+        if np is not None:
+            styles = self.styles[y]
+            return styles.tolist() if styles.any() else None
+        i = y * self.width
+        styles = self.styles[i:i + self.width]
+        return styles.tolist() if any(styles) else None
+
+    def styled_rows(self) -> list[str]:
+        """
+        Return every row as a string with the SGR escape sequences that draw
+        its styles, each row starting and ending in the default style.
+        """
+        rows = []
+        for y in range(self.height):
+            row, styles = self.row(y), self.row_styles(y)
+            if styles is not None:
+                row, state = styled_text(row, styles)
+                row += sgr(state, 0)
+            rows.append(row)
+        return rows
+
+    def to_list(self, styled: bool = False) -> list[str]:
+        """
+        Return the buffer as a flat row-major list of characters. With
+        `styled`, a cell whose style differs from the previous cell's is
+        prefixed with the SGR sequence switching to it, and the last cell
+        is followed by a reset when needed.
+        """
+        cells = list(self.chars.tobytes().decode(_UTF32))
+        if not styled or not self.styled:
+            return cells
+        state = 0
+        for i, value in enumerate(self.styles.ravel().tolist() if np is not None else self.styles):
+            if value != state:
+                cells[i] = sgr(state, value) + cells[i]
+                state = value
+        if cells:
+            cells[-1] += sgr(state, 0)
+        return cells
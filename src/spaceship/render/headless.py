@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from ..render.framebuffer import FrameBuffer
+
+from ..utils import constants
+
+class HeadlessRenderer:
+    """
+    Drop-in replacement for `Renderer` that keeps frames in memory
+    instead of writing ANSI to a terminal.
+
+    Useful for tests, simulations and benchmarks: nothing is written,
+    and the last composited grid and HUD rows can be inspected.
+    """
+    def __init__(self, size: tuple[int, int] | None = None):
+        # Grid size in cells (see `Renderer`)
+        self.width, self.height = size if size is not None else (constants.SIZE_X, constants.SIZE_Y)
+        # Last composited grid (the camera's FrameBuffer, or a flat character list)
+        self.grid: FrameBuffer | list[str] | None = None
+        # Last rendered HUD rows
+        self.top_hud: list[str] = []
+        self.bottom_hud: list[str] = []
+        # Number of frames completed
+        self.frames = 0
+        # Frame statistics reported by `Renderer`; nothing is diffed or written here
+        self.changed_cells = 0
+        self.bytes_written = 0
+
+    # --- Frame composition ---
+    def begin_frame(self):
+        pass
+
+    def end_frame(self):
+        self.frames += 1
+
+    # --- Drawing ---
+    def draw_hud_top(self, rendered: list[str]):
+        self.top_hud = rendered
+
+    def draw_hud_bottom(self, grid_start: int, rendered: list[str]):
+        self.bottom_hud = rendered
+
+    def draw_diff(self, grid_start: int, render: FrameBuffer | list[str],
+                  regions: list[tuple[int, int, int, int]] | None = None):
+        # Keep a reference only; rows are materialized on demand
+        self.grid = render
+
+    # --- Inspection ---
+    def rows(self) -> list[str]:
+        """Return the last composited grid as a list of row strings."""
+        if self.grid is None:
+            return []
+        if isinstance(self.grid, FrameBuffer):
+            return self.grid.rows()
+        width = self.width
+        return [''.join(self.grid[i:i + width]) for i in range(0, len(self.grid), width)]
+
+    def screen(self) -> str:
+        """Return the whole last frame (top HUD, grid, bottom HUD) as text."""
+        lines = list(self.top_hud)
+        lines += self.rows()
+        lines += self.bottom_hud
+        return '\n'.join(lines)
+
+    # --- Terminal management (no-ops) ---
+    def update_full(self):
+        pass
+
+    def clear_screen(self):
+        pass
+
+    def check_resize(self):
+        return False
+
+    def resize(self, width: int, height: int) -> bool:
+        if (width, height) == (self.width, self.height):
+            return False
+        if width < 1 or height < 1:
+            raise ValueError(f"Grid size must be positive: {width}x{height}")
+        self.width, self.height = width, height
+        return True
+
+    def close(self):
+        pass
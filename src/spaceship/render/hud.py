@@ -1,19 +1,51 @@
+from __future__ import annotations
+
 from enum import Enum
+from functools import lru_cache
 import re
 
-from ..utils.constants import SIZE_X, RIGHT_MARGIN
+from ..render.style import sgr, styled_text
+from ..utils import constants
+
+# Maximum number of distinct (template, keys) pairs kept compiled at once
+TEMPLATE_CACHE_SIZE = 256
 
 class HUDAlignment(Enum):
     RIGHT = 0
     CENTER = 1
     LEFT = 2
 
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(template: str, keys: tuple[str, ...]) -> tuple[str, ...]:
+    """
+    Split a template into alternating literal text and placeholder keys:
+    (text, key, text, key, ..., text). Only `key` placeholders whose key
+    is in `keys` are recognised; anything else stays literal.
+    """
+    pattern = re.compile('`(' + '|'.join(re.escape(key) for key in keys) + ')`')
+    return tuple(pattern.split(template))
+
 class HUDElement():
-    def __init__(self, template: str = '', values: dict[str, str] = dict(), align: HUDAlignment = HUDAlignment.CENTER) -> None:
+    def __init__(self, template: str = '', values: dict[str, str] | None = None, align: HUDAlignment = HUDAlignment.CENTER,
+                 style: int = 0, value_style: int | None = None) -> None:
+        """
+        Args:
+            style (int): Style of the element's text (see render.style).
+            value_style (int | None): Style of the substituted values, if
+                different from `style`.
+        """
         self._template = template
-        self._values = values
+        self._values = values if values is not None else {}
         self.compiled_text = ''
         self.alignment = align
+        self._style = style
+        self._value_style = value_style
+        # Style of each character of compiled_text, or None when all are `style`
+        self.compiled_styles: tuple[int, ...] | None = None
+
+        # Compiled template and the value keys it was compiled for
+        self._segments: tuple[str, ...] = ()
+        self._keys: tuple[str, ...] | None = None
 
         self.resolve_template()
 
@@ -23,8 +55,25 @@ class HUDElement():
     @template.setter
     def template(self, value: str):
         self._template = value
+        self._keys = None
         self.resolve_template()
     
+    @property
+    def style(self) -> int:
+        return self._style
+    @style.setter
+    def style(self, value: int):
+        self._style = value
+        self.resolve_template()
+
+    @property
+    def value_style(self) -> int | None:
+        return self._value_style
+    @value_style.setter
+    def value_style(self, value: int | None):
+        self._value_style = value
+        self.resolve_template()
+
     @property
     def values(self) -> dict[str, str]:
         return self._values
@@ -35,26 +84,65 @@ class HUDElement():
     
     def set_value(self, key: str, value: str):
         """
-        Set a single value in the values dictionary and recompile the template.
+        Set a single value in the values dictionary and re-resolve the template.
+        Setting a value it already has does nothing.
         """
-        self.values[key] = value
+        if key in self._values and self._values[key] == value:
+            return
+        self._values[key] = value
         self.resolve_template()
 
+    def set_values(self, values: dict[str, str]):
+        """
+        Set several values at once, resolving the template a single time
+        (and not at all if nothing changed).
+        """
+        current = self._values
+        changed = False
+        for key, value in values.items():
+            if key not in current or current[key] != value:
+                current[key] = value
+                changed = True
+        if changed:
+            self.resolve_template()
+
     def resolve_template(self):
         """
         Compile the template string with current values.
         This replaces all occurrences of `key` in the template with the corresponding value from `values`.
+        The template is only re-parsed when the set of keys changes.
         """
-        params = self.values.keys()
-        regex_pattern = re.compile('`' + '`|`'.join(re.escape(param) for param in params) + '`')
+        values = self._values
+        keys = tuple(values)
+        if keys != self._keys:
+            self._keys = keys
+            self._segments = compile_template(self._template, keys)
+
+        # Odd segments are placeholder keys
+        parts = list(self._segments)
+        parts[1::2] = [values.get(key, '') for key in parts[1::2]]
+        self.compiled_text = ''.join(parts)
 
-        self.compiled_text = (regex_pattern.sub(lambda match: self.values.get(match.group(0)[1:-1], ''), self.template))[:SIZE_X]
+        if self._value_style is None or self._value_style == self._style:
+            self.compiled_styles = None
+        else:
+            styles = []
+            for i, part in enumerate(parts):
+                styles.extend([self._value_style if i % 2 else self._style] * len(part))
+            self.compiled_styles = tuple(styles)
 
 class HUD():
-    def __init__(self, top_huds: list[HUDElement] = list(), bottom_huds: list[HUDElement] = list()):
-        self._top_huds = top_huds
-        self._bottom_huds = bottom_huds
+    def __init__(self, top_huds: list[HUDElement] | None = None, bottom_huds: list[HUDElement] | None = None,
+                 width: int | None = None):
+        self._top_huds = top_huds if top_huds is not None else []
+        self._bottom_huds = bottom_huds if bottom_huds is not None else []
         self.top_buffer = self.get_top_height()
+        # Row width in cells (the grid width); text past it is clipped
+        self._width = width if width is not None else constants.SIZE_X
+
+        # Last rendered rows as (row contents, row string), reused while unchanged
+        self._top_rows: list[tuple[tuple, str]] = []
+        self._bottom_rows: list[tuple[tuple, str]] = []
 
     def get_top_height(self) -> int:
         """
@@ -73,51 +161,63 @@ class HUD():
         # Return the maximum of right, left, and center aligned elements
         return max(R, L, C)
     
-    def render_top(self) -> list[list[str]]:
+    def get_state(self) -> tuple:
+        """
+        Return a snapshot of everything the HUD draws.
+        Two equal snapshots render identically, so the game can skip redraws.
+        """
+        return (tuple((hud.compiled_text, hud.alignment, hud.style, hud.compiled_styles) for hud in self.top_huds),
+                tuple((hud.compiled_text, hud.alignment, hud.style, hud.compiled_styles) for hud in self.bottom_huds))
+
+    def render_top(self) -> list[str]:
         """
         Render the top HUD elements into a list of strings.
         Each string represents a row in the terminal.
         """
-        rendered = [[' '] * SIZE_X for _ in range(self.top_buffer)]
-        R, L, C = 0, 0, 0
-        for hud in self.top_huds:
-            if hud.alignment == HUDAlignment.LEFT:
-                for i, char in enumerate(hud.compiled_text):
-                    rendered[R][i] = char
-                R += 1
-            elif hud.alignment == HUDAlignment.RIGHT:
-                for i, char in enumerate(hud.compiled_text):
-                    rendered[L][SIZE_X - RIGHT_MARGIN - len(hud.compiled_text) + i] = char
-                L += 1
-            elif hud.alignment == HUDAlignment.CENTER:
-                for i, char in enumerate(hud.compiled_text):
-                    rendered[C][(((SIZE_X - RIGHT_MARGIN) // 2)  - (len(hud.compiled_text)) // 2) + i] = char
-                C += 1
-        
-        return rendered
+        return self._render_rows(self.top_huds, self.top_buffer, self._top_rows)
     
-    def render_bottom(self) -> list[list[str]]:
+    def render_bottom(self) -> list[str]:
         """
         Render the bottom HUD elements into a list of strings.
         Each string represents a row in the terminal.
         """
-        rendered = [[" "] * SIZE_X for _ in range(len(self.bottom_huds))]
+        return self._render_rows(self.bottom_huds, len(self.bottom_huds), self._bottom_rows)
+
+    def _render_rows(self, huds: list[HUDElement], height: int, cache: list[tuple[tuple, str]]) -> list[str]:
+        """
+        Lay out elements into `height` rows: the n-th element of each alignment
+        goes on row n. Rows whose elements and texts are unchanged since the
+        last call are reused from `cache` instead of being rebuilt.
+        """
+        contents = [[] for _ in range(height)]
         R, L, C = 0, 0, 0
-        for hud in self.bottom_huds:
+        for hud in huds:
             if hud.alignment == HUDAlignment.LEFT:
-                for i, char in enumerate(hud.compiled_text):
-                    rendered[R][i] = char
+                contents[R].append((hud.alignment, hud.compiled_text, hud.style, hud.compiled_styles))
                 R += 1
             elif hud.alignment == HUDAlignment.RIGHT:
-                for i, char in enumerate(hud.compiled_text):
-                    rendered[L][SIZE_X - RIGHT_MARGIN - len(hud.compiled_text) + i] = char
+                contents[L].append((hud.alignment, hud.compiled_text, hud.style, hud.compiled_styles))
                 L += 1
             elif hud.alignment == HUDAlignment.CENTER:
-                for i, char in enumerate(hud.compiled_text):
-                    rendered[C][(((SIZE_X - RIGHT_MARGIN) // 2)  - (len(hud.compiled_text)) // 2) + i] = char
+                contents[C].append((hud.alignment, hud.compiled_text, hud.style, hud.compiled_styles))
                 C += 1
 
-        return rendered
+        del cache[height:]
+        rows = []
+        for y, content in enumerate(contents):
+            content = tuple(content)
+            if y < len(cache) and cache[y][0] == content:
+                rows.append(cache[y][1])
+                continue
+
+            row = build_row(content, self._width)
+            if y < len(cache):
+                cache[y] = (content, row)
+            else:
+                cache.append((content, row))
+            rows.append(row)
+
+        return rows
     
     def add_top_hud(self, hud: HUDElement):
         """
@@ -132,6 +232,17 @@ class HUD():
         """
         self._bottom_huds.append(hud)
     
+    @property
+    def width(self) -> int:
+        return self._width
+    @width.setter
+    def width(self, value: int):
+        if value != self._width:
+            self._width = value
+            # Cached rows were laid out for the old width
+            self._top_rows.clear()
+            self._bottom_rows.clear()
+
     @property
     def top_huds(self) -> list[HUDElement]:
         return self._top_huds
@@ -145,4 +256,47 @@ class HUD():
         return self._bottom_huds
     @bottom_huds.setter
     def bottom_huds(self, value: list[HUDElement]):
-        self._bottom_huds = value
\ No newline at end of file
+        self._bottom_huds = value
+
+def build_row(content: tuple[tuple[HUDAlignment, str, int, tuple[int, ...] | None], ...],
+              width: int | None = None) -> str:
+    """
+    Build one HUD row `width` cells wide (default `constants.SIZE_X`) from
+    (alignment, text, style, styles) tuples, drawn in order so later
+    elements overwrite earlier ones where they overlap. Text longer than
+    the row is clipped. A row with styled text carries the SGR sequences
+    that draw it and ends in the default style.
+    """
+    if width is None:
+        width = constants.SIZE_X
+    row = [' '] * width
+    row_styles = None
+    for alignment, text, style, styles in content:
+        if len(text) > width:
+            text = text[:width]
+            if styles is not None:
+                styles = styles[:width]
+        if alignment == HUDAlignment.LEFT:
+            start = 0
+        elif alignment == HUDAlignment.RIGHT:
+            start = width - constants.RIGHT_MARGIN - len(text)
+        else:
+            start = ((width - constants.RIGHT_MARGIN) // 2) - len(text) // 2
+        if styles is None and style:
+            styles = [style] * len(text)
+        if styles is not None and row_styles is None:
+            row_styles = [0] * width
+        if 0 <= start and start + len(text) <= width:
+            row[start:start + len(text)] = text
+            if row_styles is not None:
+                row_styles[start:start + len(text)] = styles if styles is not None else [0] * len(text)
+        else:
+            # Off the left edge: negative indices wrap around like list indexing
+            for i, char in enumerate(text):
+                row[start + i] = char
+                if row_styles is not None:
+                    row_styles[start + i] = styles[i] if styles is not None else 0
+    if row_styles is None:
+        return ''.join(row)
+    text, state = styled_text(''.join(row), row_styles)
+    return text + sgr(state, 0)
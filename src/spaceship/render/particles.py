@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import math
+import random
+from array import array
+
+from ..utils.math import Vector, VectorArray
+from ..render.framebuffer import np
+
+
+class ParticleEmitter:
+    """
+    A pool of lightweight particles stored in contiguous arrays.
+
+    Each particle has a position, velocity, remaining lifetime and glyph.
+    The game integrates every particle at once each fixed tick and the
+    camera draws them straight into its framebuffer at `priority`; no
+    Entity or Sprite is created per particle.
+
+    Live particles are kept packed at the start of the arrays. The pool has
+    a fixed `capacity`; particles emitted while it is full are dropped.
+    """
+
+    def __init__(self, capacity: int = 10000, priority: int = 1, acceleration: Vector = None, style: int = 0):
+        # Maximum number of live particles
+        self.capacity = capacity
+        # Z-order priority and style (see render.style) the particles are drawn with
+        self._priority = priority
+        self._style = style
+        # Constant acceleration applied to every particle (e.g. gravity), world units/s²
+        self.acceleration = acceleration if acceleration is not None else Vector()
+
+        # Number of live particles (they occupy indices [0, count))
+        self.count = 0
+
+        # Particle state, one slot per particle
+        self.positions = VectorArray(capacity)
+        self.velocities = VectorArray(capacity)
+        if np is not None:
+            self.life = np.zeros(capacity, dtype=np.float64)
+            self.glyphs = np.zeros(capacity, dtype=np.uint32)
+        else:
+            self.life = array('d', bytes(8 * capacity))
+            self.glyphs = array('I', bytes(4 * capacity))
+
+        # Set when particles moved, spawned or died; cleared by the camera
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def priority(self) -> int:
+        """Z-order priority the particles are drawn at."""
+        return self._priority
+
+    @priority.setter
+    def priority(self, value: int):
+        if value != self._priority:
+            self._priority = value
+            self.dirty = True
+
+    @property
+    def style(self) -> int:
+        """Style (see render.style) every particle is drawn with."""
+        return self._style
+
+    @style.setter
+    def style(self, value: int):
+        if value != self._style:
+            self._style = value
+            self.dirty = True
+
+    # --- Emission ---
+    def emit(self, position: Vector, velocity: Vector, lifetime: float, glyph: str = '*'):
+        """Spawn a single particle (dropped if the pool is full)."""
+        i = self.count
+        if i >= self.capacity:
+            return
+        self.positions.x[i] = position.x
+        self.positions.y[i] = position.y
+        self.velocities.x[i] = velocity.x
+        self.velocities.y[i] = velocity.y
+        self.life[i] = lifetime
+        self.glyphs[i] = ord(glyph)
+        self.count += 1
+        self.dirty = True
+
+    def burst(self, position: Vector, count: int, speed: float, lifetime: float, glyphs: str = '*',
+              direction: float = 0.0, spread: float = 2 * math.pi):
+        """
+        Spawn `count` particles at `position` flying out in random directions
+        within `spread` radians around `direction`, at random speeds up to
+        `speed`. Each particle takes a random glyph from `glyphs`.
+        """
+        start = self.count
+        n = min(count, self.capacity - start)
+        if n <= 0:
+            return
+        end = start + n
+        codes = [ord(glyph) for glyph in glyphs]
+
+        if np is not None:
+            angles = direction + (np.random.random(n) - 0.5) * spread
+            speeds = np.random.random(n) * speed
+            self.positions.x[start:end] = position.x
+            self.positions.y[start:end] = position.y
+            self.velocities.x[start:end] = np.cos(angles) * speeds
+            self.velocities.y[start:end] = np.sin(angles) * speeds
+            self.life[start:end] = lifetime
+            self.glyphs[start:end] = np.random.choice(np.array(codes, dtype=np.uint32), n)
+        else:
+            for i in range(start, end):
+                angle = direction + (random.random() - 0.5) * spread
+                velocity = random.random() * speed
+                self.positions.x[i] = position.x
+                self.positions.y[i] = position.y
+                self.velocities.x[i] = math.cos(angle) * velocity
+                self.velocities.y[i] = math.sin(angle) * velocity
+                self.life[i] = lifetime
+                self.glyphs[i] = random.choice(codes)
+
+        self.count = end
+        self.dirty = True
+
+    def clear(self):
+        """Remove every particle."""
+        if self.count:
+            self.count = 0
+            self.dirty = True
+
+    # --- Simulation ---
+    def update(self, dt: float):
+        """Integrate every live particle by `dt` and drop the expired ones."""
+        n = self.count
+        if not n:
+            return
+        px, py = self.positions.x, self.positions.y
+        vx, vy = self.velocities.x, self.velocities.y
+        ax, ay = self.acceleration.x * dt, self.acceleration.y * dt
+
+        if np is not None:
+            vx[:n] += ax
+            vy[:n] += ay
+            px[:n] += vx[:n] * dt
+            py[:n] += vy[:n] * dt
+            life = self.life[:n]
+            life -= dt
+
+            # Pack the survivors at the start of the arrays
+            alive = life > 0
+            live = int(np.count_nonzero(alive))
+            if live != n:
+                for column in (px, py, vx, vy, self.life, self.glyphs):
+                    column[:live] = column[:n][alive]
+            self.count = live
+        else:
+            life = self.life
+            glyphs = self.glyphs
+            live = 0
+            for i in range(n):
+                remaining = life[i] - dt
+                if remaining <= 0:
+                    continue
+                vx[live] = vx[i] + ax
+                vy[live] = vy[i] + ay
+                px[live] = px[i] + vx[live] * dt
+                py[live] = py[i] + vy[live] * dt
+                life[live] = remaining
+                glyphs[live] = glyphs[i]
+                live += 1
+            self.count = live
+
+        self.dirty = True
@@ -1,89 +1,260 @@
+from __future__ import annotations
+
+import os
 import shutil
-from sys import stdout
+import signal
+import sys
+import threading
+import time
+from typing import TextIO
 
 from ..render.hud import HUD
+from ..render.framebuffer import FrameBuffer
+from ..render.style import sgr, styled_text, strip_sgr
 
-from ..utils.constants import SIZE_X, SIZE_Y, LEFT_MARGIN, TOP_MARGIN, CELL_WIDTH
+from ..utils import constants
 
 class Renderer:
     """
     Manages the game grid buffer and efficient terminal redraws.
     """
-    def __init__(self):
-        # Frame buffer holding the last drawn state (used for diffing)
-        self.prev_grid = [' '] * (SIZE_X * SIZE_Y)
+    def __init__(self, synchronized_output: bool | None = None, stream: TextIO | None = None,
+                 size: tuple[int, int] | None = None):
+        """
+        Args:
+            synchronized_output (bool | None): Wrap frames in synchronized-update
+                mode; None detects support from the environment.
+            stream (TextIO | None): Where output is written (stdout by default).
+            size (tuple[int, int] | None): Grid size in cells; defaults to
+                `constants.SIZE_X` x `constants.SIZE_Y`. Change it with `resize`.
+        """
+        # Where ANSI output is written (the terminal by default)
+        self.stream = stream if stream is not None else sys.stdout
+
+        # Grid size in cells
+        self.width, self.height = size if size is not None else (constants.SIZE_X, constants.SIZE_Y)
+
+        # Front buffer: the grid as it is on screen. Frames composited into the
+        # camera's (back) buffer are compared against it, and only the rows
+        # that changed are copied over after being drawn, so steady frames
+        # allocate nothing.
+        self.front = FrameBuffer(self.width, self.height)
+        # Back buffer for frames passed as flat character lists (allocated on first use)
+        self._list_buffer: FrameBuffer | None = None
+        # Style the terminal is currently set to (see render.style; 0 = default)
+        self.style = 0
+        # Set after a full clear so the next diff ignores dirty regions
+        self.full_diff = True
+        # HUD rows currently on screen (only changed rows are redrawn)
+        self.prev_hud_top: list[str] = []
+        self.prev_hud_bottom: list[str] = []
 
         # Track terminal size so we can detect when it changes
         self.prev_terminal_size = shutil.get_terminal_size()
-    
-    # --- HUD drawing ---
-    def draw_hud_top(self, rendered: list[list[str]]):
+        # Set by the SIGWINCH handler; without SIGWINCH (Windows, or a renderer
+        # created off the main thread) the size is polled every `resize_poll_interval` seconds
+        self._resized = False
+        self._previous_sigwinch = None
+        self.watching_resize = self._watch_resize()
+        self.resize_poll_interval = 0.25
+        self._next_resize_poll = 0.0
+
+        # Wrap frames in synchronized-update mode (DEC private mode 2026);
+        # None means detect support from the environment
+        if synchronized_output is None:
+            synchronized_output = supports_synchronized_output(self.stream)
+        self.synchronized_output = synchronized_output
+
+        # Output collected for the frame in progress, None outside a frame
+        self.frame: list[str] | None = None
+
+        # Statistics of the last frame: cells redrawn by draw_diff, bytes written by end_frame
+        self.changed_cells = 0
+        self.bytes_written = 0
+
+    # --- Frame composition ---
+    def begin_frame(self):
         """
-        Render the top HUD.
+        Start collecting output for a frame.
+        Everything drawn until `end_frame` is sent to the terminal in one write.
         """
-        # Hide cursor and move it to top-left corner
-        stdout.write("\033[?25l")
-        stdout.write("\033[H")
+        self.frame = []
+        if self.synchronized_output:
+            self.frame.append("\033[?2026h")
+        # Hide cursor once per frame
+        self.frame.append("\033[?25l")
 
-        # Iterate over the rendered HUD and print each line
-        for row in rendered:
-            stdout.write(' ' * LEFT_MARGIN + ''.join(row) + '\n')
-    
-        # Show cursor
-        stdout.flush()
+    def end_frame(self):
+        """
+        Write the collected frame to the terminal and flush once.
+        """
+        frame, self.frame = self.frame, None
+        if frame is None:
+            return
+        # Leave the terminal in the default style between frames
+        if self.style:
+            frame.append(sgr(self.style, 0))
+            self.style = 0
+        if self.synchronized_output:
+            frame.append("\033[?2026l")
+        data = ''.join(frame)
+        self.bytes_written = len(data.encode('utf-8'))
+        self.stream.write(data)
+        self.stream.flush()
 
-    def draw_hud_bottom(self, grid_start: int, rendered: list[list[str]]):
+    def write(self, text: str):
         """
-        Render the bottom HUD.
+        Queue text for the current frame,
+        or write and flush it immediately when no frame is in progress.
         """
-        # Hide the cursor and move cursor to the bottom of the terminal
-        stdout.write("\033[?25l")
-        stdout.write("\033[" + str(SIZE_Y + TOP_MARGIN + grid_start) + ";0H")
+        if self.frame is not None:
+            self.frame.append(text)
+        else:
+            self.stream.write(text)
+            self.stream.flush()
 
-        # Iterate over the rendered HUD and print each line
-        for row in rendered:
-            stdout.write(' ' * LEFT_MARGIN + ''.join(row) + '\n')
-        
-        stdout.flush()
+    # --- HUD drawing ---
+    def draw_hud_top(self, rendered: list[str]):
+        """
+        Render the top HUD, re-emitting only rows that changed.
+        """
+        self.write(self.hud_rows(1, rendered, self.prev_hud_top))
+
+    def draw_hud_bottom(self, grid_start: int, rendered: list[str]):
+        """
+        Render the bottom HUD, re-emitting only rows that changed.
+        It starts on the row below the last grid row.
+        """
+        self.write(self.hud_rows(self.height + constants.TOP_MARGIN + grid_start + 1, rendered, self.prev_hud_bottom))
+
+    def hud_rows(self, first_row: int, rendered: list[str], previous: list[str]) -> str:
+        """
+        Return the output that updates HUD rows drawn from terminal row
+        `first_row`, comparing with (and then updating) `previous`.
+        Rows that are no longer used are blanked.
+
+        Styled rows carry their own SGR sequences, starting from and
+        returning to the default style.
+        """
+        out = []
+        margin = ' ' * constants.LEFT_MARGIN
+        for i, row in enumerate(rendered):
+            if i < len(previous) and previous[i] == row:
+                continue
+            out.append(self.move_to(first_row + i, 1) + sgr(self.style, 0) + margin + row)
+            self.style = 0
+        for i in range(len(rendered), len(previous)):
+            out.append(self.move_to(first_row + i, 1) + sgr(self.style, 0)
+                       + margin + ' ' * len(strip_sgr(previous[i])))
+            self.style = 0
+        previous[:] = rendered
+        return ''.join(out)
     
     # --- Grid Drawing ---
-    def draw_diff(self, grid_start: int, render: list[str]):
+    def draw_diff(self, grid_start: int, render: FrameBuffer | list[str],
+                  regions: list[tuple[int, int, int, int]] | None = None):
         """
         Redraw only the cells that have changed since the last frame.
 
+        Adjacent changed cells on a row are written as one span, the cursor
+        is moved with whichever of an absolute move, a relative move or
+        rewriting the unchanged gap is shortest, and the whole diff is
+        queued as a single write. A cell also counts as changed when its
+        style did; styles are switched with the shortest SGR sequence from
+        the style the terminal is in (`self.style`).
+
         Args:
             grid_start (int): Terminal row where the grid begins.
-            render (list[str]): Flat list of characters to render.
+            render (FrameBuffer | list[str]): Composited frame, or a flat list of characters.
+            regions (list[tuple[int, int, int, int]] | None): (x0, y0, x1, y1)
+                rectangles, end-exclusive, that may have changed. Only these are
+                compared; None compares the whole grid.
         """
-        # Hide cursor
-        stdout.write("\033[?25l")
+        # After a full clear every cell has to be compared
+        if self.full_diff:
+            regions = None
+            self.full_diff = False
+
+        # Frames given as character lists are loaded into a reusable back buffer
+        if not isinstance(render, FrameBuffer):
+            buffer = self._list_buffer
+            if buffer is None or (buffer.width, buffer.height) != (self.width, self.height):
+                buffer = self._list_buffer = FrameBuffer(self.width, self.height)
+            buffer.load(render)
+            render = buffer
+        front = self.front
+
+        # Column ranges to compare on each row
+        if regions is None:
+            width = self.width
+            scan = {y: [(0, width)] for y in range(self.height)}
+        else:
+            scan = {}
+            for x0, y0, x1, y1 in regions:
+                for y in range(y0, y1):
+                    scan.setdefault(y, []).append((x0, x1))
+
+        out = []
+        changed = 0
 
-        # Iterate over the new render and compare with the previous state
-        for i, cell in enumerate(render):
-            if cell != self.prev_grid[i]:
-                # Convert 1D index to 2D grid coordinates
-                y, x = divmod(i, SIZE_X)
+        # Terminal cursor position (row, col), or None when unknown
+        cursor = None
+        state = self.style
+        # Layout settings, read at use so `constants.configure` applies
+        left, top, cell_width = constants.LEFT_MARGIN, constants.TOP_MARGIN, constants.CELL_WIDTH
 
-                # Calculate terminal row and column
-                r = TOP_MARGIN + grid_start + y + 1
-                c = LEFT_MARGIN + x * CELL_WIDTH
+        # Only rows that differ from the front buffer are turned into strings
+        rows = front.changed_rows(render, sorted(scan))
+        for y in rows:
+            row = render.row(y)
+            styles = render.row_styles(y)
+            prev = front.row(y)
+            prev_styles = front.row_styles(y)
 
-                # Move cursor and draw new character
-                stdout.write(self.move_to(r, c) + cell)
+            # Terminal row for this grid row
+            r = top + grid_start + y + 1
+            prev_end = None
+            for start, end in row_spans(prev, row, scan[y], prev_styles, styles):
+                c = left + start * cell_width
 
-                # Update buffer
-                self.prev_grid[i] = cell
-        
-        # Show cursor
-        stdout.flush()
+                # Rewriting the unchanged cells since the last span is an option
+                # when the cursor was left on this row by that span
+                gap, gap_state = None, state
+                if prev_end is not None:
+                    gap, gap_state = self.format_cells(row[prev_end:start], styles, state, prev_end)
+                motion = self.cursor_motion(cursor, r, c, gap)
+                if motion is gap:
+                    state = gap_state
+                out.append(motion)
+                text, state = self.format_cells(row[start:end], styles, state, start)
+                out.append(text)
+                changed += end - start
+
+                # The cursor now sits right after the span (unknown if it hit the edge)
+                c_end = left + end * cell_width
+                cursor = (r, c_end) if c_end <= self.prev_terminal_size.columns else None
+                prev_end = end if cursor is not None else None
+
+        # The drawn rows are now on screen
+        front.copy_rows(render, rows)
+        self.style = state
+
+        self.changed_cells = changed
+        self.write(''.join(out))
 
     def update_full(self):
         """
         Full clear and redraw of the grid.
         Resets buffer and updates terminal size snapshot.
         """
-        # Reset state
-        self.prev_grid = [' '] * (SIZE_X * SIZE_Y)
+        # Reset state: the screen is about to be blank
+        if (self.front.width, self.front.height) != (self.width, self.height):
+            self.front = FrameBuffer(self.width, self.height)
+        else:
+            self.front.clear()
+        self.full_diff = True
+        self.prev_hud_top = []
+        self.prev_hud_bottom = []
         self.prev_terminal_size = shutil.get_terminal_size()
 
         # Clear the screen
@@ -96,19 +267,203 @@ class Renderer:
         Terminal cursor positions are 1-based.
         """
         return f"\033[{r};{c}H"
+
+    def cursor_motion(self, cursor: tuple[int, int] | None, r: int, c: int, gap: str | None = None) -> str:
+        """
+        Return the shortest escape sequence (or text) that moves the cursor
+        from `cursor` to (row, col).
+
+        Args:
+            cursor (tuple[int, int] | None): Current cursor position, None if unknown.
+            r (int): Target terminal row (1-based).
+            c (int): Target terminal column (1-based).
+            gap (str | None): Text already on screen between the cursor and the
+                target on the same row; writing it again also moves the cursor.
+        """
+        absolute = self.move_to(r, c)
+        if cursor is None:
+            return absolute
+
+        cr, cc = cursor
+        best = absolute
+
+        # Relative moves: vertical then horizontal
+        relative = ''
+        if r > cr:
+            relative += "\033[B" if r - cr == 1 else f"\033[{r - cr}B"
+        elif r < cr:
+            relative += "\033[A" if cr - r == 1 else f"\033[{cr - r}A"
+        if c > cc:
+            relative += "\033[C" if c - cc == 1 else f"\033[{c - cc}C"
+        elif c < cc:
+            relative += "\033[D" if cc - c == 1 else f"\033[{cc - c}D"
+        if len(relative) < len(best):
+            best = relative
+
+        # Just keep writing through the unchanged cells
+        if gap is not None and r == cr and len(gap) <= len(best):
+            best = gap
+
+        return best
+
+    def format_cells(self, cells: str, styles: list[int] | None = None, state: int = 0,
+                     start: int = 0) -> tuple[str, int]:
+        """
+        Return the terminal text for a run of grid cells, padding each cell
+        to CELL_WIDTH columns, and the style the terminal is left in.
+
+        Args:
+            cells (str): The cells' characters.
+            styles (list[int] | None): Styles of the whole row (None = all default).
+            state (int): Style the terminal is in before the text.
+            start (int): Column of the first cell in the row.
+        """
+        cell_width = constants.CELL_WIDTH
+        if cell_width != 1:
+            pad = ' ' * (cell_width - 1)
+            cells = ''.join(cell + pad for cell in cells)
+        if styles is None:
+            return (sgr(state, 0) + cells if state else cells), 0
+        styles = styles[start:start + len(cells) // cell_width]
+        if cell_width != 1:
+            styles = [value for value in styles for _ in range(cell_width)]
+        return styled_text(cells, styles, state)
     def clear_screen(self):
         """
         Clear the terminal screen completely and reset cursor to top-left.
         """
-        stdout.write("\033[2J\033[H")
-        stdout.flush()
+        self.stream.write("\033[0m\033[2J\033[H")
+        self.stream.flush()
+        self.style = 0
     def check_resize(self):
         """
         Detect if the terminal was resized.
-        If so, trigger a full redraw to avoid misalignment.
+        If so, trigger a full redraw to avoid misalignment and return the new
+        terminal size; otherwise return False.
+
+        The terminal is only queried after a SIGWINCH (or, where there is
+        none, at most every `resize_poll_interval` seconds), so calling this
+        every frame costs a flag check.
         """
+        if self.watching_resize:
+            if not self._resized:
+                return False
+            self._resized = False
+        else:
+            now = time.perf_counter()
+            if now < self._next_resize_poll:
+                return False
+            self._next_resize_poll = now + self.resize_poll_interval
         size = shutil.get_terminal_size()
         if size != self.prev_terminal_size:
             self.update_full()
             return size
-        return False
\ No newline at end of file
+        return False
+
+    def resize(self, width: int, height: int) -> bool:
+        """
+        Change the grid size. The previous frame is forgotten and the screen
+        cleared, so the next frame is drawn in full. Returns False when the
+        size is unchanged (and nothing is done).
+        """
+        if (width, height) == (self.width, self.height):
+            return False
+        if width < 1 or height < 1:
+            raise ValueError(f"Grid size must be positive: {width}x{height}")
+        self.width, self.height = width, height
+        self.update_full()
+        return True
+
+    def close(self):
+        """Restore the SIGWINCH handler that was installed before this renderer."""
+        if self.watching_resize:
+            signal.signal(signal.SIGWINCH, self._previous_sigwinch)
+            self.watching_resize = False
+            self._previous_sigwinch = None
+
+    def _watch_resize(self) -> bool:
+        """
+        Install a SIGWINCH handler flagging resizes, chained to the previous one.
+        Signal handlers can only be set from the main thread, and only a
+        terminal sends SIGWINCH; returns whether the handler was installed.
+        """
+        if not hasattr(signal, 'SIGWINCH') or threading.current_thread() is not threading.main_thread():
+            return False
+        try:
+            if not self.stream.isatty():
+                return False
+        except (AttributeError, ValueError):
+            return False
+        self._previous_sigwinch = signal.getsignal(signal.SIGWINCH)
+        signal.signal(signal.SIGWINCH, self._on_sigwinch)
+        return True
+
+    def _on_sigwinch(self, signum, frame):
+        self._resized = True
+        if callable(self._previous_sigwinch):
+            self._previous_sigwinch(signum, frame)
+
+def supports_synchronized_output(stream: TextIO) -> bool:
+    """
+    Guess whether the terminal understands synchronized-update mode.
+    Terminals ignore unknown private modes, so only terminals known to
+    mishandle them (the Linux console, dumb terminals) are excluded.
+    """
+    term = os.environ.get('TERM', '')
+    return stream.isatty() and term not in ('', 'dumb', 'linux')
+
+def changed_spans(old: str, new: str, old_styles: list[int] | None = None,
+                  new_styles: list[int] | None = None) -> list[tuple[int, int]]:
+    """
+    Return the (start, end) ranges of cells that differ between two rows,
+    with adjacent changed cells merged into a single span. When styles are
+    given (None = all default), cells whose style differs count as changed.
+    """
+    spans = []
+    start = None
+    if old_styles != new_styles:
+        n = len(new)
+        old_styles = old_styles if old_styles is not None else [0] * n
+        new_styles = new_styles if new_styles is not None else [0] * n
+        for x, (a, b, c, d) in enumerate(zip(old, new, old_styles, new_styles)):
+            if a != b or c != d:
+                if start is None:
+                    start = x
+            elif start is not None:
+                spans.append((start, x))
+                start = None
+    else:
+        for x, (a, b) in enumerate(zip(old, new)):
+            if a != b:
+                if start is None:
+                    start = x
+            elif start is not None:
+                spans.append((start, x))
+                start = None
+    if start is not None:
+        spans.append((start, len(new)))
+    return spans
+
+def row_spans(old: str, new: str, ranges: list[tuple[int, int]],
+              old_styles: list[int] | None = None, new_styles: list[int] | None = None) -> list[tuple[int, int]]:
+    """
+    Return the changed spans of a row, only looking inside the given
+    (start, end) column ranges (see `changed_spans` for styles).
+    """
+    # Merge overlapping ranges so no cell is compared twice
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    spans = []
+    for start, end in merged:
+        if start == 0 and end >= len(new):
+            return changed_spans(old, new, old_styles, new_styles)
+        spans.extend((start + a, start + b) for a, b in changed_spans(
+            old[start:end], new[start:end],
+            old_styles[start:end] if old_styles is not None else None,
+            new_styles[start:end] if new_styles is not None else None))
+    return spans
@@ -1,11 +1,127 @@
+from array import array
+from functools import lru_cache
+
 from ..utils.math import Vector
+from ..render.framebuffer import np, encode, opaque_runs
+
+# Maximum number of distinct sprite strings kept compiled at once
+SPRITE_CACHE_SIZE = 1024
+
+
+class CompiledSprite:
+    """
+    Blit-ready form of a raw sprite string.
+
+    Compiled sprites are shared between every Sprite loaded from the same
+    string, so they must be treated as read-only.
+    """
+    __slots__ = ('lines', 'size', 'center', 'runs', 'bits', 'chars', 'mask',
+                 'styled', 'style_runs', 'styles')
+
+    def __init__(self, lines: list[str], center: Vector, styles: list[list[int]] | None = None):
+        # 2D character grid as a list of strings (each entry = one row)
+        self.lines = lines
+        # Sprite dimensions in characters: x = width, y = height
+        self.size = Vector(max(len(line) for line in lines), len(lines))
+        # Center of the sprite in local coords
+        self.center = center
+        # Opaque runs per row as (x offset, codepoints) pairs
+        self.runs = [[(dx, encode(text)) for dx, text in opaque_runs(line)] for line in lines]
+        # Opacity bitmask per row (bit x set = opaque), used for pixel collisions
+        self.bits = [sum(((1 << len(codes)) - 1) << dx for dx, codes in row) for row in self.runs]
+
+        # With NumPy, a padded char grid and opacity mask allow whole-sprite blits
+        self.chars = None
+        self.mask = None
+        if np is not None:
+            width, height = int(self.size.x), int(self.size.y)
+            self.chars = np.zeros((height, width), dtype=np.uint32)
+            self.mask = np.zeros((height, width), dtype=bool)
+            for y, row in enumerate(self.runs):
+                for dx, codes in row:
+                    self.chars[y, dx:dx + len(codes)] = codes
+                    self.mask[y, dx:dx + len(codes)] = True
+
+        # Cell styles (see render.style), only kept when some cell is styled:
+        # per run like `runs`, and as a grid matching `chars` with NumPy
+        self.styled = styles is not None and any(any(row) for row in styles)
+        self.style_runs = None
+        self.styles = None
+        if self.styled:
+            self.style_runs = [[array('I', row[dx:dx + len(codes)]) for dx, codes in runs]
+                               for runs, row in zip(self.runs, styles)]
+            if np is not None:
+                self.styles = np.zeros((height, width), dtype=np.uint32)
+                for y, row in enumerate(styles):
+                    self.styles[y, :len(row)] = row
+
+
+@lru_cache(maxsize=SPRITE_CACHE_SIZE)
+def compile_sprite(raw_string: str, style: int = 0, colors: str = '',
+                   palette: tuple[tuple[str, int], ...] = ()) -> CompiledSprite:
+    """
+    Parse a raw ASCII string into a CompiledSprite (see `parse_sprite`).
+
+    Results are cached per string and style, so thousands of identical
+    bullets or asteroids share a single compiled sprite.
+    """
+    return parse_sprite(raw_string, style, colors, palette)
+
+
+def parse_sprite(raw_string: str, style: int = 0, colors: str = '',
+                 palette: tuple[tuple[str, int], ...] = ()) -> CompiledSprite:
+    """
+    Parse a raw ASCII string into a new CompiledSprite, without caching.
+
+    Conventions:
+      - The sprite may include a single tab character ('\\t') to mark its
+        visual center. The tab is removed from the final grid and its
+        (x, y) position becomes the center.
+      - If no tab is present, center defaults to (0, 0).
+      - Every cell is drawn in `style`, unless `colors` gives it another
+        one: `colors` has the same rows as the sprite (without the tab),
+        and a character found in `palette` (pairs of (character, style))
+        styles the cell below it.
+    """
+    # Split raw ASCII art into lines (rows)
+    lines = raw_string.split('\n')
+
+    center = None
+    for i, line in enumerate(lines):
+        # If a tab appears in this line, treat its position as the center
+        if '\t' in line:
+            if center is not None:
+                raise ValueError("Too many \\t characters in sprite.")
+            # Center is the first tab's column (x) and current row (y)
+            center = Vector(line.index('\t'), i)
+            # Remove the tab from the visible data
+            lines[i] = line[:center.x] + line[center.x + 1:]
+
+    # Per-cell styles
+    styles = None
+    if style or colors:
+        keys = dict(palette)
+        color_lines = colors.split('\n') if colors else []
+        styles = []
+        for y, line in enumerate(lines):
+            color_line = color_lines[y] if y < len(color_lines) else ''
+            styles.append([keys.get(color_line[x], style) if x < len(color_line) else style
+                           for x in range(len(line))])
+
+    # If no explicit center marker was found, default to (0, 0)
+    return CompiledSprite(lines, center if center is not None else Vector(), styles)
+
 
 class Sprite:
     """Represents an ASCII sprite with a position, size, center, and z-priority."""
+    __slots__ = ('raw_string', 'compiled', 'decoded_string', 'size', 'center', '_priority', '_style',
+                 '_colors', '_palette', 'position', 'dirty')
 
-    def __init__(self, raw_string='', priority=1):
+    def __init__(self, raw_string='', priority=1, style=0, colors='', palette=None):
         # Original (raw) multi-line string used to create the sprite
         self.raw_string = raw_string
+        # Shared, blit-ready representation of raw_string
+        self.compiled: CompiledSprite = None
         # 2D character grid as a list of strings (each entry = one row)
         self.decoded_string = []
         # Sprite dimensions in characters: x = width, y = height
@@ -13,44 +129,77 @@ class Sprite:
         # Center of the sprite in local coords; may be set via a tab marker
         self.center = Vector()
         # Z-order priority: higher numbers render on top of lower ones
-        self.priority = priority
+        self._priority = priority
+        # Base style of every cell (see render.style; 0 = terminal default),
+        # and the color map and palette the sprite was loaded with
+        self._style = style
+        self._colors = colors
+        self._palette: tuple[tuple[str, int], ...] = ()
 
         # World-space position of the sprite (updated by owning Entity/Camera)
         self.position = Vector()
 
-        self.load(raw_string, priority)
+        # Set whenever the sprite's look or placement changes; cleared by the camera
+        self.dirty = True
+
+        self.load(raw_string, priority, style, colors, palette)
+
+    @property
+    def priority(self) -> int:
+        """Z-order priority: higher numbers render on top of lower ones."""
+        return self._priority
 
-    def load(self, raw_string, priority=1):
+    @priority.setter
+    def priority(self, value: int):
+        if value != self._priority:
+            self._priority = value
+            self.dirty = True
+
+    @property
+    def style(self) -> int:
+        """Base style of every cell without a color map entry; setting it recompiles the sprite."""
+        return self._style
+
+    @style.setter
+    def style(self, value: int):
+        if value != self._style:
+            self._restyle(value)
+
+    def load(self, raw_string, priority=1, style=0, colors='', palette=None):
         """
         Initialize the sprite from a raw ASCII string.
+        See `compile_sprite` for the center marker and color map conventions.
+
+        Args:
+            style (int): Style of every cell, built with `render.style.style`.
+            colors (str): Optional color map, one character per sprite cell.
+            palette (dict[str, int] | None): Style of each color map character.
 
-        Conventions:
-          - The sprite may include a single tab character ('\t') to mark its
-            visual center. The tab is removed from the final grid and its
-            (x, y) position becomes self.center.
-          - If no tab is present, center defaults to (0, 0).
+        The decoded grid, size and center are shared with every sprite
+        loaded from the same string; assign new values instead of
+        mutating them in place.
         """
-        # Split raw ASCII art into lines (rows)
-        lines = raw_string.split('\n')
-
-        centerDefined = False
-        for i, line in enumerate(lines):
-            # If a tab appears in this line, treat its position as the center
-            if '\t' in line:
-                if centerDefined:
-                    raise ValueError("Too many \\t characters in sprite.")
-                centerDefined = True
-                # Center is the first tab's column (x) and current row (y)
-                self.center = Vector(line.index('\t'), i)
-                # Remove the tab from the visible data
-                lines[i] = line[:self.center.x] + line[self.center.x + 1:]
-        
-        # If no explicit center marker was found, default to (0, 0)
-        if not centerDefined:
-            self.center = Vector()
-        
-        # Store values for rendering
+        palette = tuple(sorted(palette.items())) if palette else ()
+        compiled = compile_sprite(raw_string, style, colors, palette)
+
+        # Store values for rendering (shared with other sprites using this string)
         self.raw_string = raw_string
-        self.decoded_string = lines
-        self.size = Vector(max(len(line) for line in lines), len(lines))
+        self._style = style
+        self._colors = colors
+        self._palette = palette
+        self.compiled = compiled
+        self.decoded_string = compiled.lines
+        self.size = compiled.size
+        self.center = compiled.center
         self.priority = priority
+        self.dirty = True
+
+    def _restyle(self, style: int):
+        """Recompile the sprite with a new base style."""
+        compiled = compile_sprite(self.raw_string, style, self._colors, self._palette)
+        self._style = style
+        self.compiled = compiled
+        self.decoded_string = compiled.lines
+        self.size = compiled.size
+        self.center = compiled.center
+        self.dirty = True
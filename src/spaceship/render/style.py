@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from functools import lru_cache
+import re
+
+# A style is a plain int, so cells can store it in a uint32 grid next to
+# their character: bits 0-8 hold the foreground color, bits 9-17 the
+# background color (0 = terminal default, n + 1 = palette color n) and
+# the bits above them the attributes. Style 0 is the terminal default.
+COLOR_BITS = 9
+COLOR_MASK = (1 << COLOR_BITS) - 1
+ATTRIBUTE_SHIFT = 2 * COLOR_BITS
+
+BOLD = 1 << ATTRIBUTE_SHIFT
+DIM = 2 << ATTRIBUTE_SHIFT
+ITALIC = 4 << ATTRIBUTE_SHIFT
+UNDERLINE = 8 << ATTRIBUTE_SHIFT
+BLINK = 16 << ATTRIBUTE_SHIFT
+REVERSE = 32 << ATTRIBUTE_SHIFT
+
+# Attribute bit, SGR parameter turning it on, and parameter turning it off
+# (22 turns off both bold and dim)
+ATTRIBUTES = (
+    (BOLD, '1', '22'), (DIM, '2', '22'), (ITALIC, '3', '23'),
+    (UNDERLINE, '4', '24'), (BLINK, '5', '25'), (REVERSE, '7', '27'),
+)
+
+# Names of the 16 basic palette colors
+COLORS = {
+    'black': 0, 'red': 1, 'green': 2, 'yellow': 3, 'blue': 4, 'magenta': 5, 'cyan': 6, 'white': 7,
+    'bright_black': 8, 'bright_red': 9, 'bright_green': 10, 'bright_yellow': 11,
+    'bright_blue': 12, 'bright_magenta': 13, 'bright_cyan': 14, 'bright_white': 15,
+}
+
+# Maximum number of distinct style transitions kept formatted at once
+SGR_CACHE_SIZE = 4096
+
+# Select Graphic Rendition escape sequences
+SGR_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
+
+
+def style(fg: int | str | None = None, bg: int | str | None = None, bold: bool = False,
+          dim: bool = False, italic: bool = False, underline: bool = False,
+          blink: bool = False, reverse: bool = False) -> int:
+    """
+    Build a cell style.
+
+    Args:
+        fg: Foreground color: a palette index (0-255), a name from COLORS,
+            or None for the terminal default.
+        bg: Background color, like `fg`.
+        bold, dim, italic, underline, blink, reverse: Text attributes.
+    """
+    value = _color_bits(fg) | _color_bits(bg) << COLOR_BITS
+    for flag, bit in ((bold, BOLD), (dim, DIM), (italic, ITALIC),
+                      (underline, UNDERLINE), (blink, BLINK), (reverse, REVERSE)):
+        if flag:
+            value |= bit
+    return value
+
+
+def _color_bits(color: int | str | None) -> int:
+    if color is None:
+        return 0
+    if isinstance(color, str):
+        color = COLORS[color]
+    if not 0 <= color <= 255:
+        raise ValueError(f"Palette color out of range: {color}")
+    return color + 1
+
+
+def _color_params(bits: int, base: int) -> str:
+    """SGR parameters selecting a color (base 30 = foreground, 40 = background)."""
+    if bits == 0:
+        return str(base + 9)
+    color = bits - 1
+    if color < 8:
+        return str(base + color)
+    if color < 16:
+        return str(base + 60 + color - 8)
+    return f"{base + 8};5;{color}"
+
+
+def _params(old: int, new: int) -> list[str]:
+    """SGR parameters turning style `old` into `new`."""
+    params = []
+    kept = old
+    # Turn off attributes that go away (bold and dim share their off code)
+    removed = old & ~new
+    for bit, _, off in ATTRIBUTES:
+        if removed & bit and off not in params:
+            params.append(off)
+            if off == '22':
+                kept &= ~(BOLD | DIM)
+            else:
+                kept &= ~bit
+    for bit, on, _ in ATTRIBUTES:
+        if new & bit and not kept & bit:
+            params.append(on)
+
+    if (old ^ new) & COLOR_MASK:
+        params.append(_color_params(new & COLOR_MASK, 30))
+    if (old >> COLOR_BITS ^ new >> COLOR_BITS) & COLOR_MASK:
+        params.append(_color_params(new >> COLOR_BITS & COLOR_MASK, 40))
+    return params
+
+
+@lru_cache(maxsize=SGR_CACHE_SIZE)
+def sgr(old: int, new: int) -> str:
+    """
+    Return the shortest SGR escape sequence that switches the terminal from
+    style `old` to style `new`: either only the parameters that change, or
+    a reset followed by everything `new` sets. Empty when they are equal.
+    """
+    if old == new:
+        return ''
+    if new == 0:
+        return "\033[0m"
+    changes = ';'.join(_params(old, new))
+    reset = ';'.join(['0'] + _params(0, new))
+    return f"\033[{changes if len(changes) <= len(reset) else reset}m"
+
+
+def styled_text(text: str, styles, state: int = 0) -> tuple[str, int]:
+    """
+    Return `text` with the SGR sequences needed to draw character i in
+    `styles[i]`, starting from terminal style `state`, and the style the
+    terminal is left in.
+    """
+    out = []
+    start = 0
+    for i, value in enumerate(styles):
+        if value != state:
+            if i > start:
+                out.append(text[start:i])
+            out.append(sgr(state, value))
+            state = value
+            start = i
+    out.append(text[start:])
+    return ''.join(out), state
+
+
+def strip_sgr(text: str) -> str:
+    """Remove SGR escape sequences from text, leaving what is displayed."""
+    return SGR_PATTERN.sub('', text)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from math import floor
+from typing import Callable, Iterator
+
+from ..render.framebuffer import TRANSPARENT
+from ..render.sprite import CompiledSprite, parse_sprite
+from ..utils.constants import CHAR_ASPECT
+
+
+class TileMap:
+    """
+    A static background layer of character tiles, drawn under entities.
+
+    Tile (tx, ty) covers world x in [tx, tx + 1) and y in
+    [ty * CHAR_ASPECT, (ty + 1) * CHAR_ASPECT), so one tile is one screen
+    cell and sprites line up with it. The map is split into chunks of
+    `chunk_size` tiles, each stored as a compiled sprite (a character
+    array with its opacity mask), so drawing copies the visible window
+    chunk by chunk instead of one tile at a time.
+
+    Chunks are loaded lazily: the first time a chunk is needed,
+    `loader(cx, cy)` is called for its rows. With `max_chunks`, the least
+    recently drawn chunks that can be loaded again are dropped.
+    Transparent '\\a' cells and missing chunks let the layer below (or
+    the blank background) show through.
+    """
+
+    def __init__(self, loader: Callable[[int, int], str | tuple[str, str] | None] | None = None,
+                 chunk_size: tuple[int, int] = (64, 32), priority: int = 0, style: int = 0,
+                 palette: dict[str, int] | None = None, max_chunks: int | None = None):
+        """
+        Args:
+            loader: Called as `loader(cx, cy)` for chunks that were not set. Returns
+                the chunk's rows as a string, a (text, colors) pair (see
+                `compile_sprite` for color maps), or None for an empty chunk.
+            chunk_size (tuple[int, int]): Chunk width and height in tiles.
+            priority (int): Z-order priority of every tile (see `Sprite.priority`).
+            style (int): Style of every tile without a color map entry.
+            palette (dict[str, int] | None): Style of each color map character.
+            max_chunks (int | None): Most loaded chunks kept at once (None = all);
+                keep it above the number of chunks one screen overlaps.
+        """
+        self.loader = loader
+        self.chunk_width, self.chunk_height = chunk_size
+        self.priority = priority
+        self.style = style
+        self.palette = tuple(sorted(palette.items())) if palette else ()
+        self.max_chunks = max_chunks
+
+        # Compiled chunks by (cx, cy), least recently used first (None = empty)
+        self._chunks: dict[tuple[int, int], CompiledSprite | None] = {}
+        # Chunks given with set_chunk, which the loader cannot bring back
+        self._pinned: set[tuple[int, int]] = set()
+
+        # Chunks whose tiles changed since the camera last drew them
+        self.changed: set[tuple[int, int]] = set()
+
+    @classmethod
+    def from_text(cls, text: str, colors: str = '', **kwargs) -> TileMap:
+        """Build a map whose tile (0, 0) is the top-left character of `text`."""
+        tilemap = cls(**kwargs)
+        rows = text.split('\n')
+        color_rows = colors.split('\n') if colors else []
+        width = max(len(row) for row in rows)
+        cw, ch = tilemap.chunk_width, tilemap.chunk_height
+        for cy in range(0, -(-len(rows) // ch)):
+            for cx in range(0, -(-width // cw)):
+                part = [row[cx * cw:(cx + 1) * cw] for row in rows[cy * ch:(cy + 1) * ch]]
+                if any(line.strip(TRANSPARENT) for line in part):
+                    part_colors = [row[cx * cw:(cx + 1) * cw] for row in color_rows[cy * ch:(cy + 1) * ch]]
+                    tilemap.set_chunk(cx, cy, '\n'.join(part), '\n'.join(part_colors))
+        return tilemap
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.changed)
+
+    # --- Chunks ---
+    def set_chunk(self, cx: int, cy: int, text: str | None, colors: str = ''):
+        """
+        Replace the tiles of chunk (cx, cy) with `text` (rows of at most
+        `chunk_size` characters; None empties the chunk).
+        """
+        key = (cx, cy)
+        self._chunks.pop(key, None)
+        self._chunks[key] = self._compile(text, colors)
+        self._pinned.add(key)
+        self.changed.add(key)
+
+    def unload(self):
+        """Drop every chunk the loader can load again."""
+        for key in [key for key in self._chunks if key not in self._pinned]:
+            del self._chunks[key]
+
+    def chunk(self, cx: int, cy: int) -> CompiledSprite | None:
+        """Return compiled chunk (cx, cy), loading it if needed (None = empty)."""
+        key = (cx, cy)
+        chunks = self._chunks
+        if key in chunks:
+            # Mark as most recently used
+            compiled = chunks[key] = chunks.pop(key)
+            return compiled
+        data = self.loader(cx, cy) if self.loader is not None else None
+        text, colors = data if isinstance(data, tuple) else (data, '')
+        compiled = chunks[key] = self._compile(text, colors)
+        if self.max_chunks is not None and len(chunks) > self.max_chunks:
+            self._evict()
+        return compiled
+
+    def chunks_in(self, x0: int, y0: int, x1: int, y1: int) -> Iterator[tuple[int, int, CompiledSprite]]:
+        """
+        Yield (tx, ty, compiled) for every non-empty chunk overlapping the
+        tile rectangle [x0, x1) x [y0, y1), with (tx, ty) its top-left tile.
+        """
+        cw, ch = self.chunk_width, self.chunk_height
+        for cy in range(y0 // ch, (y1 - 1) // ch + 1):
+            for cx in range(x0 // cw, (x1 - 1) // cw + 1):
+                compiled = self.chunk(cx, cy)
+                if compiled is not None:
+                    yield cx * cw, cy * ch, compiled
+
+    # --- Tiles ---
+    def get_tile(self, tx: int, ty: int) -> str | None:
+        """Return the character of tile (tx, ty), or None when it is transparent or empty."""
+        cx, x = divmod(tx, self.chunk_width)
+        cy, y = divmod(ty, self.chunk_height)
+        compiled = self.chunk(cx, cy)
+        if compiled is None or y >= len(compiled.lines) or x >= len(compiled.lines[y]):
+            return None
+        char = compiled.lines[y][x]
+        return None if char == TRANSPARENT else char
+
+    def tile_at(self, x: float, y: float) -> str | None:
+        """Return the character of the tile covering world position (x, y) (see `get_tile`)."""
+        return self.get_tile(floor(x), floor(y / CHAR_ASPECT))
+
+    # --- Internals ---
+    def _compile(self, text: str | None, colors: str) -> CompiledSprite | None:
+        if not text:
+            return None
+        rows = [row[:self.chunk_width] for row in text.split('\n')[:self.chunk_height]]
+        # A tab would be taken for a sprite's center marker
+        rows = [row.replace('\t', ' ') for row in rows]
+        if colors:
+            colors = '\n'.join(row[:self.chunk_width] for row in colors.split('\n')[:self.chunk_height])
+        return parse_sprite('\n'.join(rows), self.style, colors, self.palette)
+
+    def _evict(self):
+        """Drop least recently used loadable chunks until at most `max_chunks` remain."""
+        excess = len(self._chunks) - self.max_chunks
+        for key in [key for key in self._chunks if key not in self._pinned][:excess]:
+            del self._chunks[key]
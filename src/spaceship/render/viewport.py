@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from math import ceil
+
+import typing
+if typing.TYPE_CHECKING:
+    from ..ecs.world import World
+    from ..render.entity import Entity
+    from ..render.particles import ParticleEmitter
+    from ..render.tilemap import TileMap
+
+from ..render.camera import Camera
+from ..render.framebuffer import FrameBuffer
+from ..utils.math import Vector
+
+
+class Viewport:
+    """
+    A camera drawn into a rectangle of the playfield, for split screens
+    and minimaps.
+
+    With `scale` > 1 the camera sees `scale` times more cells in each
+    direction and the frame is downsampled into the viewport: every cell
+    shows the highest-priority cell of its `scale` x `scale` block, so a
+    minimap keeps ships visible over the background.
+
+    Each viewport keeps its own frame and dirty rectangles; one whose
+    camera sees no change is not composited at all.
+    """
+
+    def __init__(self, camera: Camera, x: int, y: int, width: int, height: int, scale: int = 1):
+        """
+        Args:
+            camera (Camera): Camera whose view is drawn.
+            x, y (int): Top-left cell of the viewport in the playfield.
+            width, height (int): Viewport size in cells.
+            scale (int): World cells per viewport cell in each direction.
+        """
+        if scale < 1:
+            raise ValueError(f"Viewport scale must be at least 1: {scale}")
+        self.camera = camera
+        self.x, self.y = x, y
+        self.width, self.height = width, height
+        self.scale = scale
+        # Downsampled frame (scale > 1 only)
+        self.buffer: FrameBuffer | None = None
+        # Rectangles of the viewport, in its own cells, changed by the last render (None = all)
+        self.dirty_regions: list[tuple[int, int, int, int]] | None = None
+
+    @property
+    def rect(self) -> tuple[int, int, int, int]:
+        """The viewport's (x0, y0, x1, y1) playfield rectangle, end-exclusive."""
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+    @property
+    def display_size(self) -> Vector:
+        """Size of the frame the camera composites, in cells."""
+        return Vector(self.width * self.scale, self.height * self.scale)
+
+    @property
+    def frame(self) -> FrameBuffer | None:
+        """The viewport's last frame (`width` x `height`), None before the first render."""
+        return self.buffer if self.scale > 1 else self.camera.framebuffer
+
+    def get_view_bounds(self) -> tuple[float, float, float, float]:
+        """World-space rectangle visible through the viewport (see `Camera.get_view_bounds`)."""
+        self._sync_camera()
+        return self.camera.get_view_bounds(self.display_size)
+
+    def needs_redraw(self, entities: list[Entity], emitters: list[ParticleEmitter] = (),
+                     worlds: list[World] = (), tilemaps: list[TileMap] = ()) -> bool:
+        """Whether `render` would change the frame (see `Camera.needs_redraw`)."""
+        frame = self.frame
+        if frame is None or frame.width != self.width or frame.height != self.height:
+            return True
+        self._sync_camera()
+        return self.camera.needs_redraw(self.display_size, entities, emitters, worlds, tilemaps)
+
+    def render(self, entities: list[Entity], emitters: list[ParticleEmitter] = (),
+               worlds: list[World] = (), tilemaps: list[TileMap] = ()) -> FrameBuffer:
+        """
+        Composite the camera's view and return the viewport's frame, leaving
+        the changed rectangles in `dirty_regions`. Change flags are not
+        cleared (see `Camera.clear_flags`), so other viewports see them too.
+        """
+        camera = self.camera
+        self._sync_camera()
+        full = camera.get_framebuffer(self.display_size, entities, emitters, worlds, tilemaps,
+                                      clear_flags=False)
+        if self.scale == 1:
+            self.dirty_regions = camera.dirty_regions
+            return full
+
+        scale = self.scale
+        buffer = self.buffer
+        if buffer is None or buffer.width != self.width or buffer.height != self.height:
+            buffer = self.buffer = FrameBuffer(self.width, self.height)
+            regions = None
+        elif camera.dirty_regions is None:
+            regions = None
+        else:
+            # Blocks touched by the camera's dirty rectangles
+            regions = [(x0 // scale, y0 // scale, ceil(x1 / scale), ceil(y1 / scale))
+                       for x0, y0, x1, y1 in camera.dirty_regions]
+
+        if regions is None:
+            buffer.downsample(full, scale)
+        else:
+            for rect in regions:
+                buffer.downsample(full, scale, rect)
+        self.dirty_regions = regions
+        return buffer
+
+    # --- Internals ---
+    def _sync_camera(self):
+        """Size the camera to the viewport, so centered and corner modes place the origin inside it."""
+        size = self.display_size
+        if self.camera.size != size:
+            self.camera.size = size
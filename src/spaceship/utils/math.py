@@ -1,4 +1,11 @@
 import math
+from array import array
+
+# NumPy is optional; VectorArray falls back to `array` module loops without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 """
 A class representing a 2D vector with basic operations.
@@ -8,32 +15,12 @@ Attributes:
     y (float): The y-coordinate of the vector.
 """
 class Vector:  
+    # Plain slots: no per-instance dict and direct attribute access
+    __slots__ = ('x', 'y')
+
     def __init__(self, x: float = 0, y: float = 0):
-        # Store private attributes internally
-        self._x = x
-        self._y = y
-
-    # --- X property ---
-    @property
-    def x(self):
-        """Get the x-coordinate."""
-        return self._x
-
-    @x.setter
-    def x(self, new_x):
-        """Set the x-coordinate."""
-        self._x = new_x
-    
-    # --- Y property ---
-    @property
-    def y(self):
-        """Get the y-coordinate."""
-        return self._y
-
-    @y.setter
-    def y(self, new_y):
-        """Set the y-coordinate."""
-        self._y = new_y
+        self.x = x
+        self.y = y
     
     # --- Magnitude ---
     def length(self):
@@ -70,6 +57,43 @@ class Vector:
         """Return a new vector rounded to the nearest integer"""
         return Vector(math.floor(self.x), math.floor(self.y))
 
+    # --- In-place Operations ---
+    # These mutate and return self instead of allocating a new Vector.
+    # Every reference to the same object sees the change.
+    def set(self, x: float, y: float):
+        """Set both coordinates in place."""
+        self.x = x
+        self.y = y
+        return self
+
+    def iadd(self, other):
+        """In-place vector addition (self += other)."""
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def isub(self, other):
+        """In-place vector subtraction (self -= other)."""
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def iscale(self, factor):
+        """In-place scaling by a scalar factor."""
+        self.x *= factor
+        self.y *= factor
+        return self
+
+    def iadd_scaled(self, other, factor):
+        """In-place self += other * factor, e.g. position.iadd_scaled(velocity, dt)."""
+        self.x += other.x * factor
+        self.y += other.y * factor
+        return self
+
+    def copy(self):
+        """Return a new vector with the same coordinates."""
+        return Vector(self.x, self.y)
+
     # --- Arithmetic Operators ---
     def __add__(self, other):
         """Vector addition (self + other)."""
@@ -120,3 +144,131 @@ class Vector:
     def __repr__(self) -> str:
         """Return a debug string representation."""
         return f"X:{self.x} Y:{self.y}"
+
+
+class VectorArray:
+    """
+    A batch of 2D vectors stored as two parallel coordinate arrays
+    (struct-of-arrays): `x` and `y`.
+
+    Operations apply to every element at once without allocating a Vector
+    per element. They are vectorized with NumPy, and fall back to plain
+    loops over `array('d')` buffers when NumPy is not installed.
+    """
+    __slots__ = ('x', 'y')
+
+    def __init__(self, size: int = 0):
+        self.x = _zeros(size)
+        self.y = _zeros(size)
+
+    @classmethod
+    def from_vectors(cls, vectors) -> "VectorArray":
+        """Build an array from an iterable of Vectors."""
+        vectors = list(vectors)
+        result = cls(len(vectors))
+        for i, vector in enumerate(vectors):
+            result.x[i] = vector.x
+            result.y[i] = vector.y
+        return result
+
+    def to_vectors(self) -> list[Vector]:
+        """Return the contents as a list of new Vectors."""
+        return [Vector(x, y) for x, y in zip(self.x, self.y)]
+
+    # --- Element Access ---
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def __getitem__(self, index: int) -> Vector:
+        """Return element `index` as a new Vector."""
+        return Vector(float(self.x[index]), float(self.y[index]))
+
+    def __setitem__(self, index: int, value: Vector):
+        """Set element `index` from a Vector."""
+        self.x[index] = value.x
+        self.y[index] = value.y
+
+    def resize(self, size: int):
+        """Grow or shrink to `size` elements, keeping existing values (new ones are zero)."""
+        for name in ('x', 'y'):
+            old = getattr(self, name)
+            new = _zeros(size)
+            n = min(len(old), size)
+            new[:n] = old[:n]
+            setattr(self, name, new)
+
+    def fill(self, value: Vector):
+        """Set every element to `value`."""
+        if np is not None:
+            self.x.fill(value.x)
+            self.y.fill(value.y)
+        else:
+            n = len(self.x)
+            self.x[:] = array('d', [value.x]) * n
+            self.y[:] = array('d', [value.y]) * n
+
+    # --- In-place Operations ---
+    # `other` may be a VectorArray of the same length or a single Vector,
+    # which is applied to every element.
+    def iadd(self, other):
+        """In-place element-wise addition (self += other)."""
+        return self.iadd_scaled(other, 1)
+
+    def isub(self, other):
+        """In-place element-wise subtraction (self -= other)."""
+        return self.iadd_scaled(other, -1)
+
+    def iscale(self, factor: float):
+        """In-place scaling of every element by a scalar factor."""
+        if np is not None:
+            self.x *= factor
+            self.y *= factor
+            return self
+        xs, ys = self.x, self.y
+        for i in range(len(xs)):
+            xs[i] *= factor
+            ys[i] *= factor
+        return self
+
+    def iadd_scaled(self, other, factor: float):
+        """
+        In-place self += other * factor, e.g. positions.iadd_scaled(velocities, dt).
+        """
+        if isinstance(other, Vector):
+            dx, dy = other.x * factor, other.y * factor
+            if np is not None:
+                self.x += dx
+                self.y += dy
+                return self
+            xs, ys = self.x, self.y
+            for i in range(len(xs)):
+                xs[i] += dx
+                ys[i] += dy
+            return self
+
+        if np is not None:
+            if factor == 1:
+                self.x += other.x
+                self.y += other.y
+            else:
+                self.x += other.x * factor
+                self.y += other.y * factor
+            return self
+        xs, ys, ox, oy = self.x, self.y, other.x, other.y
+        for i in range(len(xs)):
+            xs[i] += ox[i] * factor
+            ys[i] += oy[i] * factor
+        return self
+
+    # --- Queries ---
+    def lengths_squared(self):
+        """Return the squared length of every element."""
+        if np is not None:
+            return self.x * self.x + self.y * self.y
+        return array('d', (x * x + y * y for x, y in zip(self.x, self.y)))
+
+def _zeros(size: int):
+    """Return a zero-filled float64 buffer of the given length."""
+    if np is not None:
+        return np.zeros(size, dtype=np.float64)
+    return array('d', bytes(8 * size))
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import typing
+if typing.TYPE_CHECKING:
+    from ..render.entity import Entity
+
+from ..render.hud import HUDAlignment, HUDElement
+
+# Shared no-op context used for phases when profiling is off
+_NO_PHASE = nullcontext()
+
+def no_phase(name: str):
+    """Phase context used when no profiler is attached; does nothing."""
+    return _NO_PHASE
+
+
+class FrameProfiler:
+    """
+    Opt-in instrumentation for the game loop.
+
+    Attach one with `Game(profiler=FrameProfiler())` (or by assigning
+    `game.profiler`). The game then reports how long every phase of each
+    fixed tick (input, update_hook, entities, systems, emitters, collisions) and
+    each rendered frame (hud, cull, composite, diff, write) took, plus how
+    many fixed updates ran or were held back by the per-frame cap, how many
+    cells changed and how many bytes were written.
+
+    Averages over the last `window` frames feed `summary()` and the optional
+    HUD overlay; the most recent `max_events` timed phases can be exported
+    as a Chrome trace (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, window: int = 120, max_events: int = 200_000, overlay_interval: float = 0.25):
+        # Per-frame records for rolling averages
+        self.frames: deque[dict] = deque(maxlen=window)
+        # Per-tick records for rolling averages
+        self.ticks: deque[dict] = deque(maxlen=window)
+        # Trace events as (category, name, start, duration, args)
+        self.events: deque[tuple] = deque(maxlen=max_events)
+        # Total update time and call count per entity class name
+        self.entity_classes: dict[str, list[float]] = {}
+
+        # Record being filled by the tick or frame in progress
+        self._current: dict | None = None
+        self._category = 'frame'
+        self._origin = time.perf_counter()
+
+        # HUD overlay, refreshed at most every overlay_interval seconds
+        self.overlay_element: HUDElement | None = None
+        self.overlay_interval = overlay_interval
+        self._overlay_refreshed = 0.0
+
+    # --- Recording ---
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as phase `name` of the current tick or frame."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter() - start)
+
+    def begin_tick(self):
+        self._begin('tick')
+
+    def end_tick(self):
+        self.ticks.append(self._end('tick'))
+
+    def begin_frame(self):
+        self._begin('frame')
+
+    def end_frame(self, updates: int = 0, skipped: int = 0, changed_cells: int = 0, bytes_written: int = 0):
+        """
+        Finish the current frame.
+
+        Args:
+            updates (int): Fixed updates run since the previous frame.
+            skipped (int): Fixed updates that were due but held back by the per-frame cap.
+            changed_cells (int): Grid cells redrawn this frame.
+            bytes_written (int): Bytes sent to the terminal this frame.
+        """
+        record = self._end('frame', updates=updates, skipped=skipped,
+                           changed_cells=changed_cells, bytes_written=bytes_written)
+        self.frames.append(record)
+
+        now = time.perf_counter()
+        if self.overlay_element is not None and now - self._overlay_refreshed >= self.overlay_interval:
+            self._overlay_refreshed = now
+            self.refresh_overlay()
+
+    def record_entity(self, entity: Entity, elapsed: float):
+        """Add one update call of `elapsed` seconds to the entity's class."""
+        name = type(entity).__name__
+        stats = self.entity_classes.get(name)
+        if stats is None:
+            self.entity_classes[name] = [elapsed, 1]
+        else:
+            stats[0] += elapsed
+            stats[1] += 1
+
+    # --- Results ---
+    def summary(self) -> dict[str, float]:
+        """
+        Return rolling averages: milliseconds per frame for the frame and
+        each of its phases, milliseconds per tick for each tick phase
+        (prefixed with 'tick.'), and per-frame counters.
+        """
+        result: dict[str, float] = {}
+        for records, prefix in ((self.frames, ''), (self.ticks, 'tick.')):
+            if not records:
+                continue
+            for key, scale in (('times', 1000), ('counters', 1)):
+                totals: dict[str, float] = {}
+                for record in records:
+                    for name, value in record[key].items():
+                        totals[name] = totals.get(name, 0.0) + value
+                for name, total in totals.items():
+                    result[prefix + name] = total * scale / len(records)
+        return result
+
+    def slowest_entity_classes(self, count: int = 5) -> list[tuple[str, float, int]]:
+        """Return (class name, total ms, update calls) for the slowest entity classes."""
+        ranked = sorted(self.entity_classes.items(), key=lambda item: item[1][0], reverse=True)
+        return [(name, total * 1000, calls) for name, (total, calls) in ranked[:count]]
+
+    def reset(self):
+        """Discard everything recorded so far."""
+        self.frames.clear()
+        self.ticks.clear()
+        self.events.clear()
+        self.entity_classes.clear()
+
+    # --- Overlay ---
+    def overlay(self, align: HUDAlignment = HUDAlignment.LEFT) -> HUDElement:
+        """
+        Return a HUD element showing live averages; add it to the game's HUD,
+        e.g. `game.hud.add_bottom_hud(profiler.overlay())`.
+        """
+        if self.overlay_element is None:
+            self.overlay_element = HUDElement(
+                template='frame `frame`ms | upd `update`ms x`updates` (-`skipped`) | hud `hud` comp `composite` '
+                         'diff `diff` write `write` | `cells` cells `bytes`B | slowest `slowest`',
+                align=align,
+            )
+            self.refresh_overlay()
+        return self.overlay_element
+
+    def refresh_overlay(self):
+        """Push the current averages into the overlay element."""
+        if self.overlay_element is None:
+            return
+        stats = self.summary()
+        slowest = self.slowest_entity_classes(1)
+        self.overlay_element.values = {
+            'frame': f"{stats.get('frame', 0):.2f}",
+            'update': f"{stats.get('tick.tick', 0):.2f}",
+            'updates': f"{stats.get('updates', 0):.1f}",
+            'skipped': f"{stats.get('skipped', 0):.1f}",
+            'hud': f"{stats.get('hud', 0):.2f}",
+            'composite': f"{stats.get('composite', 0):.2f}",
+            'diff': f"{stats.get('diff', 0):.2f}",
+            'write': f"{stats.get('write', 0):.2f}",
+            'cells': f"{stats.get('changed_cells', 0):.0f}",
+            'bytes': f"{stats.get('bytes_written', 0):.0f}",
+            'slowest': slowest[0][0] if slowest else '-',
+        }
+
+    # --- Export ---
+    def export_chrome_trace(self, path: str):
+        """
+        Write the recorded phases as a Chrome trace JSON file, with frame
+        counters (changed cells, bytes written, updates) as counter tracks.
+        """
+        events = []
+        for category, name, start, duration, args in self.events:
+            event = {
+                'name': name, 'cat': category, 'ph': 'X', 'pid': 1, 'tid': 1,
+                'ts': (start - self._origin) * 1e6, 'dur': duration * 1e6,
+            }
+            if args:
+                event['args'] = args
+                events.append({'name': 'frame counters', 'ph': 'C', 'pid': 1, 'tid': 1,
+                               'ts': event['ts'], 'args': args})
+            events.append(event)
+
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+    # --- Internals ---
+    def _begin(self, category: str):
+        self._category = category
+        self._current = {'start': time.perf_counter(), 'times': {}, 'counters': {}}
+
+    def _end(self, category: str, **counters) -> dict:
+        record = self._current
+        if record is None:
+            record = {'start': time.perf_counter(), 'times': {}, 'counters': {}}
+        self._current = None
+        duration = time.perf_counter() - record['start']
+        self.events.append((category, category, record['start'], duration, counters))
+        record['times'][category] = duration
+        record['counters'].update(counters)
+        return record
+
+    def _record(self, name: str, start: float, duration: float):
+        self.events.append((self._category, name, start, duration, None))
+        if self._current is not None:
+            times = self._current['times']
+            times[name] = times.get(name, 0.0) + duration
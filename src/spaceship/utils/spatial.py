@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import math
+import typing
+
+from ..utils.math import Vector
+
+# Axis-aligned rectangle as (x0, y0, x1, y1), end-exclusive
+Rect = typing.Tuple[float, float, float, float]
+
+
+class SpatialHash:
+    """
+    Uniform-grid spatial index of objects by their axis-aligned bounds.
+
+    Each object is stored in every grid cell its bounds overlap, so
+    rectangle and radius queries only look at nearby objects. Query
+    results are returned in insertion order.
+    """
+
+    def __init__(self, cell_size: float = 16.0):
+        # Width and height of one grid cell in world units
+        self.cell_size = cell_size
+        # Grid cell (cx, cy) -> objects overlapping it
+        self._cells: dict[tuple[int, int], set] = {}
+        # Object -> (bounds, covered cell range, insertion order)
+        self._entries: dict[object, tuple[Rect, tuple[int, int, int, int], int]] = {}
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, obj) -> bool:
+        return obj in self._entries
+
+    # --- Maintenance ---
+    def insert(self, obj, bounds: Rect):
+        """Add an object with the given bounds (or move it if already present)."""
+        if obj in self._entries:
+            self.update(obj, bounds)
+            return
+        cells = self._cell_range(bounds)
+        self._link(obj, cells)
+        self._entries[obj] = (bounds, cells, self._counter)
+        self._counter += 1
+
+    def update(self, obj, bounds: Rect):
+        """
+        Move an indexed object to new bounds.
+        Objects that are not in the index are ignored.
+        """
+        entry = self._entries.get(obj)
+        if entry is None:
+            return
+        _, old_cells, order = entry
+        cells = self._cell_range(bounds)
+        if cells != old_cells:
+            self._unlink(obj, old_cells)
+            self._link(obj, cells)
+        self._entries[obj] = (bounds, cells, order)
+
+    def remove(self, obj):
+        """Remove an object from the index, if present."""
+        entry = self._entries.pop(obj, None)
+        if entry is not None:
+            self._unlink(obj, entry[1])
+
+    def clear(self):
+        """Remove every object."""
+        self._cells.clear()
+        self._entries.clear()
+
+    def bounds(self, obj) -> Rect:
+        """Return the bounds an object was last indexed with."""
+        return self._entries[obj][0]
+
+    # --- Queries ---
+    def query_rect(self, x0: float, y0: float, x1: float, y1: float) -> list:
+        """Return every object whose bounds overlap the rectangle."""
+        found = set()
+        cx0, cy0, cx1, cy1 = self._cell_range((x0, y0, x1, y1))
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                objects = self._cells.get((cx, cy))
+                if objects:
+                    found.update(objects)
+
+        entries = self._entries
+        hits = []
+        for obj in found:
+            bx0, by0, bx1, by1 = entries[obj][0]
+            if bx0 < x1 and by0 < y1 and bx1 > x0 and by1 > y0:
+                hits.append(obj)
+        hits.sort(key=lambda obj: entries[obj][2])
+        return hits
+
+    def query_radius(self, center: Vector, radius: float) -> list:
+        """Return every object whose bounds come within `radius` of `center`."""
+        candidates = self.query_rect(center.x - radius, center.y - radius,
+                                     center.x + radius, center.y + radius)
+        hits = []
+        r2 = radius * radius
+        for obj in candidates:
+            x0, y0, x1, y1 = self._entries[obj][0]
+            # Distance from the center to the closest point of the bounds
+            dx = max(x0 - center.x, 0, center.x - x1)
+            dy = max(y0 - center.y, 0, center.y - y1)
+            if dx * dx + dy * dy <= r2:
+                hits.append(obj)
+        return hits
+
+    # --- Internals ---
+    def _cell_range(self, bounds: Rect) -> tuple[int, int, int, int]:
+        """Return the inclusive (cx0, cy0, cx1, cy1) grid cells covered by bounds."""
+        x0, y0, x1, y1 = bounds
+        size = self.cell_size
+        return (math.floor(x0 / size), math.floor(y0 / size),
+                math.floor(x1 / size), math.floor(y1 / size))
+
+    def _link(self, obj, cells: tuple[int, int, int, int]):
+        cx0, cy0, cx1, cy1 = cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self._cells.setdefault((cx, cy), set()).add(obj)
+
+    def _unlink(self, obj, cells: tuple[int, int, int, int]):
+        cx0, cy0, cx1, cy1 = cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                objects = self._cells.get((cx, cy))
+                if objects is not None:
+                    objects.discard(obj)
+                    if not objects:
+                        del self._cells[(cx, cy)]
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import typing
+if typing.TYPE_CHECKING:
+    from ..render.entity import Entity
+    from ..utils.spatial import SpatialHash
+
+
+class EntityHandle:
+    """
+    Stable reference to an entity that can tell when the entity is gone.
+
+    A handle names a store slot and the generation of that slot when the
+    entity was added. Removing the entity bumps the generation, so old
+    handles stop resolving even after the slot is reused.
+    """
+    __slots__ = ('_store', 'slot', 'generation')
+
+    def __init__(self, store: EntityStore, slot: int, generation: int):
+        self._store = store
+        self.slot = slot
+        self.generation = generation
+
+    def get(self) -> Entity | None:
+        """Return the entity, or None if it has been removed."""
+        return self._store.resolve(self)
+
+    @property
+    def alive(self) -> bool:
+        return self._store.resolve(self) is not None
+
+    def __repr__(self) -> str:
+        return f"EntityHandle(slot={self.slot}, generation={self.generation})"
+
+
+class EntityStore:
+    """
+    The game's entities, in a packed list plus a slot map.
+
+    - Removal is O(1): the last entity is swapped into the hole.
+    - Adding and removing while `deferring` (during a fixed tick) only
+      marks the change; the packed list is updated by `flush` at the end
+      of the tick, so it can be iterated without copying. Removed entities
+      are skipped by iteration and dropped from the spatial index at once.
+    - Every added entity gets an `EntityHandle` (`entity.handle`).
+
+    Iteration order is insertion order until entities are removed.
+    """
+
+    def __init__(self, spatial: SpatialHash):
+        # Spatial index kept in sync with the live entities
+        self.spatial = spatial
+
+        # Packed entities, iterated every tick (may hold entities removed this tick)
+        self._dense: list[Entity] = []
+        # Slot map: entity per slot, slot generations, and free slots
+        self._slots: list[Entity | None] = []
+        self._generations: list[int] = []
+        self._free: list[int] = []
+        self._count = 0
+
+        # Changes made while deferring, applied by flush()
+        self.deferring = False
+        self._spawned: list[Entity] = []
+        self._killed: list[Entity] = []
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Entity]:
+        """Iterate over live entities (including ones added this tick only after `flush`)."""
+        for entity in self._dense:
+            if entity._slot >= 0:
+                yield entity
+
+    def __contains__(self, entity: Entity) -> bool:
+        return self.is_alive(entity)
+
+    def is_alive(self, entity: Entity) -> bool:
+        """Whether the entity is in the store and has not been removed."""
+        slot = entity._slot
+        return slot >= 0 and self._slots[slot] is entity
+
+    def resolve(self, handle: EntityHandle) -> Entity | None:
+        """Return the entity a handle refers to, or None if it has been removed."""
+        if self._generations[handle.slot] != handle.generation:
+            return None
+        return self._slots[handle.slot]
+
+    # --- Changes ---
+    def add(self, entity: Entity) -> EntityHandle:
+        """
+        Add an entity and return its handle. Adding a live entity again does
+        nothing. While deferring, the entity joins iteration after `flush`.
+        """
+        if self.is_alive(entity):
+            return entity.handle
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            self._slots.append(None)
+            self._generations.append(0)
+        self._slots[slot] = entity
+        self._count += 1
+        entity._slot = slot
+        entity.handle = EntityHandle(self, slot, self._generations[slot])
+
+        if self.deferring:
+            self._spawned.append(entity)
+        else:
+            self._link(entity)
+        return entity.handle
+
+    def remove(self, entity: Entity):
+        """
+        Remove an entity. Removing an entity that is not live does nothing.
+        Its handle stops resolving immediately.
+        """
+        if not self.is_alive(entity):
+            return
+
+        slot = entity._slot
+        self._slots[slot] = None
+        self._generations[slot] += 1
+        self._free.append(slot)
+        self._count -= 1
+        entity._slot = -1
+        self.spatial.remove(entity)
+
+        if entity._index >= 0:
+            if self.deferring:
+                self._killed.append(entity)
+            else:
+                self._unlink(entity)
+
+    def flush(self):
+        """Apply the additions and removals made while deferring."""
+        if self._killed:
+            for entity in self._killed:
+                # Skip entities that were removed and added back in the same tick
+                if entity._slot < 0 and entity._index >= 0:
+                    self._unlink(entity)
+            self._killed.clear()
+        if self._spawned:
+            for entity in self._spawned:
+                if entity._slot < 0:
+                    continue
+                if entity._index < 0:
+                    self._link(entity)
+                else:
+                    # Removed and added back in the same tick: still packed, re-index it
+                    self.spatial.insert(entity, entity.get_bounds())
+            self._spawned.clear()
+
+    def clear(self):
+        """Remove every entity."""
+        for entity in list(self):
+            self.remove(entity)
+        for entity in self._spawned:
+            self.remove(entity)
+        self.flush()
+
+    # --- Internals ---
+    def _link(self, entity: Entity):
+        """Append an entity to the packed list and index it."""
+        entity._index = len(self._dense)
+        self._dense.append(entity)
+        self.spatial.insert(entity, entity.get_bounds())
+
+    def _unlink(self, entity: Entity):
+        """Swap-remove an entity from the packed list."""
+        index = entity._index
+        last = self._dense.pop()
+        if last is not entity:
+            self._dense[index] = last
+            last._index = index
+        entity._index = -1
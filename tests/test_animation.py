@@ -0,0 +1,45 @@
+from spaceship.render.animation import MIRROR_X, MIRROR_Y, AnimatedSprite, transform_sprite
+from spaceship.render.style import style
+
+
+def test_mirror_tables_are_their_own_inverse():
+    chars = '/\\()<>[]{}^vV|o'
+    for table in (MIRROR_X, MIRROR_Y):
+        assert chars.translate(table).translate(table) == chars
+
+
+def test_vertical_flip_swaps_arrows():
+    sprite = AnimatedSprite(['\\v/\n\t|'])
+    sprite.flip_y = True
+    assert sprite.decoded_string == ['|', '/^\\']
+
+
+def test_flipping_twice_returns_the_original_frame():
+    sprite = AnimatedSprite(['\\v/\n\t|', '(o>\n/\t^\\\n x', '[{<\n  ^'])
+    for original in sprite.frames:
+        for flip_x, flip_y in ((True, False), (False, True), (True, True)):
+            flipped = transform_sprite(original, flip_x, flip_y)
+            again = transform_sprite(flipped, flip_x, flip_y)
+            assert again.lines == original.lines
+            assert again.center == original.center
+
+
+def test_toggling_a_flip_restores_the_compiled_frame():
+    sprite = AnimatedSprite(['(o>\n/\t^\\'])
+    original = sprite.compiled
+    sprite.flip_y = True
+    assert sprite.decoded_string == ['\\v/', '(o>']
+    sprite.flip_y = False
+    assert sprite.compiled is original
+
+
+def test_changing_the_style_recompiles_every_frame():
+    red, blue = style('red'), style('blue')
+    sprite = AnimatedSprite(['ab', 'cd'], colors=['x.', 'x.'], palette={'x': red})
+    sprite.set_frame(1)
+    sprite.dirty = False
+    sprite.style = blue
+    assert sprite.dirty and sprite.frame == 1
+    for frame in sprite.frames:
+        assert list(frame.style_runs[0][0]) == [red, blue]
+    assert sprite.compiled is sprite.frames[1]
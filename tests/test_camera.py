@@ -0,0 +1,134 @@
+import random
+
+import pytest
+
+from spaceship.ecs.world import World
+from spaceship.render.camera import Camera, merge_rects
+from spaceship.render.particles import ParticleEmitter
+from spaceship.render.sprite import Sprite
+from spaceship.render.style import style
+from spaceship.utils.math import Vector
+
+SIZE = Vector(40, 12)
+
+
+class Stub:
+    """Minimal entity: the camera only calls render()."""
+    def __init__(self, sprite):
+        self.sprite = sprite
+
+    def render(self):
+        return self.sprite
+
+
+def random_sprite(rng):
+    rows = [''.join(rng.choice('ab#\a') for _ in range(rng.randint(1, 6))) for _ in range(rng.randint(1, 3))]
+    sprite = Sprite('\n'.join(rows), priority=rng.randint(0, 3), style=rng.choice([0, style('red')]))
+    sprite.position = Vector(rng.uniform(-4, SIZE.x), rng.uniform(-4, SIZE.y * 2))
+    return sprite
+
+
+def full_frame(entities, emitters=(), worlds=()):
+    """The frame a new camera composites from scratch, without touching change flags."""
+    frame = Camera().get_framebuffer(SIZE, entities, emitters, worlds, clear_flags=False)
+    return frame.to_list(styled=True)
+
+
+def assert_matches_full(camera, entities, emitters=(), worlds=()):
+    expected = full_frame(entities, emitters, worlds)
+    assert camera.get_framebuffer(SIZE, entities, emitters, worlds).to_list(styled=True) == expected
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_frames_match_a_full_recomposite(seed):
+    rng = random.Random(seed)
+    camera = Camera()
+    entities = [Stub(random_sprite(rng)) for _ in range(10)]
+    emitter = ParticleEmitter(capacity=100, priority=2)
+    world = World()
+    bullet = Sprite('|', priority=1)
+    for _ in range(5):
+        world.spawn(position=Vector(rng.uniform(0, SIZE.x), rng.uniform(0, SIZE.y * 2)), sprite=bullet)
+    emitters, worlds = [emitter], [world]
+
+    camera.get_framebuffer(SIZE, entities, emitters, worlds)
+    for _ in range(60):
+        op = rng.random()
+        if op < 0.3:
+            # Move
+            sprite = rng.choice(entities).sprite
+            sprite.position = Vector(rng.uniform(-4, SIZE.x), rng.uniform(-4, SIZE.y * 2))
+            sprite.dirty = True
+        elif op < 0.4 and entities:
+            entities.pop(rng.randrange(len(entities)))
+        elif op < 0.5:
+            entities.insert(rng.randint(0, len(entities)), Stub(random_sprite(rng)))
+        elif op < 0.6 and entities:
+            rng.choice(entities).sprite.priority = rng.randint(0, 3)
+        elif op < 0.7 and entities:
+            rng.choice(entities).sprite.load(rng.choice(['xy', 'z\nzz', '\aq']), priority=rng.randint(0, 3))
+        elif op < 0.8:
+            emitter.burst(Vector(rng.uniform(0, SIZE.x), rng.uniform(0, SIZE.y * 2)), 5, 10, 0.2)
+        elif op < 0.9:
+            world.spawn(position=Vector(rng.uniform(0, SIZE.x), rng.uniform(0, SIZE.y * 2)), sprite=bullet)
+            if world.count > 3:
+                world.kill(int(world.ids[0]))
+        emitter.update(1 / 30)
+        assert_matches_full(camera, entities, emitters, worlds)
+
+
+def test_removed_emitter_and_world_are_erased():
+    camera = Camera()
+    emitter = ParticleEmitter(capacity=10)
+    emitter.emit(Vector(3, 3), Vector(), 1.0, 'o')
+    world = World()
+    world.spawn(position=Vector(10, 4), sprite=Sprite('W'))
+    camera.get_framebuffer(SIZE, [], [emitter], [world])
+    assert_matches_full(camera, [], [], [])
+    assert all(cell == ' ' for cell in camera.framebuffer.to_list())
+
+
+def test_only_changed_areas_are_recomposited():
+    camera = Camera()
+    sprites = [Sprite('ab'), Sprite('cd')]
+    sprites[0].position = Vector(1, 0)
+    sprites[1].position = Vector(30, 16)
+    entities = [Stub(sprite) for sprite in sprites]
+    camera.get_framebuffer(SIZE, entities)
+    assert camera.dirty_regions is None
+
+    sprites[0].position = Vector(2, 0)
+    camera.get_framebuffer(SIZE, entities)
+    assert camera.dirty_regions == [(1, 0, 4, 1)]
+
+    camera.get_framebuffer(SIZE, entities)
+    assert camera.dirty_regions == []
+
+
+def test_merge_rects_clips_and_merges_overlaps():
+    assert merge_rects([(-2, -1, 3, 2), (2, 1, 5, 3), (10, 0, 12, 1)], 40, 12) == [
+        (0, 0, 5, 3), (10, 0, 12, 1)]
+    # Off-screen rectangles are dropped
+    assert merge_rects([(40, 0, 45, 2), (0, -3, 2, 0)], 40, 12) == []
+
+
+def test_merge_rects_gives_up_on_large_or_many_areas():
+    assert merge_rects([(0, 0, 40, 7)], 40, 12) is None
+    assert merge_rects([(x, 0, x + 1, 1) for x in range(0, 40, 2)], 40, 12, max_rects=8) is None
+
+
+def test_style_changes_are_redrawn():
+    camera = Camera()
+    sprite = Sprite('ab', style=style('red'))
+    sprite.position = Vector(1, 0)
+    emitter = ParticleEmitter(capacity=10)
+    emitter.emit(Vector(5, 3), Vector(), 1.0, 'o')
+    entities = [Stub(sprite)]
+    camera.get_framebuffer(SIZE, entities, [emitter])
+
+    sprite.style = style('blue')
+    assert sprite.dirty
+    assert list(sprite.compiled.style_runs[0][0]) == [style('blue')] * 2
+    emitter.style = style('green')
+    assert emitter.dirty
+    assert_matches_full(camera, entities, [emitter])
@@ -0,0 +1,81 @@
+from spaceship.physics.collision import CollisionSystem
+from spaceship.render.sprite import Sprite
+from spaceship.utils.constants import CHAR_ASPECT
+from spaceship.utils.math import Vector
+
+
+class Body:
+    """Minimal collider: the collision system only needs these attributes."""
+    def __init__(self, art, x, row, layer=1, mask=~0):
+        self.sprite = Sprite(art)
+        self.sprite.position = Vector(x, row * CHAR_ASPECT)
+        self.collision_layer = layer
+        self.collision_mask = mask
+        self.hits = []
+
+    def render(self):
+        return self.sprite
+
+    def on_collision(self, other):
+        self.hits.append(other)
+
+
+def pairs(contacts):
+    return {frozenset(pair) for pair in contacts}
+
+
+def test_both_masks_must_accept_the_other_layer():
+    ship = Body('#', 0, 0, layer=1, mask=2)
+    rock = Body('#', 0, 0, layer=2, mask=1)
+    ghost = Body('#', 0, 0, layer=2, mask=0)     # accepts nothing
+    deaf = Body('#', 0, 0, layer=0)              # opted out
+    contacts = CollisionSystem().find_contacts([ship, rock, ghost, deaf])
+    assert pairs(contacts) == {frozenset((ship, rock))}
+
+
+def test_same_filter_group_collides_within_itself():
+    a, b = Body('#', 0, 0, layer=4, mask=4), Body('#', 0, 0, layer=4, mask=4)
+    assert pairs(CollisionSystem().find_contacts([a, b])) == {frozenset((a, b))}
+
+
+def test_touching_boxes_do_not_collide_but_overlapping_ones_do():
+    left = Body('##', 0, 0)
+    beside = Body('##', 2, 0)       # starts where `left` ends
+    below = Body('##', 0, 1)        # the row under `left`
+    overlapping = Body('##', 1, 0)
+    contacts = CollisionSystem().find_contacts([left, beside, below])
+    assert contacts == []
+    contacts = CollisionSystem().find_contacts([left, overlapping])
+    assert pairs(contacts) == {frozenset((left, overlapping))}
+
+
+def test_pixel_perfect_ignores_transparent_cells():
+    hollow = Body('#\a#', 0, 0)
+    dot = Body('o', 1, 0)
+    edge = Body('o', 2, 0)
+    assert pairs(CollisionSystem().find_contacts([hollow, dot])) == {frozenset((hollow, dot))}
+    system = CollisionSystem(pixel_perfect=True)
+    assert system.find_contacts([hollow, dot]) == []
+    assert pairs(system.find_contacts([hollow, edge])) == {frozenset((hollow, edge))}
+
+
+def test_entities_killed_during_delivery_get_no_more_contacts():
+    bullet = Body('*', 0, 0)
+    first = Body('#', 0, 0)
+    second = Body('#', 0, 0)
+    dead = set()
+
+    def kill_bullet(other):
+        bullet.hits.append(other)
+        dead.add(bullet)
+    bullet.on_collision = kill_bullet
+
+    system = CollisionSystem()
+    system.update([bullet, first, second], lambda entity: entity not in dead)
+    # The bullet is used up by its first hit: the other target never sees it
+    assert len(bullet.hits) == 1
+    missed = first if bullet.hits[0] is second else second
+    assert bullet not in missed.hits
+    # Contacts between live entities are still delivered both ways
+    assert second in first.hits and first in second.hits
+    assert len(system.contacts) == 3
@@ -0,0 +1,39 @@
+from spaceship.game import Game
+from spaceship.input.scripted import ScriptedInput
+from spaceship.render.entity import Entity
+from spaceship.render.headless import HeadlessRenderer
+from spaceship.utils.math import Vector
+
+
+class Mover(Entity):
+    def update(self, dt):
+        # Moves in place, without assigning `position`
+        self.position.x += 1
+
+
+def make_game():
+    return Game(renderer=HeadlessRenderer((20, 5)), input=ScriptedInput(), size=(20, 5))
+
+
+def test_position_changed_in_place_needs_a_frame():
+    game = make_game()
+    mover = game.add_entity(Mover(game))
+    mover.sprite.load('@')
+    mover.position = Vector(5, 0)
+    game.simulate(1)
+    assert game.renderer.rows()[0].index('@') == 6
+    assert not game._needs_render(game._cull(game._display_size))
+
+    game._fixed_update(game.fixed_dt)
+    assert game._needs_render(game._cull(game._display_size))
+    game._render()
+    assert game.renderer.rows()[0].index('@') == 7
+
+
+def test_render_leaves_resize_checks_to_the_loop():
+    game = make_game()
+    game._start()
+    calls = []
+    game.renderer.check_resize = lambda: calls.append(1)
+    game._render()
+    assert calls == []
@@ -0,0 +1,67 @@
+import io
+import random
+
+import pytest
+
+from spaceship.render.framebuffer import FrameBuffer
+from spaceship.render.render import Renderer, changed_spans, row_spans
+
+WIDTH, HEIGHT = 30, 8
+
+
+def make_renderer():
+    return Renderer(synchronized_output=False, stream=io.StringIO(), size=(WIDTH, HEIGHT))
+
+
+def draw(renderer, frame, regions):
+    renderer.stream.seek(0)
+    renderer.stream.truncate()
+    renderer.begin_frame()
+    renderer.draw_diff(1, frame, regions)
+    renderer.end_frame()
+    return renderer.stream.getvalue()
+
+
+def test_row_spans_inside_ranges_match_a_full_comparison():
+    old, new = 'abcdefghij', 'abXdefYhiZ'
+    assert changed_spans(old, new) == [(2, 3), (6, 7), (9, 10)]
+    assert row_spans(old, new, [(0, 5), (5, 10)]) == [(2, 3), (6, 7), (9, 10)]
+    # Overlapping ranges compare each cell once
+    assert row_spans(old, new, [(1, 4), (2, 8)]) == [(2, 3), (6, 7)]
+    # Cells outside the ranges are not looked at
+    assert row_spans(old, new, [(0, 4)]) == [(2, 3)]
+
+
+def test_row_spans_with_styles():
+    assert row_spans('abcd', 'abcd', [(0, 2)], [0, 0, 0, 0], [0, 5, 0, 5]) == [(1, 2)]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_diffing_dirty_regions_writes_the_same_as_a_full_scan(seed):
+    rng = random.Random(seed)
+    full, partial = make_renderer(), make_renderer()
+    frame = FrameBuffer(WIDTH, HEIGHT)
+    for _ in range(30):
+        regions = []
+        for _ in range(rng.randint(0, 4)):
+            x, y = rng.randrange(WIDTH), rng.randrange(HEIGHT)
+            text = ''.join(rng.choice(' abc') for _ in range(rng.randint(1, 8)))[:WIDTH - x]
+            frame.write_run(x, y, text, 0)
+            regions.append((x, y, x + len(text), y + 1))
+        expected = draw(full, frame, None)
+        assert draw(partial, frame, regions) == expected
+        assert partial.front.rows() == frame.rows()
+
+
+def test_margins_configured_at_runtime_are_used(monkeypatch):
+    from spaceship.utils import constants
+    monkeypatch.setattr(constants, 'LEFT_MARGIN', 5)
+    monkeypatch.setattr(constants, 'TOP_MARGIN', 3)
+    renderer = make_renderer()
+    frame = FrameBuffer(WIDTH, HEIGHT)
+    frame.write_run(0, 0, 'x', 0)
+    assert '\033[5;5Hx' in draw(renderer, frame, None)
+    renderer.begin_frame()
+    renderer.draw_hud_bottom(1, ['hud'])
+    renderer.end_frame()
+    assert f'\033[{HEIGHT + 3 + 1 + 1};1H' + ' ' * 5 + 'hud' in renderer.stream.getvalue()
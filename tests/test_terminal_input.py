@@ -0,0 +1,86 @@
+import io
+import os
+
+import pytest
+
+from spaceship.input.terminal import CSI, Key, KeyDecoder, TerminalInput, decode_sequence
+
+
+def decode(sequence):
+    return decode_sequence(CSI.match(sequence))
+
+
+@pytest.fixture
+def pipe_input():
+    read_fd, write_fd = os.pipe()
+    terminal = TerminalInput(stream=os.fdopen(read_fd), output=io.StringIO())
+    yield terminal, write_fd
+    terminal.close()
+    os.close(write_fd)
+
+
+def test_legacy_sequences():
+    decoder = KeyDecoder()
+    events = decoder.feed('\x1b[A\x1bOP\x1b[3~\x1b[15~w\r\x7f ')
+    assert events == [
+        ('press', Key.up, None), ('press', Key.f1, None), ('press', Key.delete, None),
+        ('press', Key.f5, None), ('press', 'w', 'w'), ('press', Key.enter, None),
+        ('press', Key.backspace, None), ('press', Key.space, ' '),
+    ]
+
+
+def test_sequence_split_across_reads():
+    decoder = KeyDecoder()
+    assert decoder.feed('a\x1b[1') == [('press', 'a', 'a')]
+    assert decoder.feed('5~') == [('press', Key.f5, None)]
+
+
+def test_lone_escape_is_resolved_by_flush():
+    decoder = KeyDecoder()
+    assert decoder.feed('\x1b') == []
+    assert decoder.flush() == [('press', Key.esc, None)]
+    assert decoder.flush() == []
+
+
+def test_kitty_event_types():
+    assert decode('\x1b[97u') == ('press', 'a', 'a')
+    assert decode('\x1b[97;1:2u') == ('repeat', 'a', 'a')
+    assert decode('\x1b[97;1:3u') == ('release', 'a', 'a')
+    assert decode('\x1b[97:65;2u') == ('press', 'a', 'A')
+    assert decode('\x1b[57441;2u') == ('press', Key.shift, None)
+    assert decode('\x1b[1;1:3A') == ('release', Key.up, None)
+
+
+def test_kitty_ctrl_and_alt_chords_are_not_plain_characters():
+    assert decode('\x1b[97;5u') is None
+    assert decode('\x1b[97;3u') is None
+    # Releases go through, so a key held before the modifier is let go
+    assert decode('\x1b[97;5:3u') == ('release', 'a', 'a')
+
+
+def test_kitty_ctrl_c_is_an_interrupt_event():
+    assert decode('\x1b[99;5u') == ('interrupt', 'c', None)
+    assert decode('\x1b[99;5:3u') == ('release', 'c', 'c')
+
+
+def test_ctrl_c_interrupts_from_update(pipe_input):
+    terminal, write_fd = pipe_input
+    os.write(write_fd, b'\x1b[99;5u')
+    with pytest.raises(KeyboardInterrupt):
+        terminal.update(1 / 60)
+
+
+def test_utf8_split_across_reads(pipe_input):
+    terminal, write_fd = pipe_input
+    data = 'é→'.encode()
+    os.write(write_fd, data[:1])
+    assert terminal._read() == ''
+    os.write(write_fd, data[1:4])
+    assert terminal._read() == 'é'
+    os.write(write_fd, data[4:])
+    assert terminal._read() == '→'
+
+
+def test_input_stays_blocking(pipe_input):
+    terminal, _ = pipe_input
+    assert os.get_blocking(terminal.fd)
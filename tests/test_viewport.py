@@ -0,0 +1,49 @@
+from spaceship.game import Game
+from spaceship.input.scripted import ScriptedInput
+from spaceship.render.camera import Camera, CameraMode
+from spaceship.render.entity import Entity
+from spaceship.render.headless import HeadlessRenderer
+from spaceship.render.viewport import Viewport
+from spaceship.utils.math import Vector
+
+
+class Ship(Entity):
+    def update(self, dt):
+        pass
+
+
+def make_game():
+    game = Game(renderer=HeadlessRenderer((60, 20)), input=ScriptedInput(), size=(60, 20))
+    ship = game.add_entity(Ship(game))
+    ship.sprite.load('@')
+    ship.position = Vector(0, 0)
+    return game
+
+
+def find(rows, char):
+    return [(x, y) for y, row in enumerate(rows) for x, cell in enumerate(row) if cell == char]
+
+
+def test_centered_target_lands_in_the_middle_of_a_split_screen_viewport():
+    game = make_game()
+    game.add_viewport(Viewport(Camera(Vector(0, 0), CameraMode.CENTER), 0, 0, 30, 20))
+    game.simulate(1)
+    assert find(game.renderer.rows(), '@') == [(15, 10)]
+
+
+def test_centered_target_lands_in_the_middle_of_a_minimap():
+    game = make_game()
+    game.add_viewport(Viewport(Camera(Vector(0, 0), CameraMode.CENTER), 40, 0, 20, 10, scale=4))
+    game.simulate(1)
+    assert find(game.renderer.rows(), '@') == [(50, 5)]
+
+
+def test_game_camera_fills_the_playfield_again_after_its_viewport_is_removed():
+    game = make_game()
+    game.camera.mode = CameraMode.CENTER
+    viewport = game.add_viewport(Viewport(game.camera, 0, 0, 30, 20))
+    game.simulate(1)
+    assert find(game.renderer.rows(), '@') == [(15, 10)]
+    game.remove_viewport(viewport)
+    game.simulate(1)
+    assert find(game.renderer.rows(), '@') == [(30, 10)]
@@ -0,0 +1,50 @@
+import pytest
+
+from spaceship.ecs.world import INT, VECTOR, World
+from spaceship.utils.math import Vector
+
+
+def test_entity_spawned_and_killed_in_one_update_never_appears():
+    world = World()
+    spawned = []
+
+    @world.add_system
+    def fire(world, dt):
+        bullet = world.spawn(position=Vector(1, 2))
+        spawned.append(bullet)
+        world.kill(bullet)
+
+    world.update(1 / 60)
+    assert world.count == 0
+    assert not world.alive(spawned[0])
+
+
+def test_kills_and_spawns_of_other_entities_in_one_update():
+    world = World()
+    old = world.spawn()
+
+    @world.add_system
+    def swap(world, dt):
+        world.kill(old)
+        world.spawn()
+
+    world.update(1 / 60)
+    assert world.count == 1
+    assert not world.alive(old)
+
+
+@pytest.mark.parametrize('name', ['count', 'dirty', 'alive', 'spawn', 'rows'])
+def test_define_rejects_names_of_world_attributes(name):
+    world = World()
+    with pytest.raises(ValueError):
+        world.define(name)
+
+
+def test_define_fills_existing_rows_with_the_default():
+    world = World()
+    entity = world.spawn()
+    world.define('health', INT, 100)
+    world.define('offset', VECTOR, Vector(1, 2))
+    assert world.get(entity, 'health') == 100
+    assert (world.offset.x[0], world.offset.y[0]) == (1, 2)
+    assert not world.has(entity, 'health')